@@ -2,11 +2,15 @@
 Eternal Hunt: AI Agent Powered Game — Gradio Web App
 """
 
+import dataclasses
 import os
+import threading
 
 import gradio as gr
 from dotenv import load_dotenv
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from fastapi import Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 
 from game.config import (
     API_KEY_PATH,
@@ -15,9 +19,17 @@ from game.config import (
     APP_URL,
     APP_VERSION,
     EXAMPLE_COMMANDS,
+    GZIP_MIN_BYTES,
+    PANEL_LOG_ENTRIES,
+    SHARD_COUNT,
+    TITLE_IMAGE_PATH,
 )
-from game.content import NARRATOR_INTRO
 from game.router import Router
+from game.sessions import SessionManager
+from game.sharding import ShardPool
+from game.static import IMMUTABLE, REVALIDATE, StaticAsset
+from game.store import STORE_URL_ENV, open_store
+from game.transcript import CursorError
 from game.ui_shared import (
     GRADIO_CSS,
     TIP_TEXT,
@@ -26,6 +38,8 @@ from game.ui_shared import (
     footer_html,
     has_api_key,
     header_html,
+    panel_html,
+    panel_js,
 )
 
 # Load environment variables before importing game modules
@@ -37,20 +51,130 @@ elif os.path.exists(API_KEY_PATH):
 # Single router instance per process
 _ROUTER = Router()
 
+# THRILLER_SHARDS=K spreads sessions over K worker processes (one GameState per browser session).
+# Started on first use, never at import: spawned workers import this module again.
+_POOL = None
+_POOL_LOCK = threading.Lock()
 
-def handle_chat(message, history):
-    # history is a list of {"role": "...", "content": "..."} dicts with type="messages"
+
+def _shard_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ShardPool(SHARD_COUNT).start()
+        return _POOL
+
+
+def _remote_turn(key, message):
+    return _shard_pool().handle(key, message)
+
+
+# ----- Static content: built once at startup, served with ETag/Cache-Control -----
+_BASE_URL = APP_URL.rstrip("/")
+
+# The stylesheet is linked from <head> at a content-addressed URL (cached for good)
+# instead of being inlined into every page's config
+_STYLESHEET = StaticAsset.text(GRADIO_CSS, "text/css", IMMUTABLE)
+_TITLE_IMAGE = (
+    StaticAsset.file(TITLE_IMAGE_PATH, IMMUTABLE) if os.path.exists(TITLE_IMAGE_PATH) else None
+)
+_TITLE_IMAGE_NAME = "/site/" + os.path.basename(TITLE_IMAGE_PATH)
+_STATIC = {
+    "/manifest.json": StaticAsset.json(
+        {
+            "name": APP_NAME,
+            "short_name": "Outlive",
+            "start_url": "/",
+            "display": "standalone",
+            "background_color": "#ffffff",
+            "theme_color": "#4f46e5",
+            "icons": [],
+            "scope": "/",
+            "id": _BASE_URL + "/",
+        }
+    ),
+    "/robots.txt": StaticAsset.text(
+        f"User-agent: *\nAllow: /\nSitemap: {_BASE_URL}/sitemap.xml\n", "text/plain"
+    ),
+    "/sitemap.xml": StaticAsset.text(
+        f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{_BASE_URL}/</loc></url>
+</urlset>""",
+        "application/xml",
+    ),
+    _STYLESHEET.versioned_path("/site/app.css"): _STYLESHEET,
+}
+if _TITLE_IMAGE is not None:
+    # Fingerprinted URL for pages we render; the plain one revalidates for old links
+    _STATIC[_TITLE_IMAGE.versioned_path(_TITLE_IMAGE_NAME)] = _TITLE_IMAGE
+    _STATIC[_TITLE_IMAGE_NAME] = dataclasses.replace(_TITLE_IMAGE, cache_control=REVALIDATE)
+if os.path.exists("favicon.ico"):
+    _STATIC["/favicon.ico"] = StaticAsset.file("favicon.ico")
+
+_HEAD = f'<link rel="stylesheet" href="{_STYLESHEET.versioned_path("/site/app.css")}">'
+if _TITLE_IMAGE is not None:
+    _HEAD += (
+        f'\n<meta property="og:image" '
+        f'content="{_BASE_URL}{_TITLE_IMAGE.versioned_path(_TITLE_IMAGE_NAME)}">'
+    )
+
+# One Session per browser tab; the tab itself only holds its key in gr.State.
+# Sessions autosave through THRILLER_STORE when it is set.
+_SESSIONS = SessionManager(
+    store=open_store() if os.getenv(STORE_URL_ENV) else None,
+    router=_ROUTER,
+    remote=_remote_turn if SHARD_COUNT > 0 else None,
+)
+
+
+def start_session(key):
+    """Page load: a key for new tabs, then the chat window, its cursor and a panel snapshot."""
+    key = key or _SESSIONS.new_key()
+    window, cursor = _SESSIONS.window(key)
+    return key, window, cursor, _SESSIONS.panel(key)
+
+
+def show_earlier(key, cursor):
+    """Pages the chat back one window; a stale cursor just shows the newest window."""
+    if not key:
+        return gr.skip(), None
+    if cursor:
+        try:
+            return _SESSIONS.older(key, cursor)
+        except CursorError:
+            pass
+    return _SESSIONS.window(key)
+
+
+def handle_chat(message, key):
+    """
+    Streams one turn: yields (textbox, chat window, cursor, panel diff). The chat
+    window is bounded and the panel only gets this turn's diff, so payloads don't
+    grow with the game; the browser never sends its history back.
+    """
     text = message["content"] if isinstance(message, dict) else str(message)
+    key = key or _SESSIONS.new_key()
+    # Two slots stay free for the turn being played
+    window = _SESSIONS.messages(key)[2:]
+    pending = [{"role": "user", "content": text}]
     if not _ROUTER.ready:
-        return (
+        reply = (
             "⚠️ Dependency missing or not importable: game.engine.respond_narrator. "
             "Ensure the agents framework is installed and imports succeed."
         )
+        yield "", window + pending + [{"role": "assistant", "content": reply}], gr.skip(), gr.skip()
+        return
     try:
-        # Pass history through; Router currently ignores it but may use it later
-        return _ROUTER.handle(text, history)
+        for partial in _SESSIONS.stream(key, text):
+            chat = window + pending + [{"role": "assistant", "content": partial}]
+            yield "", chat, gr.skip(), gr.skip()
     except Exception as e:
-        return f"⚠️ Error: {e!s}"
+        error = f"⚠️ Error: {e!s}"
+        yield "", window + pending + [{"role": "assistant", "content": error}], gr.skip(), gr.skip()
+        return
+    window, cursor = _SESSIONS.window(key)
+    yield "", window, cursor, _SESSIONS.panel_diff(key)
 
 
 def build_app():
@@ -60,75 +184,77 @@ def build_app():
     with gr.Blocks(
         title=APP_NAME,
         theme=build_gradio_theme(),
-        css=GRADIO_CSS,
+        head=_HEAD,
         analytics_enabled=False,
     ) as app:
         gr.Markdown(header_html(APP_NAME, APP_VERSION))
         gr.Markdown(card_html(APP_DESC, TIP_TEXT))
 
-        ci = gr.ChatInterface(
+        # Per-tab session key (game.sessions) and the hidden channel for panel diffs
+        key = gr.State(None)
+        cursor = gr.State(None)
+        panel_delta = gr.JSON(visible=False)
+
+        with gr.Row():
+            with gr.Column(scale=3):
+                earlier = gr.Button("Earlier messages", size="sm", variant="secondary")
+                chatbot = gr.Chatbot(type="messages", show_label=False, height=520)
+                box = gr.Textbox(
+                    placeholder="Type your action...", autofocus=True, show_label=False
+                )
+                gr.Examples(EXAMPLE_COMMANDS, inputs=box)
+            with gr.Column(scale=1, min_width=220):
+                gr.HTML(panel_html())
+
+        app.load(fn=start_session, inputs=key, outputs=[key, chatbot, cursor, panel_delta])
+        earlier.click(fn=show_earlier, inputs=[key, cursor], outputs=[chatbot, cursor])
+        box.submit(
             fn=handle_chat,
-            type="messages",
-            textbox=gr.Textbox(placeholder="Type your action...", autofocus=True),
-            examples=EXAMPLE_COMMANDS,
-            cache_examples=False,
+            inputs=[box, key],
+            outputs=[box, chatbot, cursor, panel_delta],
             concurrency_limit=5,
         )
-
-        def seed_intro():
-            msgs = [{"role": "assistant", "content": NARRATOR_INTRO}]
-            return msgs, msgs  # <- seed the visible chatbot AND the internal state
-
-        # seed BOTH outputs: chatbot + state
-        app.load(fn=seed_intro, outputs=[ci.chatbot, ci.chatbot_state])
+        # Applied in the browser: the panel is patched, never re-rendered
+        panel_delta.change(fn=None, inputs=panel_delta, js=panel_js(PANEL_LOG_ENTRIES))
 
         gr.Markdown(footer_html(APP_NAME))
 
     return app
 
 
+class _GZipExceptQueue(GZipMiddleware):
+    """GZip for pages, assets and JSON; Gradio's queue streams pass through untouched
+    (a compressor buffers, which would hold back streamed replies)."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "/queue/" in scope.get("path", ""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 demo = build_app()
+demo.app.add_middleware(_GZipExceptQueue, minimum_size=GZIP_MIN_BYTES)
 
 
 # ----- FastAPI routes -----
-@demo.app.get("/manifest.json")
-def manifest():
-    data = {
-        "name": APP_NAME,
-        "short_name": "Outlive",
-        "start_url": "/",
-        "display": "standalone",
-        "background_color": "#ffffff",
-        "theme_color": "#4f46e5",
-        "icons": [],
-        "scope": "/",
-        "id": APP_URL.rstrip("/") + "/",
-    }
-    return JSONResponse(data)
-
-
-@demo.app.get("/robots.txt")
-def robots():
-    return PlainTextResponse(
-        f"User-agent: *\nAllow: /\nSitemap: {APP_URL.rstrip('/')}/sitemap.xml\n"
-    )
+def _serve(asset: StaticAsset, request: Request) -> Response:
+    status, body, headers = asset.respond(request.headers.get("if-none-match"))
+    return Response(content=body, status_code=status, headers=headers)
 
 
-@demo.app.get("/sitemap.xml")
-def sitemap():
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-  <url><loc>{APP_URL.rstrip("/")}/</loc></url>
-</urlset>"""
-    return Response(content=xml, media_type="application/xml")
+def _add_static_route(path: str, asset: StaticAsset) -> None:
+    def route(request: Request) -> Response:
+        return _serve(asset, request)
 
+    demo.app.add_api_route(path, route, methods=["GET"], include_in_schema=False)
 
-if os.path.exists("favicon.ico"):
 
-    @demo.app.get("/favicon.ico")
-    def favicon():
-        return FileResponse("favicon.ico", media_type="image/x-icon")
+for _path, _asset in _STATIC.items():
+    _add_static_route(_path, _asset)
 
 
 if __name__ == "__main__":
+    if SHARD_COUNT > 0:
+        _shard_pool()  # warm the workers before the first turn
     demo.launch()
@@ -13,11 +13,14 @@ from game.config import (
     APP_NAME,
     APP_VERSION,
     EXAMPLE_COMMANDS,
+    TURN_POLL_S,
 )
-from game.content import NARRATOR_INTRO
 from game.router import Router
+from game.sessions import SessionManager
+from game.store import STORE_URL_ENV, open_store
+from game.transcript import CursorError
 from game.ui_shared import (
-    STREAMLIT_CSS,
+    STREAMLIT_STYLE,
     TIP_TEXT,
     card_html,
     footer_html,
@@ -35,8 +38,15 @@ elif os.path.exists(API_KEY_PATH):
 _ROUTER = Router()
 
 
+@st.cache_resource
+def sessions() -> SessionManager:
+    """One manager per process; each browser session keeps only its key (and a cursor)."""
+    store = open_store() if os.getenv(STORE_URL_ENV) else None
+    return SessionManager(store=store, router=_ROUTER)
+
+
 def css():
-    st.markdown(f"<style>{STREAMLIT_CSS}</style>", unsafe_allow_html=True)
+    st.markdown(STREAMLIT_STYLE, unsafe_allow_html=True)
 
 
 def sidebar():
@@ -49,7 +59,8 @@ def sidebar():
         col_a, col_b = st.columns(2)
         with col_a:
             if st.button("Clear chat", use_container_width=True):
-                st.session_state.chat = []
+                sessions().clear_chat(st.session_state.session_key)
+                st.session_state.cursor = None
                 st.rerun()
         with col_b:
             st.toggle("Auto-scroll", value=True, key="auto_scroll")
@@ -69,41 +80,73 @@ def header():
 
 
 def render_history():
-    for role, content in st.session_state.chat:
-        with st.chat_message(role):
-            st.markdown(content)
+    """The bounded chat window, or an earlier page while the player scrolls back."""
+    key = st.session_state.session_key
+    messages, older = sessions().window(key)
+    if st.session_state.cursor:
+        try:
+            messages, older = sessions().older(key, st.session_state.cursor)
+        except CursorError:
+            st.session_state.cursor = None
+    if older and st.button("Earlier messages", key="earlier"):
+        st.session_state.cursor = older
+        st.rerun()
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
 
 
 def handle_submit(text: str):
-    st.session_state.chat.append(("user", text))
+    """Starts the turn in the background; follow_turn() shows it on the rerun."""
+    st.session_state.cursor = None  # back to the newest window
+    turn = sessions().submit(st.session_state.session_key, text)
+    if turn.message != text:
+        st.toast("Still working on your last move…")
+    st.rerun()
+
+
+def follow_turn():
+    """
+    Streams the player's in-flight turn, wherever it was started (this tab, an
+    earlier run, another tab). The turn runs on the shared background loop, so
+    interacting meanwhile just reruns the script and re-attaches here.
+    """
+    turn = sessions().inflight(st.session_state.session_key)
+    if turn is None:
+        return
     with st.chat_message("user"):
-        st.markdown(text)
-
-    try:
-        reply = _ROUTER.handle(text, st.session_state.chat)
-    except Exception as e:
-        reply = f"⚠️ Error: {e!s}"
-
-    st.session_state.chat.append(("assistant", reply))
+        st.markdown(turn.message)
     with st.chat_message("assistant"):
-        st.markdown(reply)
+        st.write_stream(turn.updates())
+    if turn.error is not None:
+        st.error(f"⚠️ Error: {turn.error!s}")
+    else:
+        st.rerun()  # show the finished reply from the transcript
 
-    if st.session_state.get("auto_scroll", True):
-        st.empty()
+
+@st.fragment(run_every=TURN_POLL_S)
+def watch_other_tabs():
+    """Picks up turns started or finished by the player's other tabs."""
+    key = st.session_state.session_key
+    seen = len(sessions().session(key).transcript)
+    changed = seen != st.session_state.get("seen", seen)
+    st.session_state.seen = seen
+    if changed or sessions().inflight(key) is not None:
+        st.rerun()
 
 
 def main():
     st.set_page_config(page_title=APP_NAME, page_icon="🎭", layout="centered")
     css()
-    sidebar()
-    if "chat" not in st.session_state:
-        st.session_state.chat = []
+    # The chat itself lives in the session's transcript (seeded with the intro).
+    # The player key rides in the URL, so the player's other tabs share the session.
+    if "session_key" not in st.session_state:
+        st.session_state.session_key = st.query_params.get("player") or SessionManager.new_key()
+        st.session_state.cursor = None
+    st.query_params["player"] = st.session_state.session_key
     if "_pending_prompt" not in st.session_state:
         st.session_state["_pending_prompt"] = None
-
-    # 🔽 Seed intro once if chat is empty
-    if not st.session_state.chat:
-        st.session_state.chat.append(("assistant", NARRATOR_INTRO))
+    sidebar()
 
     header()
 
@@ -114,6 +157,8 @@ def main():
         )
 
     render_history()
+    follow_turn()
+    watch_other_tabs()
 
     pending = st.session_state.get("_pending_prompt")
     if pending:
@@ -1,4 +1,5 @@
 """
 Thriller package: content, state, tools, and engine for the AI narrative game.
 """
+
 __all__ = ["content", "state", "tools", "engine"]
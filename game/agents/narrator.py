@@ -1,32 +1,62 @@
-from agents import Agent
+from typing import Optional, Sequence
 
+from agents import Agent, ModelSettings
+
+from ..compaction import narrator_log_view
 from ..config import MODEL
 from ..content import GAME_STORY
 from ..state import GameState
 from ..tools import set_narrator_tools
 
-
-def make_narrator(state: GameState, web_agent=None) -> Agent:
-    instructions = f"""
+# Static part of the prompt, byte-identical on every turn and in every session so
+# provider-side prompt caching can reuse it. Anything that changes goes after it.
+NARRATOR_PREFIX = f"""
 You are the narrator and game master for a text thriller.
 
 World:
 {GAME_STORY}
 
-Current game details (append-only log):
-{state.game_log}
-
-Inventory:
-{state.items}
-
 If you require real-world facts, call the tool `query_web_research_agent` with a concise question.
 Record concise updates with update_game_log after each action. Use add/remove inventory tools on changes.
 Do not mention internal tools, tool names, tool calls, or system notes in your reply. Keep responses vivid, cinematic, and grounded.
 """.strip()
 
+
+def narrator_context(
+    state: GameState, log_upto: Optional[int] = None, recalled: Sequence[str] = ()
+) -> str:
+    """
+    The per-turn part of the prompt: game details and inventory. Log entries from
+    `log_upto` on are left out (the turns they came from are sent as messages).
+    `recalled` are older entries retrieved for this turn (game.retrieval).
+    """
+    context = f"""
+Current game details (older entries are summarized):
+{narrator_log_view(state, upto=log_upto)}
+
+Inventory:
+{state.items}
+""".strip()
+    if recalled:
+        lines = "\n".join(f"- {line}" for line in recalled)
+        context += f"\n\nRelevant earlier details (recalled from older entries):\n{lines}"
+    return context
+
+
+def make_narrator(
+    state: GameState,
+    web_agent=None,
+    model: str = MODEL,
+    max_tokens: Optional[int] = None,
+    log_upto: Optional[int] = None,
+    recalled: Sequence[str] = (),
+) -> Agent:
+    instructions = f"{NARRATOR_PREFIX}\n\n{narrator_context(state, log_upto, recalled)}"
+
     return Agent(
         name="Narrator Agent",
         instructions=instructions,
-        model=MODEL,
+        model=model,
         tools=set_narrator_tools(state, web_agent=web_agent),
+        model_settings=ModelSettings(max_tokens=max_tokens),
     )
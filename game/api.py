@@ -1,7 +1,10 @@
 import asyncio
+from typing import Optional
+
 from agents import Runner
 from .state import GameState, save_state
 from .agents.narrator import make_narrator
+from .engine import Session
 
 # Default single-user state (preserves current behavior)
 _default_state = GameState()
@@ -33,14 +36,15 @@ def respond_narrator(message: str) -> str:
 
 
 # Optional: per-session factory, e.g., for Gradio/Streamlit stateful sessions
-def build_session_handler():
-    state = GameState()
-    agent = make_narrator(state)
+def build_session(session_id: str = "session", save_path: Optional[str] = None) -> Session:
+    """
+    Isolated session with its own state and undo/branch history:
+    session.respond(msg), session.undo(), session.rewind(n), session.branch(n).
+    Autosaves only when given a save_path, e.g. "runs/session_<session_id>.json".
+    """
+    return Session(session_id=session_id, save_path=save_path, autosave=save_path is not None)
 
-    def handle(message: str) -> str:
-        text = _sync_run(agent, message)
-        # If you want session-specific persistence, pass a path here:
-        # state.save("runs/session_<session_id>.json")
-        return text
 
-    return handle, state
+def build_session_handler():
+    session = build_session()
+    return session.respond, session.state
@@ -0,0 +1,114 @@
+"""
+Adaptive output-token budgets per turn type, steered by a latency SLO.
+
+Each turn type (game.tiering.turn_type) has its own max_tokens budget and
+latency target. After every turn the budget adapts (AIMD):
+- latency (EWMA) over the SLO: shrink multiplicatively, down to the floor
+- comfortably under the SLO and the reply was cut off: grow additively, up to the cap
+
+A reply that hits the budget is finished gracefully: one short tool-less
+continuation call, then anything still dangling is trimmed back to the last
+complete sentence.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Tuple
+
+from game.config import TURN_LATENCY_SLO_MS, TURN_TOKEN_BOUNDS
+from game.metrics import METRICS
+
+# Smoothing for the latency average, and the AIMD steps
+LATENCY_EWMA_ALPHA = 0.3
+SHRINK_FACTOR = 0.8
+GROW_STEP = 64
+# "Comfortably under" the SLO, as a fraction of it
+HEADROOM = 0.7
+
+CONTINUE_PROMPT = (
+    "Your last reply was cut off. Continue it from exactly where it stopped and finish "
+    "the scene in a few sentences. Do not repeat anything already said."
+)
+
+
+@dataclass
+class TokenBudget:
+    floor: int
+    cap: int
+    slo_ms: float
+    max_tokens: int = 0
+    latency_ms: float = 0.0  # EWMA; 0 until the first turn
+
+    def __post_init__(self) -> None:
+        if not self.max_tokens:
+            self.max_tokens = self.cap
+
+    def observe(self, ms: float, truncated: bool) -> None:
+        a = LATENCY_EWMA_ALPHA
+        self.latency_ms = ms if not self.latency_ms else a * ms + (1 - a) * self.latency_ms
+        if self.latency_ms > self.slo_ms:
+            self.max_tokens = max(self.floor, int(self.max_tokens * SHRINK_FACTOR))
+        elif truncated and self.latency_ms < self.slo_ms * HEADROOM:
+            self.max_tokens = min(self.cap, self.max_tokens + GROW_STEP)
+
+
+class TurnBudgets:
+    """The budgets for every turn type; shared by all sessions in the process."""
+
+    def __init__(
+        self,
+        bounds: Mapping[str, Tuple[int, int]] = TURN_TOKEN_BOUNDS,
+        slo_ms: Mapping[str, float] = TURN_LATENCY_SLO_MS,
+    ) -> None:
+        self._budgets: Dict[str, TokenBudget] = {
+            kind: TokenBudget(floor=lo, cap=hi, slo_ms=slo_ms[kind])
+            for kind, (lo, hi) in bounds.items()
+        }
+        self._lock = threading.Lock()
+
+    def __contains__(self, kind: str) -> bool:
+        return kind in self._budgets
+
+    def max_tokens(self, kind: str) -> int:
+        with self._lock:
+            return self._budgets[kind].max_tokens
+
+    def observe(self, kind: str, ms: float, output_tokens: int, truncated: bool) -> None:
+        with self._lock:
+            budget = self._budgets[kind]
+            budget.observe(ms, truncated)
+            current = budget.max_tokens
+        METRICS.observe(f"turn.{kind}.output_tokens", output_tokens)
+        METRICS.observe(f"turn.{kind}.latency_ms", ms)
+        METRICS.observe(f"turn.{kind}.max_tokens", current)
+        if truncated:
+            METRICS.incr(f"turn.{kind}.truncated")
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                kind: {
+                    "max_tokens": b.max_tokens,
+                    "latency_ms": round(b.latency_ms, 1),
+                    "slo_ms": b.slo_ms,
+                }
+                for kind, b in self._budgets.items()
+            }
+
+
+TURN_BUDGETS = TurnBudgets()
+
+
+_SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*(?=\s|$)")
+
+
+def trim_to_sentence(text: str) -> str:
+    """Drops a dangling half-sentence; text without any sentence end is kept whole."""
+    text = text.rstrip()
+    ends = list(_SENTENCE_END.finditer(text))
+    if not ends or ends[-1].end() == len(text):
+        return text
+    return text[: ends[-1].end()]
@@ -0,0 +1,70 @@
+"""
+Warm-restart time: loading (and saving) every session in a store directory.
+
+Writes `--sessions` synthetic saves of `--entries` log entries each to a temp
+directory, then times a plain loop over GameState.load_json / save_json against
+game.state.load_many / save_many (threads, and a process pool for decoding):
+
+    python -m game.bulkbench --sessions 10000 --entries 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from game.state import GameLogEntry, GameState, InventoryItem, iter_sessions, load_many, save_many
+
+
+def _state(n: int, entries: int) -> GameState:
+    state = GameState()
+    for i in range(entries):
+        state.game_log.append(GameLogEntry("event", f"Session {n}, turn {i}: a door creaks."))
+    state.items.append(InventoryItem("keycard", "Opens the lab doors"))
+    return state
+
+
+def _timed(fn: Any) -> float:
+    started = time.perf_counter()
+    fn()
+    return round(time.perf_counter() - started, 3)
+
+
+def bench(sessions: int, entries: int, threads: int, processes: Optional[int]) -> Dict[str, Any]:
+    states = {f"s{n:05d}": _state(n, entries) for n in range(sessions)}
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_dir = os.path.join(tmp, "serial")
+        bulk_dir = os.path.join(tmp, "bulk")
+        results: Dict[str, Any] = {"sessions": sessions, "entries": entries}
+        results["save_serial_s"] = _timed(
+            lambda: [s.save_json(os.path.join(serial_dir, f"{k}.json")) for k, s in states.items()]
+        )
+        results["save_many_s"] = _timed(lambda: save_many(states, bulk_dir, threads=threads))
+        results["load_serial_s"] = _timed(
+            lambda: [GameState.load_json(p) for _, p in iter_sessions(serial_dir)]
+        )
+        results["load_many_threads_s"] = _timed(lambda: load_many(bulk_dir, threads=threads))
+        results["load_many_processes_s"] = _timed(
+            lambda: load_many(bulk_dir, threads=threads, processes=processes, process_bytes=0)
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bulk session load/save.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--entries", type=int, default=40, help="game log entries per session")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(bench(args.sessions, args.entries, args.threads, args.processes), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
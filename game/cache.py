@@ -0,0 +1,789 @@
+"""
+Cache layer shared by workers: one interface, three backends.
+
+- LRUCache: in-process, bounded OrderedDict (per process, no I/O).
+- SqliteCache: one SQLite file that every process on the host can share.
+- RedisCache: a minimal Redis-protocol (RESP) client, for multi-host deployments.
+  LocalRedisServer is a pure-Python stand-in that speaks enough RESP for tests
+  and single-box setups (`python -m game.cache --port 6380`).
+
+All backends take TTLs (seconds) and a size bound, and `get_or_set` /
+`aget_or_set` are single-flight: concurrent identical misses run `compute` once.
+Within a process that is a shared future (threads and event loops alike); across
+processes SqliteCache and RedisCache also take a short fill lock so other workers
+wait for the value instead of recomputing it.
+
+    cache = open_cache("redis://127.0.0.1:6379/thriller")
+    answer = await cache.aget_or_set(key, lambda: ask_model(query), ttl=3600)
+
+Values must be JSON-serializable for the shared backends.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+from game.config import CACHE_LOCK_TTL_S, CACHE_MAX_ENTRIES, CACHE_TTL_S
+
+CACHE_URL_ENV = "THRILLER_CACHE"
+
+T = TypeVar("T")
+
+_MISSING = object()
+# Result for waiters when the leading caller was cancelled: they try again
+_RETRY = object()
+
+
+class CacheError(RuntimeError):
+    """The cache backend failed or answered with an error."""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    fills: int = 0  # compute() calls made by get_or_set
+    coalesced: int = 0  # callers that waited on someone else's fill
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class Cache(ABC):
+    """Key/value cache with TTLs and single-flight fills. Keys are strings."""
+
+    # Backends that do I/O get their calls moved off the event loop in aget_or_set
+    blocking = True
+
+    def __init__(self, default_ttl: Optional[float] = CACHE_TTL_S) -> None:
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Our token on each cross-process fill lock we hold, checked on release
+        self._fill_tokens: Dict[str, Any] = {}
+
+    # ---------- backend hooks ----------
+    @abstractmethod
+    def _lookup(self, key: str) -> Any:
+        """Returns the stored value or _MISSING."""
+
+    @abstractmethod
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None: ...
+
+    @abstractmethod
+    def _remove(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def _acquire_fill(self, key: str) -> bool:
+        """Cross-process fill lock; in-process backends need none."""
+        return True
+
+    def _release_fill(self, key: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    # ---------- plain access ----------
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.stats.misses += 1
+            return default
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._store(key, value, self.default_ttl if ttl is None else ttl)
+
+    def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    # ---------- single-flight ----------
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Returns (future, leader): the first caller for `key` leads the fill."""
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.stats.coalesced += 1
+                return fut, False
+            fut = Future()
+            self._inflight[key] = fut
+            return fut, True
+
+    def _finish(self, key: str, fut: Future, value: Any = _MISSING, error: Any = None) -> None:
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(value)
+
+    def get_or_set(self, key: str, compute: Callable[[], T], ttl: Optional[float] = None) -> T:
+        """Cached value for `key`, computing (once, however many callers) on a miss."""
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            fut, leader = self._join(key)
+            if not leader:
+                value = fut.result()
+                if value is _RETRY:
+                    continue
+                return value
+            try:
+                value = self._fill_sync(key, compute, ttl)
+            except Exception as e:
+                self._finish(key, fut, error=e)
+                raise
+            except BaseException:
+                # The leader itself was interrupted: not an answer for the others
+                self._finish(key, fut, _RETRY)
+                raise
+            self._finish(key, fut, value)
+            return value
+
+    async def aget_or_set(
+        self, key: str, compute: Callable[[], Awaitable[T]], ttl: Optional[float] = None
+    ) -> T:
+        """Async get_or_set; waiters in other threads or event loops share the fill."""
+        while True:
+            value = await self._call(self.get, key, _MISSING)
+            if value is not _MISSING:
+                return value
+            fut, leader = self._join(key)
+            if not leader:
+                # shield: a cancelled waiter must not cancel the shared future
+                value = await asyncio.shield(asyncio.wrap_future(fut))
+                if value is _RETRY:
+                    continue
+                return value
+            try:
+                value = await self._fill_async(key, compute, ttl)
+            except Exception as e:
+                self._finish(key, fut, error=e)
+                raise
+            except BaseException:
+                # Cancelled (or interrupted) leader: waiters start the fill again
+                self._finish(key, fut, _RETRY)
+                raise
+            self._finish(key, fut, value)
+            return value
+
+    def _fill_sync(self, key: str, compute: Callable[[], T], ttl: Optional[float]) -> T:
+        while not self._acquire_fill(key):
+            # Another process is filling: wait for its value (or its lock to lapse)
+            time.sleep(0.05)
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.stats.coalesced += 1
+                return value
+        try:
+            value = self._lookup(key)  # filled while we waited for the lock
+            if value is _MISSING:
+                self.stats.fills += 1
+                value = compute()
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._release_fill(key)
+
+    async def _fill_async(
+        self, key: str, compute: Callable[[], Awaitable[T]], ttl: Optional[float]
+    ) -> T:
+        while not await self._call(self._acquire_fill, key):
+            await asyncio.sleep(0.05)
+            value = await self._call(self._lookup, key)
+            if value is not _MISSING:
+                self.stats.coalesced += 1
+                return value
+        try:
+            value = await self._call(self._lookup, key)
+            if value is _MISSING:
+                self.stats.fills += 1
+                value = await compute()
+                await self._call(self.set, key, value, ttl)
+            return value
+        finally:
+            await self._call(self._release_fill, key)
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+
+# ---------- in-process LRU ----------
+
+
+class LRUCache(Cache):
+    """Bounded in-process cache; evicts the least recently used entry first."""
+
+    blocking = False
+
+    def __init__(
+        self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: Optional[float] = CACHE_TTL_S
+    ) -> None:
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def _remove(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---------- SQLite (shared by processes on one host) ----------
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_stored ON cache (stored_at);
+CREATE TABLE IF NOT EXISTS cache_fill_locks (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SqliteCache(Cache):
+    """
+    Cache in a SQLite (WAL) file. Expired rows are dropped lazily; past
+    `max_entries` the oldest-written rows are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        default_ttl: Optional[float] = CACHE_TTL_S,
+        lock_ttl: float = CACHE_LOCK_TTL_S,
+    ) -> None:
+        super().__init__(default_ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self.lock_ttl = lock_ttl
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(_CACHE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _lookup(self, key: str) -> Any:
+        row = (
+            self._conn()
+            .execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return _MISSING
+        if row[1] is not None and row[1] <= time.time():
+            self._remove(key)
+            return _MISSING
+        return json.loads(row[0])
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now + ttl if ttl else None),
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN"
+                    " (SELECT key FROM cache ORDER BY stored_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def _remove(self, key: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache")
+            conn.execute("DELETE FROM cache_fill_locks")
+
+    def _acquire_fill(self, key: str) -> bool:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM cache_fill_locks WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO cache_fill_locks (key, expires_at) VALUES (?, ?)",
+                (key, now + self.lock_ttl),
+            )
+        if cur.rowcount != 1:
+            return False
+        # The lock's expiry doubles as our token: release only a lock we still hold
+        self._fill_tokens[key] = now + self.lock_ttl
+        return True
+
+    def _release_fill(self, key: str) -> None:
+        token = self._fill_tokens.pop(key, None)
+        if token is None:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM cache_fill_locks WHERE key = ? AND expires_at = ?", (key, token)
+            )
+
+    def __len__(self) -> int:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+
+# ---------- Redis protocol ----------
+
+
+def _encode_command(args: Tuple[Any, ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def _read_reply(reader: Any) -> Any:
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by cache server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        raise CacheError(body.decode("utf-8"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = reader.read(size + 2)
+        return data[:-2]
+    if kind == b"*":
+        size = int(body)
+        return None if size < 0 else [_read_reply(reader) for _ in range(size)]
+    raise CacheError(f"Unexpected reply from cache server: {line!r}")
+
+
+# Compare-and-delete of a fill lock (what _LocalDB's EVAL runs, too)
+_RELEASE_SCRIPT = (
+    'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+)
+
+
+class RedisCache(Cache):
+    """
+    Cache on a Redis-protocol server. Keys are namespaced by `prefix`; the size
+    bound is the server's (maxmemory with an LRU policy, or LocalRedisServer's
+    max_keys). One connection, serialized by a lock, reconnecting once on error.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        prefix: str = "thriller",
+        default_ttl: Optional[float] = CACHE_TTL_S,
+        lock_ttl: float = CACHE_LOCK_TTL_S,
+        timeout: float = 5.0,
+    ) -> None:
+        super().__init__(default_ttl)
+        self.host, self.port = host, port
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def execute(self, *args: Any) -> Any:
+        """Sends one command and returns the decoded reply."""
+        payload = _encode_command(args)
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    assert self._sock is not None
+                    self._sock.sendall(payload)
+                    return _read_reply(self._reader)
+                except (ConnectionError, OSError) as e:
+                    self._disconnect()
+                    if attempt:
+                        raise CacheError(f"Cache server unreachable: {e}") from e
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _lookup(self, key: str) -> Any:
+        raw = self.execute("GET", self._key(key))
+        return _MISSING if raw is None else json.loads(raw)
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        args: List[Any] = ["SET", self._key(key), json.dumps(value, ensure_ascii=False)]
+        if ttl:
+            args += ["PX", max(int(ttl * 1000), 1)]
+        self.execute(*args)
+
+    def _remove(self, key: str) -> None:
+        self.execute("DEL", self._key(key))
+
+    def clear(self) -> None:
+        # SCAN in batches rather than KEYS, which blocks the server on a large keyspace
+        cursor = b"0"
+        while True:
+            cursor, keys = self.execute("SCAN", cursor, "MATCH", f"{self.prefix}:*", "COUNT", 500)
+            if keys:
+                self.execute("DEL", *keys)
+            if cursor in (b"0", "0"):
+                return
+
+    def _acquire_fill(self, key: str) -> bool:
+        token = secrets.token_hex(8)
+        lock_key = f"{self.prefix}:fill-lock:{key}"
+        if self.execute("SET", lock_key, token, "NX", "PX", int(self.lock_ttl * 1000)) != "OK":
+            return False
+        self._fill_tokens[key] = token
+        return True
+
+    def _release_fill(self, key: str) -> None:
+        token = self._fill_tokens.pop(key, None)
+        if token is not None:
+            # Only our own lock: once ours expired, another worker may hold the key
+            lock_key = f"{self.prefix}:fill-lock:{key}"
+            self.execute("EVAL", _RELEASE_SCRIPT, 1, lock_key, token)
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+# ---------- local stand-in server ----------
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    server: "_RespTCPServer"
+
+    def handle(self) -> None:
+        while True:
+            try:
+                args = _read_reply(self.rfile)
+            except (ConnectionError, CacheError, ValueError):
+                return
+            if not isinstance(args, list) or not args:
+                self.wfile.write(b"-ERR expected a command array\r\n")
+                continue
+            name = args[0].decode("utf-8").upper()
+            if name == "QUIT":
+                self.wfile.write(b"+OK\r\n")
+                return
+            try:
+                reply = self.server.db.execute(name, args[1:])
+            except CacheError as e:
+                self.wfile.write(f"-ERR {e}\r\n".encode("utf-8"))
+                continue
+            self.wfile.write(_encode_reply(reply))
+
+
+def _encode_reply(reply: Any) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, str):
+        return f"+{reply}\r\n".encode("utf-8")
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode_reply(r) for r in reply)
+
+
+class _LocalDB:
+    """The subset of Redis the cache uses: strings with expiry, LRU-bounded."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._data: "OrderedDict[bytes, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item[0]
+
+    def execute(self, name: str, args: List[bytes]) -> Any:
+        with self._lock:
+            if name == "PING":
+                return "PONG"
+            if name == "GET":
+                return self._live(args[0])
+            if name == "SET":
+                return self._set(args)
+            if name == "DEL":
+                return sum(self._data.pop(k, None) is not None for k in args)
+            if name == "EXISTS":
+                return sum(self._live(k) is not None for k in args)
+            if name == "KEYS":
+                pattern = args[0].decode("utf-8")
+                return [
+                    k
+                    for k in list(self._data)
+                    if fnmatch.fnmatchcase(k.decode("utf-8"), pattern) and self._live(k)
+                ]
+            if name == "SCAN":
+                return self._scan(args)
+            if name == "EVAL":
+                return self._eval(args)
+            if name == "DBSIZE":
+                return len(self._data)
+            if name == "FLUSHDB":
+                self._data.clear()
+                return "OK"
+        raise CacheError(f"unknown command '{name}'")
+
+    def _scan(self, args: List[bytes]) -> Any:
+        """SCAN cursor [MATCH pattern] [COUNT n]; the cursor is a position in key order."""
+        start = int(args[0])
+        opts = [a.decode("utf-8") for a in args[1:]]
+        pattern = opts[opts.index("MATCH") + 1] if "MATCH" in opts else "*"
+        count = int(opts[opts.index("COUNT") + 1]) if "COUNT" in opts else 10
+        keys = sorted(self._data)[start : start + count]
+        end = start + len(keys)
+        cursor = b"0" if end >= len(self._data) else str(end).encode("utf-8")
+        matched = [
+            k for k in keys if fnmatch.fnmatchcase(k.decode("utf-8"), pattern) and self._live(k)
+        ]
+        return [cursor, matched]
+
+    def _eval(self, args: List[bytes]) -> Any:
+        """No Lua here: only the cache's own compare-and-delete script."""
+        if args[0].decode("utf-8") != _RELEASE_SCRIPT:
+            raise CacheError("EVAL supports only the fill-lock release script")
+        key, token = args[2], args[3]
+        if self._live(key) == token:
+            del self._data[key]
+            return 1
+        return 0
+
+    def _set(self, args: List[bytes]) -> Any:
+        key, value, opts = args[0], args[1], [a.decode("utf-8").upper() for a in args[2:]]
+        expires = None
+        if "EX" in opts:
+            expires = time.monotonic() + float(opts[opts.index("EX") + 1])
+        if "PX" in opts:
+            expires = time.monotonic() + float(opts[opts.index("PX") + 1]) / 1000
+        exists = self._live(key) is not None
+        if ("NX" in opts and exists) or ("XX" in opts and not exists):
+            return None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+        return "OK"
+
+
+class _RespTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    db: _LocalDB
+
+
+class LocalRedisServer:
+    """
+    Pure-Python Redis-protocol server for tests and single-box deployments.
+    Not Redis: no persistence, and only PING/GET/SET/DEL/EXISTS/KEYS/SCAN/DBSIZE/FLUSHDB
+    (and EVAL of the fill-lock release script).
+
+        with LocalRedisServer() as server:
+            cache = RedisCache(port=server.port)
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, max_keys: int = CACHE_MAX_ENTRIES
+    ) -> None:
+        self._server = _RespTCPServer((host, port), _RespHandler)
+        self._server.db = _LocalDB(max_keys)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}"
+
+    def start(self) -> "LocalRedisServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalRedisServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ---------- factory ----------
+
+
+def open_cache(url: Optional[str] = None) -> Cache:
+    """
+    "memory" (default) -> LRUCache, "sqlite:///path/to.db" -> SqliteCache,
+    "redis://host:port[/prefix]" -> RedisCache. Defaults to THRILLER_CACHE.
+    """
+    url = url or os.getenv(CACHE_URL_ENV) or "memory"
+    if url == "memory":
+        return LRUCache()
+    if url.startswith("sqlite:///"):
+        return SqliteCache(url[len("sqlite:///") :])
+    if url.startswith("redis://"):
+        parsed = urlparse(url)
+        return RedisCache(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            prefix=parsed.path.strip("/") or "thriller",
+        )
+    raise ValueError(f"Unsupported cache URL: {url!r}")
+
+
+_ENV_CACHE: Optional[Cache] = None
+_ENV_CACHE_LOCK = threading.Lock()
+
+
+def cache_from_env() -> Optional[Cache]:
+    """The process-wide cache named by THRILLER_CACHE, or None when it is unset."""
+    global _ENV_CACHE
+    if not os.getenv(CACHE_URL_ENV):
+        return None
+    with _ENV_CACHE_LOCK:
+        if _ENV_CACHE is None:
+            _ENV_CACHE = open_cache()
+        return _ENV_CACHE
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the local Redis-protocol cache server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--max-keys", type=int, default=CACHE_MAX_ENTRIES)
+    args = parser.parse_args(argv)
+
+    server = LocalRedisServer(args.host, args.port, max_keys=args.max_keys)
+    print(f"Serving {server.url} (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
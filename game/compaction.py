@@ -0,0 +1,179 @@
+"""
+Rolling compaction of the game log.
+
+The raw `state.game_log` stays append-only and is persisted in full. Entries older
+than a window are folded into `summary` records (`state.log_summaries`) by a
+background worker, and the narrator only ever sees the compacted view.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game.config import (
+    LOG_COMPACT_CHUNK,
+    LOG_COMPACT_WINDOW,
+    LOG_SUMMARY_KEEP,
+    LOG_SUMMARY_MAX_CHARS,
+)
+from game.state import GameLogEntry, GameState
+
+# Takes a batch of raw entries and returns the summary text. Swap in a cheap model
+# call here if wanted; it always runs on the background worker, never in a turn.
+Summarizer = Callable[[List[GameLogEntry]], str]
+
+# Lower rank = more worth keeping when the summary budget runs out
+_CATEGORY_RANK = {
+    "decision": 0,
+    "discovery": 1,
+    "item": 2,
+    "event": 3,
+    "question": 4,
+    "ambient": 5,
+    "summary": 6,
+}
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+# Guards log_summaries/compacted_upto; compaction is rare so one lock is plenty
+_LOCK = threading.Lock()
+# Single low-priority worker: compaction jobs queue behind each other, not turns
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compactor")
+_PENDING: Dict[int, Future] = {}
+
+
+def extractive_summary(entries: List[GameLogEntry], max_chars: int = LOG_SUMMARY_MAX_CHARS) -> str:
+    """
+    Cheap local summarizer: the first sentence of the most important entries,
+    deduplicated and put back in story order.
+    """
+    ranked = sorted(
+        range(len(entries)), key=lambda i: (_CATEGORY_RANK.get(entries[i].category, 9), i)
+    )
+    seen = set()
+    picked = []
+    budget = max_chars
+    for i in ranked:
+        first = _SENTENCE_SPLIT.split(entries[i].entry.strip(), maxsplit=1)[0].strip()
+        key = first.lower()
+        if not first or key in seen or len(first) + 2 > budget:
+            continue
+        seen.add(key)
+        picked.append((i, first))
+        budget -= len(first) + 2
+    picked.sort()
+    return "; ".join(text for _, text in picked)
+
+
+def compact_log(
+    state: GameState,
+    window: int = LOG_COMPACT_WINDOW,
+    chunk: int = LOG_COMPACT_CHUNK,
+    summarizer: Optional[Summarizer] = None,
+) -> int:
+    """
+    Fold raw entries older than `window` into summary records, `chunk` at a time.
+    Returns the number of raw entries folded. Safe to run alongside a turn.
+    """
+    summarize = summarizer or extractive_summary
+    folded = 0
+    while True:
+        with _LOCK:
+            start = state.compacted_upto
+            if len(state.game_log) - window - start < chunk:
+                return folded
+            end = start + chunk
+            batch = state.game_log[start:end]
+
+        # The slow part runs without the lock so turns can keep appending
+        text = summarize(batch)
+
+        with _LOCK:
+            if (
+                state.compacted_upto != start
+                or len(state.game_log) < end
+                or state.game_log[end - 1] is not batch[-1]
+            ):
+                # Someone else compacted (or the log was rewound) meanwhile
+                return folded
+            state.log_summaries.append(
+                GameLogEntry(category="summary", entry=text, ts=batch[-1].ts)
+            )
+            state.compacted_upto = end
+        folded += len(batch)
+
+
+def schedule_compaction(
+    state: GameState,
+    window: int = LOG_COMPACT_WINDOW,
+    chunk: int = LOG_COMPACT_CHUNK,
+    summarizer: Optional[Summarizer] = None,
+) -> Optional[Future]:
+    """
+    Queue compaction on the background worker. Returns None when nothing is due,
+    or the already-queued job for this state instead of piling up duplicates.
+    """
+    if len(state.game_log) - window - state.compacted_upto < chunk:
+        return None
+
+    key = id(state)
+    with _LOCK:
+        fut = _PENDING.get(key)
+        if fut is not None and not fut.done():
+            return fut
+        fut = _EXECUTOR.submit(compact_log, state, window, chunk, summarizer)
+        _PENDING[key] = fut
+
+    def _forget(done: Future) -> None:
+        with _LOCK:
+            if _PENDING.get(key) is done:
+                del _PENDING[key]
+
+    fut.add_done_callback(_forget)
+    return fut
+
+
+def compaction_marks(state: GameState) -> Tuple[int, int]:
+    """Consistent (len(log_summaries), compacted_upto) pair for save points."""
+    with _LOCK:
+        return len(state.log_summaries), state.compacted_upto
+
+
+def rewind_compaction(state: GameState, summaries_len: int, compacted_upto: int) -> None:
+    """Drops summaries past a save point; safe against a compaction in progress."""
+    with _LOCK:
+        del state.log_summaries[summaries_len:]
+        state.compacted_upto = compacted_upto
+
+
+def narrator_log_view(
+    state: GameState,
+    window: int = LOG_COMPACT_WINDOW,
+    chunk: int = LOG_COMPACT_CHUNK,
+    keep: int = LOG_SUMMARY_KEEP,
+    upto: Optional[int] = None,
+) -> List[GameLogEntry]:
+    """
+    What the narrator sees: the newest summaries plus the raw tail. The tail is
+    capped too, so the view stays bounded even if compaction falls behind.
+    `upto` stops the tail early (entries after it are covered some other way).
+    """
+    with _LOCK:
+        summaries = state.log_summaries[-keep:] if keep > 0 else []
+        tail = state.game_log[state.compacted_upto : upto]
+    return summaries + tail[-(window + chunk) :]
+
+
+def raw_view_start(
+    state: GameState,
+    window: int = LOG_COMPACT_WINDOW,
+    chunk: int = LOG_COMPACT_CHUNK,
+    upto: Optional[int] = None,
+) -> int:
+    """Index of the oldest raw entry in narrator_log_view; older ones are only summarized."""
+    with _LOCK:
+        compacted = state.compacted_upto
+    end = len(state.game_log) if upto is None else min(upto, len(state.game_log))
+    return max(compacted, end - (window + chunk), 0)
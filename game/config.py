@@ -16,3 +16,96 @@ EXAMPLE_COMMANDS = ["Look around", "Check phone", "Open the door", "Run outside"
 
 # Default model configuration
 MODEL = "gpt-4"
+
+# Model tiering (game.tiering): cheap turns and lookups go to the fast tier
+MODEL_TIERS = {
+    "fast": os.getenv("THRILLER_FAST_MODEL", "gpt-4o-mini"),
+    "large": os.getenv("THRILLER_LARGE_MODEL", MODEL),
+}
+# Per-agent policy: "auto" (classify each call), "fast" or "large"
+AGENT_TIERS = {
+    "narrator": os.getenv("THRILLER_NARRATOR_TIER", "auto"),
+    "research": os.getenv("THRILLER_RESEARCH_TIER", "auto"),
+}
+# Narrator output budgets per turn type (game.budget): (floor, cap) max_tokens,
+# adapted within those bounds to keep turn latency under the SLO
+TURN_TOKEN_BOUNDS = {"command": (120, 400), "action": (200, 700), "cutscene": (300, 1200)}
+TURN_LATENCY_SLO_MS = {"command": 4000.0, "action": 7000.0, "cutscene": 12000.0}
+
+# USD per 1M (input, output) tokens, for per-tier cost reporting
+MODEL_PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+# Game log compaction (narrator context stays bounded; raw entries are still saved)
+LOG_COMPACT_WINDOW = 24  # newest raw entries always shown verbatim
+LOG_COMPACT_CHUNK = 12  # raw entries folded into one summary record
+LOG_SUMMARY_KEEP = 8  # newest summary records shown to the narrator
+LOG_SUMMARY_MAX_CHARS = 600
+
+# Conversation memory (game.memory): recent exchanges sent as message items
+MEMORY_TURNS = 6
+MEMORY_TOKEN_BUDGET = 1500
+
+# Log retrieval (game.retrieval): older entries most relevant to the player message
+RETRIEVAL_TOP_K = int(os.getenv("THRILLER_RETRIEVAL_K", "4") or 0)  # 0 disables
+RETRIEVAL_DIM = 2**16  # hashed feature space
+RETRIEVAL_MIN_SCORE = 0.1  # cosine similarity floor
+RETRIEVAL_MAX_CHARS = 280  # per recalled entry
+
+# Web sessions (game.sessions): live sessions per process, idle eviction, and how
+# much chat and log the browser is sent
+SESSION_MAX_ACTIVE = 256
+SESSION_IDLE_TTL_S = 30 * 60
+CHAT_WINDOW_MESSAGES = 40
+PANEL_LOG_ENTRIES = 12
+# How often an idle Streamlit tab checks for turns played in the player's other tabs
+TURN_POLL_S = 1.5
+# Smallest HTTP response worth gzipping in the web app
+GZIP_MIN_BYTES = 1024
+# How long browsers may reuse manifest/robots/sitemap/stylesheet before revalidating
+STATIC_MAX_AGE_S = 3600
+TITLE_IMAGE_PATH = "assets/EternalHuntTitle.png"
+
+# Write-ahead turn log (game.wal): fsync policy "op", "turn", "group" or "off", the
+# group-commit interval, and what recovery does with turns that never committed
+WAL_SYNC = os.getenv("THRILLER_WAL", "turn")
+WAL_GROUP_COMMIT_S = 0.2
+WAL_RECOVER_INCOMPLETE = os.getenv("THRILLER_WAL_RECOVER", "discard")  # or "replay"
+
+# Bulk session I/O (game.state.load_many/save_many): I/O threads, the file size from
+# which decoding moves to a process pool, and the progress file of an unfinished save
+BULK_IO_THREADS = 16
+BULK_DECODE_PROCESS_BYTES = 1 << 20
+BULK_PROGRESS_FILE = ".save_many.progress"
+
+# Analytics export (game.export): rows buffered per table before each write
+EXPORT_CHUNK_ROWS = 50_000
+
+# Tool argument limits (game.tools): characters kept per string argument, by name
+TOOL_ARG_MAX_CHARS = {"new_entry": 400, "item_name": 48, "description": 160, "query": 300}
+TOOL_ARG_DEFAULT_MAX_CHARS = 1000
+
+# Write-time log dedupe (game.dedupe): recent entries an entry is checked against,
+# the similarity from which it counts as a repeat, and the words per shingle
+DEDUPE_WINDOW = 8
+DEDUPE_SIMILARITY = 0.8
+DEDUPE_SHINGLE_WORDS = 2
+# Research answers at least this long are saved once in the save's blob table
+BLOB_MIN_CHARS = 512
+
+# Undo/branch save points kept per session (one per turn)
+HISTORY_DEPTH = 50
+
+# Sharded deployment (game.sharding): worker processes, and turn threads per worker
+SHARD_COUNT = int(os.getenv("THRILLER_SHARDS", "0") or 0)
+SHARD_WORKER_THREADS = 4
+# How workers are started: "spawn" is safe in a threaded front process (fork copies its locks)
+SHARD_START_METHOD = os.getenv("THRILLER_SHARD_START", "spawn")
+
+# Shared cache (game.cache): entry bound, default TTL, and how long a fill lock may be held
+CACHE_MAX_ENTRIES = 2048
+CACHE_TTL_S = 24 * 3600
+CACHE_LOCK_TTL_S = 60
@@ -0,0 +1,75 @@
+"""
+Near-duplicate detection for log entries, checked as they are written.
+
+An entry is reduced to a fingerprint: its words, case-folded, with filler words
+dropped and common suffixes cut ("Player is still hiding" -> player hid), hashed
+in overlapping shingles of DEDUPE_SHINGLE_WORDS words. Two entries are near
+duplicates when the Jaccard similarity of their fingerprints reaches
+DEDUPE_SIMILARITY. Fingerprints are cached by text, so checking an entry
+against the last DEDUPE_WINDOW entries costs a few set intersections.
+
+Research Q/A entries ("Q: ...\\nA: ...") are compared by their answer, so the
+bridge's record of an answer and the research agent's own note of it match.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Tuple
+
+from game.config import DEDUPE_SHINGLE_WORDS, DEDUPE_SIMILARITY
+
+_WORDS = re.compile(r"\w+")
+_SUFFIXES = ("ing", "es", "ed", "s")
+_FILLER = frozenset(
+    "a an the is are was were be been being still again now and or of to in on at it its".split()
+)
+# Where a research Q/A entry's answer starts
+ANSWER_MARK = "\nA: "
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def words(text: str) -> Tuple[str, ...]:
+    """The entry's significant words, case-folded and stemmed."""
+    return tuple(_stem(w) for w in _WORDS.findall(text.casefold()) if w not in _FILLER)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(text: str) -> FrozenSet[int]:
+    """CRC32s of the entry's word shingles (one shingle if it is shorter than that)."""
+    tokens = words(text)
+    if not tokens:
+        return frozenset()
+    k = min(DEDUPE_SHINGLE_WORDS, len(tokens))
+    return frozenset(
+        zlib.crc32(" ".join(tokens[i : i + k]).encode("utf-8")) for i in range(len(tokens) - k + 1)
+    )
+
+
+def answer(text: str) -> str:
+    """The answer part of a research Q/A entry; other entries as they are."""
+    _, mark, rest = text.partition(ANSWER_MARK)
+    return rest if mark else text
+
+
+def similarity(a: str, b: str) -> float:
+    fa, fb = fingerprint(a), fingerprint(b)
+    if not fa or not fb:
+        # Nothing but filler words: only the exact same words match
+        return float(_WORDS.findall(a.casefold()) == _WORDS.findall(b.casefold()))
+    return len(fa & fb) / len(fa | fb)
+
+
+def is_near_duplicate(
+    text: str, recent: Iterable[str], threshold: float = DEDUPE_SIMILARITY
+) -> bool:
+    """True when `text` says about the same as any of the `recent` texts."""
+    return any(similarity(text, other) >= threshold for other in recent)
@@ -5,28 +5,74 @@ Agent wiring + response entrypoint, with autosave after each turn.
 from __future__ import annotations
 
 import asyncio
+import copy
+import os
+import queue
 import re
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from agents import Agent, Runner
+from agents import Agent, ModelSettings, Runner
 
 from game.agents.narrator import make_narrator
 from game.agents.web_research import make_web_research_agent
-from game.state import GameState, default_state, load_state, save_state
+from game.budget import CONTINUE_PROMPT, TURN_BUDGETS, trim_to_sentence
+from game.compaction import schedule_compaction
+from game.config import HISTORY_DEPTH
+from game.history import SavePoint, Timeline
+from game.memory import ConversationMemory, Exchange, estimate_tokens
+from game.metrics import METRICS, record_usage, response_usage
+from game.recorder import (
+    ToolCallRecord,
+    TurnRecord,
+    TurnRecorder,
+    recorder_from_env,
+    state_digest,
+)
+from game.retrieval import LogIndex, index_path, load_index, recall, schedule_indexing
+from game.state import (
+    GameState,
+    _get_save_path,
+    default_state,
+    load_state,
+    use_state,
+)
+from game.store import StateStore
+from game.tiering import MODEL_ROUTER, Route, record_call
+from game.tools import observe_tool_calls
+from game.transaction import ChangeSet, TurnTransaction, transaction
+from game.transcript import Transcript
+from game.wal import Recovery, WriteAheadLog, recover, wal_path
 
 
 def autoload_state(path: Optional[str] = None) -> bool:
-    try:
-        load_state(path) if path else load_state()
-        return True
-    except FileNotFoundError:
+    """
+    Loads the saved game into default_state, then recovers turns from its
+    write-ahead log (game.wal) that never made it into the save.
+    """
+    resolved = _get_save_path(path)
+    wal = wal_path(resolved)
+    if os.path.exists(resolved):
+        load_state(resolved)
+    elif os.path.exists(wal):
+        default_state.replace_with(GameState())  # crashed before the first save
+    else:
         return False
+    report = recover(wal, default_state)
+    if report.replayed:
+        default_state.save_json(resolved)
+    if os.path.exists(wal):
+        os.remove(wal)
+    # Save points and remembered exchanges no longer describe default_state
+    _DEFAULT_SESSION.timeline.reset("loaded")
+    _DEFAULT_SESSION.memory.clear()
+    _DEFAULT_SESSION.index = load_index(index_path(resolved), default_state)
+    return True
 
 
 # Build the shared web research agent once per process
 _WEB: Agent = make_web_research_agent(default_state)
-# Build narrator (will be rebuilt per-turn with latest state)
-_NARRATOR: Agent = make_narrator(default_state, web_agent=_WEB)
 
 _TOOL_LEAK_PATTERNS = (
     # Common function-call “narration”
@@ -62,24 +108,419 @@ def _scrub_tool_meta(text: str) -> str:
     return text
 
 
-def respond_narrator(message: str) -> str:
+def _text_delta(event: Any) -> str:
+    """The text of a streamed output-text delta event; "" for every other event."""
+    if getattr(event, "type", "") != "raw_response_event":
+        return ""
+    data = getattr(event, "data", None)
+    if getattr(data, "type", "") != "response.output_text.delta":
+        return ""
+    return getattr(data, "delta", "") or ""
+
+
+async def _run_agent(
+    agent: Agent, turn_input: Any, on_delta: Optional[Callable[[str], None]] = None
+) -> Any:
+    """Runner.run, or a streamed run feeding `on_delta` text chunks as they arrive."""
+    if on_delta is None or not hasattr(Runner, "run_streamed"):
+        return await Runner.run(agent, turn_input)
+    result = Runner.run_streamed(agent, turn_input)
+    async for event in result.stream_events():
+        delta = _text_delta(event)
+        if delta:
+            on_delta(delta)
+    return result
+
+
+def _last_output_tokens(result: Any) -> int:
+    responses = getattr(result, "raw_responses", None) or []
+    usage = getattr(responses[-1], "usage", None) if responses else None
+    return getattr(usage, "output_tokens", 0) or 0
+
+
+async def _finish_truncated(
+    agent: Agent, message: str, result: Any, partial: str, max_tokens: int, usage: Dict[str, int]
+) -> str:
     """
-    - Rebuild narrator with latest state and injected web-agent tool
-    - Run one step
-    - Autosave state
+    Asks for the rest of a reply cut off at max_tokens (no tools, half the budget)
+    and trims whatever is still dangling back to a full sentence. Adds to `usage`.
     """
-    global _NARRATOR
-    _NARRATOR = make_narrator(default_state, web_agent=_WEB)
+    follow = copy.copy(agent)
+    follow.tools = []
+    follow.model_settings = ModelSettings(max_tokens=max(max_tokens // 2, 64))
+    to_input_list = getattr(result, "to_input_list", None)
+    if callable(to_input_list):
+        prompt: Any = to_input_list() + [{"role": "user", "content": CONTINUE_PROMPT}]
+    else:
+        prompt = f"{message}\n\nYour reply so far:\n{partial}\n\n{CONTINUE_PROMPT}"
+    try:
+        more = await Runner.run(follow, prompt)
+    except Exception:
+        return trim_to_sentence(partial)
+    for key, value in response_usage(more).items():
+        usage[key] += value
+    rest = str(getattr(more, "final_output", more)).strip()
+    return trim_to_sentence(f"{partial.rstrip()} {rest}")
 
-    result = _run_sync(Runner.run(_NARRATOR, message))
 
-    try:
-        save_state()
-    except Exception as e:
-        print(f"[autosave warning] {e}")
+def _covered(spans: List[Tuple[float, float]]) -> float:
+    """Seconds covered by (start, end) spans; nested or parallel calls count once."""
+    total, reach = 0.0, float("-inf")
+    for start, end in sorted(spans):
+        if end > reach:
+            total += end - max(start, reach)
+            reach = end
+    return total
+
+
+async def run_turn(
+    agent: Agent,
+    state: GameState,
+    message: str,
+    recorder: Optional[TurnRecorder] = None,
+    session: str = "default",
+    txn: Optional[TurnTransaction] = None,
+    route: Optional[Route] = None,
+    max_tokens: Optional[int] = None,
+    history: Optional[List[Dict[str, Any]]] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Runs one narrator step with tools bound to `state` and returns the scrubbed reply.
+    Tool mutations are staged in `txn` and committed together when the step succeeds.
+    `route` is the model tier the agent was built for; its latency and cost are reported.
+    A reply cut off at `max_tokens` is finished by a short continuation (see game.budget).
+    `history` holds earlier exchanges as message items; the model gets them plus `message`.
+    With `on_delta` the reply is streamed: it gets raw text chunks as they arrive.
+    When a recorder is given, the whole turn is captured for offline replay.
+    """
+    calls: List[ToolCallRecord] = []
+    # When each tool call ran: the token budget only sees the narrator's own time
+    spans: List[Tuple[float, float]] = []
+
+    def _on_tool(name: str, args: Dict[str, Any], result: str, elapsed: float) -> None:
+        now = time.perf_counter()
+        spans.append((now - elapsed, now))
+        if recorder is not None:
+            calls.append(
+                ToolCallRecord(name=name, args=args, result=str(result), ms=elapsed * 1000)
+            )
+
+    started = time.perf_counter()
+    with (
+        use_state(state),
+        transaction(txn or TurnTransaction(state)),
+        observe_tool_calls(_on_tool),
+    ):
+        turn_input: Any = [*history, {"role": "user", "content": message}] if history else message
+        result = await _run_agent(agent, turn_input, on_delta)
+    # Generation time: the agent run, less its tool calls (research) and any continuation
+    generation_ms = ((time.perf_counter() - started) - _covered(spans)) * 1000
+    usage = response_usage(result)
+    raw = str(getattr(result, "final_output", result))
+    truncated = bool(max_tokens) and _last_output_tokens(result) >= max_tokens
+    if truncated:
+        raw = await _finish_truncated(agent, message, result, raw, max_tokens or 0, usage)
+    ms = (time.perf_counter() - started) * 1000
+    record_usage("narrator", usage)
+    if route is not None:
+        record_call(route, ms, usage)
+        if route.turn_type in TURN_BUDGETS:
+            TURN_BUDGETS.observe(route.turn_type, generation_ms, usage["output_tokens"], truncated)
+    reply = _scrub_tool_meta(raw)
+
+    if recorder is not None:
+        recorder.record(
+            TurnRecord(
+                session=session,
+                turn=recorder.next_turn(session),
+                input=message,
+                prompt=str(getattr(agent, "instructions", "")),
+                raw_output=str(raw),
+                output=reply,
+                ms=ms,
+                state=state_digest(state),
+                tool_calls=calls,
+                usage=usage,
+                model=str(getattr(agent, "model", "")),
+                max_tokens=max_tokens or 0,
+            )
+        )
+    return reply
+
+
+class Session:
+    """
+    One player's game: its state, undo/branch save points, and the turn pipeline.
+    Autosaves to `store` under session_id when given; otherwise to `save_path`,
+    where None means THRILLER_SAVE_PATH (resolved at save time).
+    """
 
-    raw = getattr(result, "final_output", str(result))
-    return _scrub_tool_meta(raw)
+    def __init__(
+        self,
+        state: Optional[GameState] = None,
+        session_id: str = "default",
+        save_path: Optional[str] = None,
+        autosave: bool = True,
+        history_depth: int = HISTORY_DEPTH,
+        web_agent: Optional[Agent] = None,
+        timeline: Optional[Timeline] = None,
+        store: Optional[StateStore] = None,
+        memory: Optional[ConversationMemory] = None,
+    ) -> None:
+        self.session_id = session_id
+        self.state = state if state is not None else GameState()
+        self.save_path = save_path
+        self.store = store
+        self.autosave = autosave
+        self.timeline = timeline or Timeline(self.state, depth=history_depth)
+        self.memory = memory if memory is not None else ConversationMemory()
+        # Canonical chat history; UIs only ever get windows of it (game.transcript)
+        self.transcript = Transcript()
+        # Transcript length as of each save point's turn, to cut it back on undo/rewind
+        self._chat_marks: Dict[int, int] = {}
+        # Retrieval over older log entries, saved alongside the state (game.retrieval)
+        self.index: LogIndex = load_index(self._index_path(), self.state)
+        self.web_agent = web_agent or make_web_research_agent(self.state)
+        # Rebuilt every turn with the latest state
+        self.narrator: Agent = make_narrator(self.state, web_agent=self.web_agent)
+        # What the last turn changed, and who wants to hear about each turn's changes
+        self.last_changes: Optional[ChangeSet] = None
+        self._listeners: List[Callable[[ChangeSet], None]] = []
+        # Tool mutations are written ahead here until the turn is saved (game.wal)
+        self.wal: Optional[WriteAheadLog] = None
+
+    def add_listener(self, listener: Callable[[ChangeSet], None]) -> None:
+        """Calls `listener(changes)` after every committed turn (e.g. UI side panels)."""
+        self._listeners.append(listener)
+
+    async def respond_async(
+        self, message: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        - Rebuild narrator with latest state, injected web-agent tool, the model
+          tier chosen for this message (game.tiering) and its token budget (game.budget)
+        - Send the remembered exchanges (game.memory) along with the message, and
+          recall older log entries relevant to it (game.retrieval)
+        - Run one step (recorded when THRILLER_RECORD_PATH is set; streamed to
+          `on_delta` when given); its tool mutations are written ahead (game.wal)
+          and land together as one ChangeSet
+        - Take a save point, autosave the change-set, notify listeners
+        - Queue background log compaction and indexing (never block the turn)
+        Recall, the write-ahead log's fsync and the save run on worker threads: turns
+        of many players may share one event loop (game.sessions.TURN_LOOP).
+        """
+        route = MODEL_ROUTER.route("narrator", message)
+        max_tokens = TURN_BUDGETS.max_tokens(route.turn_type)
+        window = self.memory.window()
+        history = ConversationMemory.as_items(window)
+        log_upto = ConversationMemory.log_cutoff(window)
+        recalled = await asyncio.to_thread(
+            recall, self.index, self.state, message, log_upto=log_upto
+        )
+        self.narrator = make_narrator(
+            self.state,
+            web_agent=self.web_agent,
+            model=route.model,
+            max_tokens=max_tokens,
+            log_upto=log_upto,
+            recalled=recalled,
+        )
+        METRICS.observe(
+            "turn.prompt_tokens_est",
+            estimate_tokens(self.narrator.instructions)
+            + sum(estimate_tokens(item["content"]) for item in history)
+            + estimate_tokens(message),
+        )
+        log_start = len(self.state.game_log)
+        wal = self._wal()
+        journal = wal.journal(self.state, defer_sync=True) if wal else None
+        txn = TurnTransaction(self.state, journal=journal)
+        reply = await run_turn(
+            self.narrator,
+            self.state,
+            message,
+            recorder=recorder_from_env(),
+            session=self.session_id,
+            txn=txn,
+            route=route,
+            max_tokens=max_tokens,
+            history=history,
+            on_delta=on_delta,
+        )
+        if wal is not None and wal.sync == "turn":
+            await asyncio.to_thread(wal.flush)  # the commit fsync deferred above
+        changes = txn.changes or ChangeSet()
+        self.last_changes = changes
+        self._chat_marks.setdefault(self.timeline.current.turn, len(self.transcript))
+        point = self.timeline.checkpoint(message)
+        self.memory.add(Exchange(point.turn, message, reply, log_start))
+        self.transcript.add("user", message)
+        self.transcript.add("assistant", reply)
+        self._chat_marks[point.turn] = len(self.transcript)
+        oldest = self.timeline.points()[0].turn
+        for turn in [t for t in self._chat_marks if t < oldest]:
+            del self._chat_marks[turn]
+        await asyncio.to_thread(self.save, changes)
+        _count_changes(changes)
+        for listener in self._listeners:
+            listener(changes)
+        schedule_compaction(self.state)
+        return reply
+
+    def respond(self, message: str) -> str:
+        return _run_sync(self.respond_async(message))
+
+    def stream(self, message: str) -> Iterator[str]:
+        """
+        Runs a turn, yielding the reply so far as it streams in. The last value is
+        the finished (scrubbed) reply, which may differ from the raw stream.
+        """
+        chunks: "queue.Queue[Optional[str]]" = queue.Queue()
+        outcome: Dict[str, Any] = {}
+
+        def _work() -> None:
+            try:
+                outcome["reply"] = _run_sync(self.respond_async(message, on_delta=chunks.put))
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                chunks.put(None)
+
+        threading.Thread(target=_work, name=f"turn-{self.session_id}", daemon=True).start()
+        text = ""
+        while (chunk := chunks.get()) is not None:
+            text += chunk
+            yield text
+        if "error" in outcome:
+            raise outcome["error"]
+        yield outcome["reply"]
+
+    def save(self, changes: Optional[ChangeSet] = None) -> None:
+        """
+        Autosaves; with a turn's `changes` the store can write just those. The log
+        index catches up (and is saved next to the save file) in the background.
+        Once saved, the write-ahead log is no longer needed.
+        """
+        schedule_indexing(self.index, self.state, self._index_path())
+        if not self.autosave:
+            return
+        try:
+            if self.store is not None and changes is not None:
+                self.store.save_changes(self.session_id, self.state, changes)
+            elif self.store is not None:
+                self.store.save(self.session_id, self.state)
+            else:
+                self.state.save_json(_get_save_path(self.save_path))
+        except Exception as e:
+            print(f"[autosave warning] {e}")
+            return
+        if self.wal is not None:
+            self.wal.checkpoint()
+
+    def _save_file(self) -> Optional[str]:
+        """This session's save file; None when it has none to put side files next to."""
+        if not self.autosave:
+            return None
+        if self.store is None:
+            return _get_save_path(self.save_path)
+        path_for = getattr(self.store, "path_for", None)
+        return path_for(self.session_id) if path_for else None
+
+    def _index_path(self) -> Optional[str]:
+        save = self._save_file()
+        return index_path(save) if save else None
+
+    def _wal(self) -> Optional[WriteAheadLog]:
+        """The write-ahead log next to the save file (which may follow THRILLER_SAVE_PATH)."""
+        save = self._save_file()
+        if save is None:
+            return None
+        if self.wal is None or self.wal.path != wal_path(save):
+            if self.wal is not None:
+                self.wal.close()
+            self.wal = WriteAheadLog(wal_path(save))
+        return self.wal
+
+    def recover_turns(self) -> Recovery:
+        """
+        Replays turns from the write-ahead log that the loaded state is missing
+        (game.wal), saves, and clears the log. Call right after loading.
+        """
+        wal = self._wal()
+        if wal is None:
+            return Recovery()
+        report = recover(wal.path, self.state)
+        if report.replayed:
+            self.timeline.reset("recovered")
+            self.save()
+        else:
+            wal.checkpoint()
+        return report
+
+    # ---------- undo / branch ----------
+    def undo(self) -> Optional[SavePoint]:
+        """Rolls back the last turn (and autosaves). None when there is nothing to undo."""
+        point = self.timeline.undo()
+        if point is not None:
+            self._truncate_to(point.turn)
+            self.save()
+        return point
+
+    def rewind(self, turn: int) -> SavePoint:
+        """Returns this session to `turn`; later save points are discarded."""
+        point = self.timeline.rewind(turn)
+        self._truncate_to(point.turn)
+        self.save()
+        return point
+
+    def _truncate_to(self, turn: int) -> None:
+        """Memory and chat transcript back to how they were at `turn`."""
+        self.memory.truncate(turn)
+        if turn in self._chat_marks:
+            self.transcript.truncate(self._chat_marks[turn])
+        for later in [t for t in self._chat_marks if t > turn]:
+            del self._chat_marks[later]
+
+    def branch(
+        self, turn: int, session_id: Optional[str] = None, save_path: Optional[str] = None
+    ) -> "Session":
+        """
+        Starts a new session from this one's `turn`, leaving this session untouched.
+        The branch autosaves to this session's store, or to its own save_path if given.
+        """
+        state, timeline = self.timeline.fork(turn)
+        return Session(
+            state,
+            session_id=session_id or f"{self.session_id}@{turn}",
+            save_path=save_path,
+            autosave=self.store is not None or save_path is not None,
+            timeline=timeline,
+            store=self.store,
+            memory=self.memory.copy(upto_turn=turn),
+        )
+
+
+def _count_changes(changes: ChangeSet) -> None:
+    METRICS.incr("turn.commits")
+    METRICS.incr("turn.game_log_entries", len(changes.game_log))
+    METRICS.incr("turn.research_log_entries", len(changes.research_log))
+    METRICS.incr("turn.items_added", len(changes.items_added))
+    METRICS.incr("turn.items_removed", len(changes.items_removed))
+    METRICS.incr("turn.mutations_dropped", changes.dropped)
+
+
+# The single-player session behind respond_narrator (wraps default_state)
+_DEFAULT_SESSION = Session(default_state, web_agent=_WEB)
+
+
+def get_default_session() -> Session:
+    return _DEFAULT_SESSION
+
+
+def respond_narrator(message: str) -> str:
+    """Runs one turn of the default session; see Session.respond_async."""
+    return _DEFAULT_SESSION.respond(message)
 
 
 def get_state_snapshot() -> Dict[str, Any]:
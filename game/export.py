@@ -0,0 +1,222 @@
+"""
+Columnar export of saved sessions for analytics.
+
+Walks one or more directories for save files and writes three tables, one row
+per log entry or item, tagged with the session it came from:
+
+- game_log(session, seq, category, entry, ts)
+- research_log(session, seq, category, entry, ts)
+- items(session, seq, name, description)
+
+Formats: "csv" (always available), or "parquet" / "arrow" (Arrow IPC) when
+pyarrow is installed; "auto" picks parquet if it can, else csv. Files are parsed
+by a pool of processes with the streaming save reader (game.migrations), and
+rows are written in chunks of EXPORT_CHUNK_ROWS as the files come back, so memory
+holds a chunk per table and a small window of files in flight, never the corpus.
+
+    python -m game.export assets/sample_runs /srv/thriller/sessions --out exports/
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from multiprocessing.pool import AsyncResult
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from game.config import EXPORT_CHUNK_ROWS
+from game.migrations import read_save, unpack_entry, upgrade
+
+# Columns per table; `session` and `seq` come first in each
+TABLES: Dict[str, Tuple[str, ...]] = {
+    "game_log": ("session", "seq", "category", "entry", "ts"),
+    "research_log": ("session", "seq", "category", "entry", "ts"),
+    "items": ("session", "seq", "name", "description"),
+}
+FORMATS = ("auto", "csv", "parquet", "arrow")
+
+Rows = Dict[str, List[Tuple[Any, ...]]]
+
+
+def _pyarrow() -> Any:
+    """The pyarrow module, or None when it isn't installed."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def iter_save_files(roots: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """(session, path) for every .json save under `roots`; session is the path under its root."""
+    for root in roots:
+        for folder, dirs, files in os.walk(root):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    path = os.path.join(folder, name)
+                    session = os.path.relpath(path, root)[: -len(".json")].replace(os.sep, "/")
+                    yield session, path
+
+
+def read_rows(job: Tuple[str, str]) -> Tuple[str, Rows, str]:
+    """(session, rows by table, error) for one save; runs in the reader processes."""
+    session, path = job
+    rows: Rows = {table: [] for table in TABLES}
+    blobs: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            version, records = read_save(f)
+            for section, value in upgrade(records, version):
+                if section == "blobs":
+                    blobs[value["id"]] = value["text"]
+                    continue
+                if section == "research_log":
+                    value = unpack_entry(value, blobs)
+                columns = TABLES.get(section)
+                if columns is None:
+                    continue
+                out = rows[section]
+                out.append((session, len(out), *(value.get(c) for c in columns[2:])))
+    except Exception as e:  # a malformed record fails its session, not the export
+        return session, {}, f"{type(e).__name__}: {e}"
+    return session, rows, ""
+
+
+# ---------- writers ----------
+
+
+class _CsvTable:
+    def __init__(self, path: str, columns: Tuple[str, ...]) -> None:
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(columns)
+
+    def write(self, rows: List[Tuple[Any, ...]]) -> None:
+        self._csv.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowTable:
+    def __init__(self, pa: Any, path: str, columns: Tuple[str, ...], fmt: str) -> None:
+        types = {"session": pa.string(), "seq": pa.int64(), "ts": pa.float64()}
+        self._pa = pa
+        self._schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, self._schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write(self, rows: List[Tuple[Any, ...]]) -> None:
+        columns = list(zip(*rows))
+        arrays = [self._pa.array(values, type=f.type) for values, f in zip(columns, self._schema)]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _open_tables(out: str, fmt: str) -> Dict[str, Any]:
+    os.makedirs(out, exist_ok=True)
+    if fmt == "csv":
+        return {t: _CsvTable(os.path.join(out, f"{t}.csv"), c) for t, c in TABLES.items()}
+    pa = _pyarrow()
+    if pa is None:
+        raise RuntimeError(f"Exporting as {fmt} needs pyarrow; use --format csv")
+    ext = "parquet" if fmt == "parquet" else "arrow"
+    return {t: _ArrowTable(pa, os.path.join(out, f"{t}.{ext}"), c, fmt) for t, c in TABLES.items()}
+
+
+# ---------- export ----------
+
+
+@dataclass
+class ExportReport:
+    format: str
+    sessions: int = 0
+    rows: Dict[str, int] = field(default_factory=lambda: {t: 0 for t in TABLES})
+    failed: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def export(
+    roots: Iterable[str],
+    out: str,
+    fmt: str = "auto",
+    workers: Optional[int] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> ExportReport:
+    """Exports every save under `roots` to the three tables in `out`."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    if fmt == "auto":
+        fmt = "parquet" if _pyarrow() is not None else "csv"
+    started = time.perf_counter()
+    report = ExportReport(fmt)
+    tables = _open_tables(out, fmt)
+    pending: Rows = {t: [] for t in TABLES}
+
+    def flush(table: str) -> None:
+        if pending[table]:
+            tables[table].write(pending[table])
+            report.rows[table] += len(pending[table])
+            pending[table] = []
+
+    def collect(result: Tuple[str, Rows, str]) -> None:
+        session, rows, error = result
+        if error:
+            report.failed[session] = error
+            return
+        report.sessions += 1
+        for table, new in rows.items():
+            pending[table].extend(new)
+            if len(pending[table]) >= chunk_rows:
+                flush(table)
+
+    try:
+        with mp.Pool(workers) as pool:
+            # A bounded window of files in flight: parsed rows never pile up
+            # faster than they are written (Pool.imap would queue them all)
+            window = 4 * (workers or os.cpu_count() or 1)
+            inflight: Deque[AsyncResult] = deque()
+            for job in iter_save_files(roots):
+                inflight.append(pool.apply_async(read_rows, (job,)))
+                if len(inflight) >= window:
+                    collect(inflight.popleft().get())
+            while inflight:
+                collect(inflight.popleft().get())
+        for table in TABLES:
+            flush(table)
+    finally:
+        for writer in tables.values():
+            writer.close()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export saved sessions as columnar tables.")
+    parser.add_argument("roots", nargs="+", help="directories to search for .json saves")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--format", choices=FORMATS, default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="reader processes")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    report = export(args.roots, args.out, args.format, args.workers, args.chunk_rows)
+    print(json.dumps(asdict(report), indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
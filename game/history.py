@@ -0,0 +1,134 @@
+"""
+Per-turn save points for undo and branching.
+
+Logs are append-only, so a save point only records their lengths: the live
+lists are the shared structure and a snapshot is a watermark into them. The
+inventory shares an immutable tuple (see state.Inventory). Taking a save point
+is O(1) in time and memory; restoring truncates back to the watermarks.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+from game.compaction import compaction_marks, rewind_compaction
+from game.config import HISTORY_DEPTH
+from game.state import GameState, Inventory, InventoryItem
+
+
+@dataclass(frozen=True)
+class SavePoint:
+    turn: int
+    label: str
+    game_log_len: int
+    research_log_len: int
+    summaries_len: int
+    compacted_upto: int
+    items: Tuple[InventoryItem, ...] = field(repr=False)
+
+
+class Timeline:
+    """Bounded stack of save points over one GameState (newest last)."""
+
+    def __init__(self, state: GameState, depth: int = HISTORY_DEPTH) -> None:
+        self.state = state
+        self._points: Deque[SavePoint] = deque(maxlen=max(depth, 1))
+        self._turn = 0
+        self.checkpoint("start")
+
+    # ---------- taking save points ----------
+    def checkpoint(self, label: str = "") -> SavePoint:
+        """Records the current state as the save point for the turn just played."""
+        state = self.state
+        items = state.items
+        summaries_len, compacted_upto = compaction_marks(state)
+        point = SavePoint(
+            turn=self._turn,
+            label=label,
+            game_log_len=len(state.game_log),
+            research_log_len=len(state.research_log),
+            summaries_len=summaries_len,
+            compacted_upto=compacted_upto,
+            items=items.frozen() if isinstance(items, Inventory) else tuple(items),
+        )
+        self._points.append(point)
+        self._turn += 1
+        return point
+
+    def reset(self, label: str = "start") -> None:
+        """Forgets all save points, e.g. after the state was replaced by a load."""
+        self._points.clear()
+        self._turn = 0
+        self.checkpoint(label)
+
+    # ---------- queries ----------
+    @property
+    def current(self) -> SavePoint:
+        return self._points[-1]
+
+    def points(self) -> List[SavePoint]:
+        return list(self._points)
+
+    def find(self, turn: int) -> Optional[SavePoint]:
+        for point in self._points:
+            if point.turn == turn:
+                return point
+        return None
+
+    # ---------- moving around ----------
+    def undo(self) -> Optional[SavePoint]:
+        """Rolls back the last turn. Returns the restored save point, or None if at the start."""
+        if len(self._points) < 2:
+            return None
+        self._points.pop()
+        point = self._points[-1]
+        self._restore(point)
+        return point
+
+    def rewind(self, turn: int) -> SavePoint:
+        """Restores the live state to `turn` and drops the save points after it."""
+        point = self.find(turn)
+        if point is None:
+            raise ValueError(f"Turn {turn} is not in the undo history")
+        while self._points[-1] is not point:
+            self._points.pop()
+        self._restore(point)
+        return point
+
+    def fork(self, turn: int) -> Tuple[GameState, "Timeline"]:
+        """
+        Returns a new state (and timeline) as of `turn`, leaving this one untouched.
+        Entries are shared with the original; only the list spines are copied.
+        """
+        point = self.find(turn)
+        if point is None:
+            raise ValueError(f"Turn {turn} is not in the undo history")
+        src = self.state
+        state = GameState(
+            game_log=src.game_log[: point.game_log_len],
+            research_log=src.research_log[: point.research_log_len],
+            items=Inventory(point.items),
+            log_summaries=src.log_summaries[: point.summaries_len],
+            compacted_upto=point.compacted_upto,
+        )
+        timeline = Timeline(state, depth=self._points.maxlen or HISTORY_DEPTH)
+        timeline._points = deque(
+            (p for p in self._points if p.turn <= turn), maxlen=self._points.maxlen
+        )
+        timeline._turn = turn + 1
+        return state, timeline
+
+    def _restore(self, point: SavePoint) -> None:
+        state = self.state
+        if len(state.game_log) < point.game_log_len or len(state.research_log) < (
+            point.research_log_len
+        ):
+            raise ValueError("Game logs were truncated outside the timeline; cannot restore")
+        rewind_compaction(state, point.summaries_len, point.compacted_upto)
+        del state.game_log[point.game_log_len :]
+        del state.research_log[point.research_log_len :]
+        state.items[:] = point.items
+        if isinstance(state.items, Inventory):
+            state.items._frozen = point.items
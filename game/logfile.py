@@ -0,0 +1,232 @@
+"""
+Indexed, memory-mapped log files for large archived sessions.
+
+Layout (all integers little-endian):
+
+    b"THLOG01\\n"                      magic
+    <entry JSON>\\n ...                one compact JSON record per log entry
+    <category names JSON>\\n           e.g. ["event", "decision"]
+    uint64[count]                      byte offset of each record
+    uint8[count]                       category code of each record
+    uint64 cats_offset, uint64 index_offset, uint64 count, b"THLOGEND"
+
+A LogFileReader maps the file and only decodes the records you ask for, so
+len(), tail(n), slicing and category filters cost the same on a 100-entry log
+as on a 10-million-entry one.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import asdict
+from typing import Any, Generic, Iterable, Iterator, List, Optional, Type, TypeVar, Union, overload
+
+from game.state import GameLogEntry, GameState, InventoryItem, ResearchLogEntry
+
+MAGIC = b"THLOG01\n"
+END_MAGIC = b"THLOGEND"
+_FOOTER = struct.Struct("<QQQ8s")
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+E = TypeVar("E", GameLogEntry, ResearchLogEntry)
+
+
+def write_log_file(path: str, entries: Iterable[Any]) -> int:
+    """Writes entries (dataclasses with a `category`) atomically; returns the count."""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    offsets = array("Q")
+    codes = bytearray()
+    categories: dict = {}
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        pos = len(MAGIC)
+        for e in entries:
+            code = categories.setdefault(e.category, len(categories))
+            if code > 255:
+                raise ValueError("Too many distinct categories for the index")
+            # vars() rather than asdict(): entries are flat and asdict deep-copies
+            line = _ENCODE(vars(e)).encode()
+            offsets.append(pos)
+            codes.append(code)
+            f.write(line + b"\n")
+            pos += len(line) + 1
+        cats_offset = pos
+        names = sorted(categories, key=categories.__getitem__)
+        cats = json.dumps(names).encode() + b"\n"
+        f.write(cats)
+        index_offset = cats_offset + len(cats)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        f.write(offsets.tobytes())
+        f.write(bytes(codes))
+        f.write(_FOOTER.pack(cats_offset, index_offset, len(offsets), END_MAGIC))
+    os.replace(tmp, path)
+    return len(offsets)
+
+
+class LogFileReader(Generic[E]):
+    """Random-access, read-only view of a log file written by write_log_file."""
+
+    def __init__(self, path: str, entry_type: Type[E] = GameLogEntry) -> None:  # type: ignore[assignment]
+        self.path = path
+        self.entry_type = entry_type
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a log file: {path}")
+        mm = self._mm
+        if len(mm) < len(MAGIC) + _FOOTER.size or mm[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a log file: {path}")
+        cats_offset, index_offset, count, end = _FOOTER.unpack_from(mm, len(mm) - _FOOTER.size)
+        if end != END_MAGIC:
+            self.close()
+            raise ValueError(f"Truncated log file: {path}")
+        self._count = count
+        self._records_end = cats_offset
+        self._index = index_offset
+        self._codes = index_offset + 8 * count
+        self.categories: List[str] = json.loads(mm[cats_offset:index_offset])
+
+    # ---------- lifecycle ----------
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "LogFileReader[E]":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---------- random access ----------
+    def __len__(self) -> int:
+        return self._count
+
+    def _offset(self, i: int) -> int:
+        return struct.unpack_from("<Q", self._mm, self._index + 8 * i)[0]
+
+    def _read(self, i: int) -> E:
+        start = self._offset(i)
+        end = self._offset(i + 1) if i + 1 < self._count else self._records_end
+        return self.entry_type(**json.loads(self._mm[start : end - 1]))
+
+    @overload
+    def __getitem__(self, key: int) -> E: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> List[E]: ...
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[E, List[E]]:
+        if isinstance(key, slice):
+            return [self._read(i) for i in range(*key.indices(self._count))]
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError("log index out of range")
+        return self._read(key)
+
+    def __iter__(self) -> Iterator[E]:
+        for i in range(self._count):
+            yield self._read(i)
+
+    def tail(self, n: int) -> List[E]:
+        return self[max(self._count - n, 0) :] if n > 0 else []
+
+    # ---------- category index ----------
+    def _code(self, category: str) -> Optional[int]:
+        try:
+            return self.categories.index(category)
+        except ValueError:
+            return None
+
+    def positions(self, category: str) -> Iterator[int]:
+        """Indexes of entries in `category`, found from the code table alone."""
+        code = self._code(category)
+        if code is None:
+            return
+        needle = bytes([code])
+        mm, base, end = self._mm, self._codes, self._codes + self._count
+        pos = mm.find(needle, base, end)
+        while pos != -1:
+            yield pos - base
+            pos = mm.find(needle, pos + 1, end)
+
+    def filter(self, category: str) -> Iterator[E]:
+        for i in self.positions(category):
+            yield self._read(i)
+
+    def count(self, category: str) -> int:
+        code = self._code(category)
+        if code is None:
+            return 0
+        return self._mm[self._codes : self._codes + self._count].count(bytes([code]))
+
+
+# ---------- whole-session archives ----------
+
+GAME_LOG_FILE = "game_log.thlog"
+RESEARCH_LOG_FILE = "research_log.thlog"
+META_FILE = "meta.json"
+
+
+def archive_state(state: GameState, directory: str) -> None:
+    """Writes both logs as indexed files plus the small parts (items, summaries) as JSON."""
+    os.makedirs(directory, exist_ok=True)
+    write_log_file(os.path.join(directory, GAME_LOG_FILE), state.game_log)
+    write_log_file(os.path.join(directory, RESEARCH_LOG_FILE), state.research_log)
+    meta = {
+        "items": [asdict(i) for i in state.items],
+        "log_summaries": [asdict(e) for e in state.log_summaries],
+        "compacted_upto": state.compacted_upto,
+    }
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+class SessionArchive:
+    """Opens an archive_state() directory without decoding the logs."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.game_log: LogFileReader[GameLogEntry] = LogFileReader(
+            os.path.join(directory, GAME_LOG_FILE), GameLogEntry
+        )
+        self.research_log: LogFileReader[ResearchLogEntry] = LogFileReader(
+            os.path.join(directory, RESEARCH_LOG_FILE), ResearchLogEntry
+        )
+
+    @property
+    def items(self) -> List[InventoryItem]:
+        return [InventoryItem(**i) for i in self.meta.get("items", [])]
+
+    def to_state(self) -> GameState:
+        """Materializes the full GameState, e.g. to resume play."""
+        state = GameState.from_dict(self.meta)
+        state.game_log.extend(self.game_log)
+        state.research_log.extend(self.research_log)
+        state.compacted_upto = min(int(self.meta.get("compacted_upto", 0)), len(state.game_log))
+        return state
+
+    def close(self) -> None:
+        self.game_log.close()
+        self.research_log.close()
+
+    def __enter__(self) -> "SessionArchive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,45 @@
+"""
+Long-lived event loops on daemon threads.
+
+Work that must outlive whichever caller started it (a turn a browser tab let go
+of, a research call other sessions are waiting on) runs here rather than on a
+caller's `asyncio.run` loop, which closes when that caller is done.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class LoopThread:
+    """One event loop on a daemon thread, started on first use."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(
+        self, coro: Coroutine[Any, Any, Any], context: Optional[contextvars.Context] = None
+    ) -> Future:
+        """
+        Runs `coro` on the loop; cancelling the returned future cancels it. The task
+        runs in `context` (default: a copy of the caller's, as asyncio does).
+        """
+        loop = self._loop or self._start()
+        if context is None:
+            return asyncio.run_coroutine_threadsafe(coro, loop)
+        # The loop's task copies the context current when this is scheduled
+        return context.run(asyncio.run_coroutine_threadsafe, coro, loop)
@@ -0,0 +1,98 @@
+"""
+Per-session conversation memory: the last few exchanges as real message items.
+
+Instead of relying only on the game-log dump in the instructions, each turn sends
+the newest exchanges (player message + narrator reply) as input items, trimmed
+to a token budget. Log entries written during those remembered turns are left
+out of the instructions' log view, so nothing is sent twice.
+
+Memory follows the session's timeline: undo/rewind forget the exchanges after
+the restored turn, and a branch starts with a copy up to its turn.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from game.config import MEMORY_TOKEN_BUDGET, MEMORY_TURNS
+
+# Rough token estimate; good enough for budgeting English prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass(frozen=True)
+class Exchange:
+    turn: int  # the save point taken after this exchange (history.Timeline)
+    user: str
+    assistant: str
+    log_start: int  # len(game_log) before the turn ran
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.user) + estimate_tokens(self.assistant)
+
+
+class ConversationMemory:
+    """The last `max_turns` exchanges, of which the newest within `token_budget` are sent."""
+
+    def __init__(
+        self, max_turns: int = MEMORY_TURNS, token_budget: int = MEMORY_TOKEN_BUDGET
+    ) -> None:
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self._exchanges: Deque[Exchange] = deque(maxlen=max(max_turns, 1))
+
+    def __len__(self) -> int:
+        return len(self._exchanges)
+
+    def add(self, exchange: Exchange) -> None:
+        if self.max_turns > 0:
+            self._exchanges.append(exchange)
+
+    def window(self) -> List[Exchange]:
+        """Newest exchanges that fit the token budget, oldest first."""
+        picked: List[Exchange] = []
+        used = 0
+        for ex in reversed(self._exchanges):
+            used += ex.tokens
+            if used > self.token_budget:
+                break
+            picked.append(ex)
+        picked.reverse()
+        return picked
+
+    @staticmethod
+    def log_cutoff(window: List[Exchange]) -> Optional[int]:
+        """Log entries from this index on belong to remembered turns (None: no window)."""
+        return window[0].log_start if window else None
+
+    @staticmethod
+    def as_items(window: List[Exchange]) -> List[Dict[str, Any]]:
+        """The window as Runner.run input items (user/assistant pairs)."""
+        items: List[Dict[str, Any]] = []
+        for ex in window:
+            items.append({"role": "user", "content": ex.user})
+            items.append({"role": "assistant", "content": ex.assistant})
+        return items
+
+    # ---------- timeline ----------
+    def truncate(self, turn: int) -> None:
+        """Forgets exchanges after save point `turn` (undo/rewind)."""
+        while self._exchanges and self._exchanges[-1].turn > turn:
+            self._exchanges.pop()
+
+    def clear(self) -> None:
+        self._exchanges.clear()
+
+    def copy(self, upto_turn: Optional[int] = None) -> "ConversationMemory":
+        other = ConversationMemory(self.max_turns, self.token_budget)
+        other._exchanges.extend(
+            ex for ex in self._exchanges if upto_turn is None or ex.turn <= upto_turn
+        )
+        return other
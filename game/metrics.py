@@ -0,0 +1,128 @@
+"""
+Process-wide counters and value series (latencies, token counts, ...).
+
+    from game.metrics import METRICS
+    METRICS.incr("research.coalesced")
+    METRICS.observe("turn.latency_ms", 812.5)
+    METRICS.snapshot()   # {"counters": {...}, "series": {name: {count, mean, p50, ...}}}
+
+Thread-safe; cheap enough to call on every tool call or turn.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Sequence
+
+# Newest values kept per series for percentiles
+SERIES_WINDOW = 1024
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = float("-inf")
+        self.recent: Deque[float] = deque(maxlen=SERIES_WINDOW)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(percentile(recent, 50), 3),
+            "p95": round(percentile(recent, 95), 3),
+            "max": round(self.max, 3) if self.count else 0.0,
+        }
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._series: Dict[str, _Series] = {}
+
+    def incr(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series()
+            series.add(value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def series(self, name: str) -> Dict[str, float]:
+        with self._lock:
+            series = self._series.get(name)
+            return series.summary() if series is not None else _Series().summary()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "series": {name: s.summary() for name, s in self._series.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._series.clear()
+
+
+METRICS = Metrics()
+
+
+# ---------- model usage ----------
+
+
+def response_usage(result: Any) -> Dict[str, int]:
+    """
+    Token counts summed over a run's model responses (agents SDK RunResult);
+    `cached_tokens` is the part of the input served from the provider's prompt cache.
+    """
+    usage = {"requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    for resp in getattr(result, "raw_responses", None) or []:
+        u = getattr(resp, "usage", None)
+        if u is None:
+            continue
+        usage["requests"] += 1
+        usage["input_tokens"] += getattr(u, "input_tokens", 0) or 0
+        usage["output_tokens"] += getattr(u, "output_tokens", 0) or 0
+        details = getattr(u, "input_tokens_details", None)
+        usage["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+    return usage
+
+
+def record_usage(agent: str, usage: Dict[str, int]) -> None:
+    """Counts usage under `llm.<agent>.*` and tracks the prompt-cache hit ratio."""
+    if not usage.get("requests"):
+        return
+    for name, value in usage.items():
+        METRICS.incr(f"llm.{agent}.{name}", value)
+    if usage["input_tokens"]:
+        METRICS.observe(f"llm.{agent}.cached_ratio", usage["cached_tokens"] / usage["input_tokens"])
@@ -0,0 +1,383 @@
+"""
+Versioned save files and streaming migrations between versions.
+
+Saves start with a `"version"` key (SAVE_VERSION); files without one are
+version 1. A migration upgrades one version to the next as a generator over
+records: `(section, value)` pairs, one per log entry or item (`("game_log",
+{...})`) and one per scalar (`("compacted_upto", 12)`). Register it with:
+
+    @migration(2)                       # upgrades version 2 to 3
+    def _v2(records):
+        for section, value in records:
+            ...
+            yield section, value
+
+Because nothing holds more than one record, `migrate_file` upgrades a save of
+any size in constant memory: it reads the JSON incrementally, runs the chain of
+migrations and writes the result next to the original before swapping it in.
+GameState.from_dict runs the same chain on already-parsed saves. A directory of
+saves can be upgraded across processes:
+
+    python -m game.migrations assets/sample_runs/sessions --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from game.config import BLOB_MIN_CHARS
+from game.dedupe import ANSWER_MARK
+
+SAVE_VERSION = 3
+
+# Sections holding one record per element; every other key is a single scalar record
+LIST_SECTIONS = ("blobs", "game_log", "research_log", "items", "log_summaries")
+
+Record = Tuple[str, Any]
+Migration = Callable[[Iterator[Record]], Iterator[Record]]
+
+# Migrations by the version they upgrade from (to that version + 1)
+MIGRATIONS: Dict[int, Migration] = {}
+
+_CHUNK = 1 << 16
+_DECODER = json.JSONDecoder()
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class SaveVersionError(ValueError):
+    """A save from a newer version, or one no chain of migrations reaches."""
+
+
+def migration(from_version: int) -> Callable[[Migration], Migration]:
+    """Registers a generator that upgrades saves from `from_version` to the next version."""
+
+    def register(fn: Migration) -> Migration:
+        if from_version in MIGRATIONS:
+            raise ValueError(f"A migration from version {from_version} is already registered")
+        MIGRATIONS[from_version] = fn
+        return fn
+
+    return register
+
+
+def upgrade(records: Iterable[Record], version: int) -> Iterator[Record]:
+    """Chains the migrations from `version` up to SAVE_VERSION around `records`."""
+    if version > SAVE_VERSION:
+        raise SaveVersionError(
+            f"Save is version {version}, newer than this game (version {SAVE_VERSION})"
+        )
+    stream = iter(records)
+    for v in range(version, SAVE_VERSION):
+        if v not in MIGRATIONS:
+            raise SaveVersionError(f"No migration from save version {v}")
+        stream = MIGRATIONS[v](stream)
+    return stream
+
+
+# ---------- migrations ----------
+
+
+@migration(1)
+def _v1_add_defaults(records: Iterator[Record]) -> Iterator[Record]:
+    """v1 -> v2: the header appears; entries and items get fields they may predate."""
+    for section, value in records:
+        if section in ("game_log", "research_log", "log_summaries"):
+            value = {"ts": 0.0, **value}
+        elif section == "items":
+            value = {"description": "", **value}
+        yield section, value
+
+
+@migration(2)
+def _v2_blobs(records: Iterator[Record]) -> Iterator[Record]:
+    """v2 -> v3: saves may hold a blob table; inline research entries stay valid."""
+    yield from records
+
+
+# ---------- blobs ----------
+# From version 3, long research answers are written once to the save's "blobs"
+# section ({"id", "text"}, content-addressed) ahead of the logs. An entry holding
+# one keeps the text before the answer and a "ref" to it; the same answer logged
+# again costs a ref. Only JSON saves are packed: loaded entries hold the full text.
+
+
+def blob_id(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def pack_entry(
+    entry: Dict[str, Any], blobs: Dict[str, str], min_chars: int = BLOB_MIN_CHARS
+) -> Dict[str, Any]:
+    """`entry` with a long answer moved into `blobs` (the whole text if it isn't a Q/A)."""
+    text = entry["entry"]
+    if len(text) < min_chars:
+        return entry
+    head, mark, tail = text.partition(ANSWER_MARK)
+    head, tail = (head + mark, tail) if mark else ("", text)
+    if len(tail) < min_chars:
+        return entry
+    ref = blob_id(tail)
+    blobs.setdefault(ref, tail)
+    return {**entry, "entry": head, "ref": ref}
+
+
+def unpack_entry(entry: Dict[str, Any], blobs: Dict[str, str]) -> Dict[str, Any]:
+    """`entry` with its text whole again; ValueError if its blob is missing."""
+    if "ref" not in entry:
+        return entry
+    unpacked = dict(entry)
+    ref = unpacked.pop("ref")
+    if ref not in blobs:
+        raise ValueError(f"Save references a missing blob {ref}")
+    unpacked["entry"] += blobs[ref]
+    return unpacked
+
+
+# ---------- parsed saves ----------
+
+
+def save_version(data: Dict[str, Any]) -> int:
+    return int(data.get("version", 1))
+
+
+def dict_records(data: Dict[str, Any]) -> Iterator[Record]:
+    for key, value in data.items():
+        if key == "version":
+            continue
+        if key in LIST_SECTIONS:
+            for element in value:
+                yield key, element
+        else:
+            yield key, value
+
+
+def collect(records: Iterable[Record]) -> Dict[str, Any]:
+    """The save dict for a record stream (current version)."""
+    data: Dict[str, Any] = {"version": SAVE_VERSION}
+    for section, value in records:
+        if section in LIST_SECTIONS:
+            data.setdefault(section, []).append(value)
+        else:
+            data[section] = value
+    return data
+
+
+def migrate_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """`data` upgraded to SAVE_VERSION (returned as is when already current)."""
+    version = save_version(data)
+    if version == SAVE_VERSION:
+        return data
+    return collect(upgrade(dict_records(data), version))
+
+
+# ---------- streaming files ----------
+
+
+class _Reader:
+    """Incremental JSON values off a text file, one buffer chunk at a time."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character ("" at the end of the file)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos : self._pos + 1]
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected {char!r}", self._buf, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                # A value touching the buffer's end may go on (a number split in two)
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def _file_records(reader: _Reader, first: Optional[str]) -> Iterator[Record]:
+    key = first
+    while key is not None:
+        reader.expect(":")
+        if key in LIST_SECTIONS and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.peek() == "]":
+                        reader.expect("]")
+                        break
+                    reader.expect(",")
+        else:
+            yield key, reader.value()
+        key = _next_key(reader)
+
+
+def _next_key(reader: _Reader) -> Optional[str]:
+    if reader.peek() == "}":
+        reader.expect("}")
+        return None
+    reader.expect(",")
+    return reader.value()
+
+
+def read_save(f: IO[str]) -> Tuple[int, Iterator[Record]]:
+    """(version, records) of an open save file, read lazily in constant memory."""
+    reader = _Reader(f)
+    reader.expect("{")
+    key: Optional[str] = None if reader.peek() == "}" else reader.value()
+    if key is None:
+        reader.expect("}")
+    version = 1
+    if key == "version":
+        reader.expect(":")
+        version = int(reader.value())
+        key = _next_key(reader)
+    return version, _file_records(reader, key)
+
+
+def write_save(f: IO[str], records: Iterable[Record]) -> int:
+    """Writes a current-version save from `records`, one entry per line; returns the count."""
+    f.write('{\n  "version": %d' % SAVE_VERSION)
+    open_list: Optional[str] = None
+    done = set()
+    count = 0
+    for section, value in records:
+        if section != open_list:
+            if open_list is not None:
+                f.write("\n  ]")
+            if section in done:
+                raise ValueError(f"Section {section!r} is not contiguous in the record stream")
+            done.add(section)
+            f.write(f",\n  {_ENCODE(section)}: ")
+            open_list = section if section in LIST_SECTIONS else None
+            if open_list is not None:
+                f.write("[\n    ")
+        elif open_list is not None:
+            f.write(",\n    ")
+        f.write(_ENCODE(value))
+        count += 1
+    if open_list is not None:
+        f.write("\n  ]")
+    f.write("\n}\n")
+    return count
+
+
+@dataclass
+class FileResult:
+    path: str
+    from_version: int = 0
+    to_version: int = 0
+    records: int = 0
+    ms: float = 0.0
+    error: str = ""
+
+
+def migrate_file(path: str, dry_run: bool = False) -> FileResult:
+    """Upgrades the save at `path` in place (atomically); current saves are left untouched."""
+    started = time.perf_counter()
+    result = FileResult(path)
+    tmp = path + ".migrating"
+    try:
+        with open(path, "r", encoding="utf-8") as src:
+            result.from_version, records = read_save(src)
+            result.to_version = result.from_version
+            if result.from_version != SAVE_VERSION:
+                stream = upgrade(records, result.from_version)
+                if dry_run:
+                    result.records = sum(1 for _ in stream)
+                else:
+                    with open(tmp, "w", encoding="utf-8") as dst:
+                        result.records = write_save(dst, stream)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    os.replace(tmp, path)
+                result.to_version = SAVE_VERSION
+    except Exception as e:  # a malformed record fails its file, not the whole run
+        result.error = f"{type(e).__name__}: {e}"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    result.ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def migrate_dir(
+    directory: str, pattern: str = "*.json", workers: Optional[int] = None, dry_run: bool = False
+) -> List[FileResult]:
+    """migrate_file for every save in `directory`, spread over `workers` processes."""
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    if workers == 1 or len(paths) < 2:
+        return [migrate_file(p, dry_run) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(len(paths) // ((workers or os.cpu_count() or 1) * 4), 1)
+        return list(pool.map(migrate_file, paths, [dry_run] * len(paths), chunksize=chunk))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Upgrade save files to the current version.")
+    parser.add_argument("directory")
+    parser.add_argument("--pattern", default="*.json")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPUs)")
+    parser.add_argument("--dry-run", action="store_true", help="read and migrate, don't write")
+    parser.add_argument("-v", "--verbose", action="store_true", help="one line per file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = migrate_dir(args.directory, args.pattern, args.workers, args.dry_run)
+    failed = [r for r in results if r.error]
+    if args.verbose:
+        for r in results:
+            print(json.dumps(asdict(r)))
+    summary = {
+        "files": len(results),
+        "migrated": sum(1 for r in results if r.from_version != r.to_version),
+        "current": sum(1 for r in results if not r.error and r.from_version == SAVE_VERSION),
+        "failed": len(failed),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(summary))
+    for r in failed:
+        print(f"{r.path}: {r.error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
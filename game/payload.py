@@ -0,0 +1,86 @@
+"""
+Bytes on the wire per turn, by game length.
+
+Compares the two ways a web UI can exchange chat with the server:
+- "full": the client posts the whole history every turn and gets it back with the
+  new reply (what Gradio's ChatInterface with type="messages" does)
+- "window": the client posts only its message and session key and gets back a
+  bounded window, a cursor and the side-panel diff (game.sessions)
+
+Each is measured raw and gzipped, for a synthetic game of the given length:
+
+    python -m game.payload --turns 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+from game.config import CHAT_WINDOW_MESSAGES, EXAMPLE_COMMANDS
+from game.content import GAME_STORY, NARRATOR_INTRO
+from game.transcript import Transcript
+
+_WORDS = (GAME_STORY + " " + NARRATOR_INTRO).split()
+
+
+def _reply(rng: random.Random, chars: int) -> str:
+    words: List[str] = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)
+
+
+def _sizes(payload: Any) -> Dict[str, int]:
+    raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return {"raw": len(raw), "gzip": len(gzip.compress(raw, compresslevel=6))}
+
+
+def measure(turns: int, reply_chars: int = 600, seed: int = 0) -> Dict[str, Any]:
+    """Request + response bytes for turn number `turns + 1` of a synthetic game."""
+    rng = random.Random(seed)
+    transcript = Transcript()
+    transcript.add("assistant", NARRATOR_INTRO)
+    for turn in range(turns):
+        transcript.add("user", EXAMPLE_COMMANDS[turn % len(EXAMPLE_COMMANDS)])
+        transcript.add("assistant", _reply(rng, reply_chars))
+
+    message = EXAMPLE_COMMANDS[turns % len(EXAMPLE_COMMANDS)]
+    reply = _reply(rng, reply_chars)
+    exchange = [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+    history, _ = transcript.window(len(transcript))
+    window, cursor = transcript.window(CHAT_WINDOW_MESSAGES - 2)
+    diff = {
+        "reset": False,
+        "items_added": [],
+        "items_removed": [],
+        "log": [{"category": "event", "entry": reply[:120], "ts": 0.0}],
+    }
+    key = "k" * 22  # SessionManager.new_key() length
+
+    full_req, full_resp = _sizes([message, history]), _sizes([history + exchange])
+    win_req, win_resp = _sizes([message, key]), _sizes(["", window + exchange, cursor, diff])
+    return {
+        "turns": turns,
+        "full_bytes": full_req["raw"] + full_resp["raw"],
+        "full_gzip": full_req["gzip"] + full_resp["gzip"],
+        "window_bytes": win_req["raw"] + win_resp["raw"],
+        "window_gzip": win_req["gzip"] + win_resp["gzip"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure chat payload bytes per turn.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--reply-chars", type=int, default=600)
+    args = parser.parse_args(argv)
+
+    print(json.dumps([measure(n, args.reply_chars) for n in args.turns], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""
+Per-turn session recorder.
+
+Each turn is one compact JSON line: the player input, the assembled narrator
+prompt, every tool call with its arguments and result, the raw and scrubbed model
+output, timings, token usage, and a digest of the resulting state. `game.replay` feeds these
+back through the tools to reproduce sessions offline.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from game.state import GameState
+
+RECORD_PATH_ENV = "THRILLER_RECORD_PATH"
+
+
+@dataclass
+class ToolCallRecord:
+    name: str
+    args: Dict[str, Any]
+    result: str
+    ms: float
+
+
+@dataclass
+class TurnRecord:
+    session: str
+    turn: int
+    input: str
+    prompt: str
+    raw_output: str
+    output: str
+    ms: float
+    state: str  # state_digest() after the turn
+    tool_calls: List[ToolCallRecord] = field(default_factory=list)
+    usage: Dict[str, int] = field(default_factory=dict)  # token counts (metrics.response_usage)
+    model: str = ""
+    max_tokens: int = 0  # output budget the turn ran with (0: unbounded)
+
+
+def state_digest(state: GameState) -> str:
+    """Stable digest of logs and inventory; ignores timestamps so replays compare equal."""
+    h = hashlib.sha1()
+    for e in state.game_log:
+        h.update(f"g|{e.category}|{e.entry}\n".encode("utf-8"))
+    for r in state.research_log:
+        h.update(f"r|{r.category}|{r.entry}\n".encode("utf-8"))
+    for i in state.items:
+        h.update(f"i|{i.name}|{i.description}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TurnRecorder:
+    """Appends TurnRecords to a JSONL file (gzipped when the path ends in .gz)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._turns: Dict[str, int] = {}
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+    def next_turn(self, session: str) -> int:
+        with self._lock:
+            n = self._turns.get(session, 0) + 1
+            self._turns[session] = n
+            return n
+
+    def record(self, rec: TurnRecord) -> None:
+        line = json.dumps(asdict(rec), ensure_ascii=False, separators=(",", ":"))
+        with self._lock, _open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+def read_turns(path: str) -> Iterator[TurnRecord]:
+    """Streams TurnRecords back from a recording, one line at a time."""
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            calls = [ToolCallRecord(**c) for c in data.pop("tool_calls", [])]
+            yield TurnRecord(tool_calls=calls, **data)
+
+
+_ENV_RECORDER: Optional[TurnRecorder] = None
+
+
+def recorder_from_env() -> Optional[TurnRecorder]:
+    """Returns a recorder when THRILLER_RECORD_PATH is set (read at call time)."""
+    global _ENV_RECORDER
+    path = os.getenv(RECORD_PATH_ENV)
+    if not path:
+        return None
+    if _ENV_RECORDER is None or _ENV_RECORDER.path != path:
+        _ENV_RECORDER = TurnRecorder(path)
+    return _ENV_RECORDER
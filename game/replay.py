@@ -0,0 +1,137 @@
+"""
+Deterministic replay of recorded sessions (see game.recorder).
+
+Recorded tool calls are fed back through the real implementations in game.tools,
+and recorded model outputs through the engine's scrubber, each session on its own
+GameState. No model is called, so thousands of sessions replay in seconds.
+
+    python -m game.replay runs/recording.jsonl.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from game.engine import _scrub_tool_meta
+from game.recorder import ToolCallRecord, TurnRecord, read_turns, state_digest
+from game.state import GameState, use_state
+from game.tools import TOOL_IMPLS, make_research_bridge
+from game.transaction import TurnTransaction, transaction
+
+_BRIDGE = "query_web_research_agent"
+_BRIDGE_ERROR = "[web research error] "
+
+
+@dataclass
+class ReplayResult:
+    session: str
+    turns: int = 0
+    tool_calls: int = 0
+    ms: float = 0.0
+    mismatches: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+class _Playback:
+    """The replay bridge's research runner: answers with the recorded result."""
+
+    def __init__(self) -> None:
+        self.call: Optional[ToolCallRecord] = None
+
+    async def __call__(self, _agent: object, _query: str) -> str:
+        assert self.call is not None
+        if self.call.result.startswith(_BRIDGE_ERROR):
+            raise RuntimeError(self.call.result[len(_BRIDGE_ERROR) :])
+        return self.call.result
+
+
+def _replay_tools(playback: _Playback) -> Dict[str, Callable[..., Awaitable[str]]]:
+    """A replay's own tool table: the state tools, and a bridge that plays research back."""
+    return {**TOOL_IMPLS, _BRIDGE: make_research_bridge(None, run=playback)}
+
+
+async def _replay_call(
+    call: ToolCallRecord, tools: Dict[str, Callable[..., Awaitable[str]]], playback: _Playback
+) -> str:
+    impl = tools.get(call.name)
+    if impl is None:
+        raise KeyError(f"Unknown tool in recording: {call.name!r}")
+    playback.call = call
+    return await impl(**call.args)
+
+
+async def replay_session(session: str, turns: Iterable[TurnRecord]) -> ReplayResult:
+    """Replays one session's turns on a fresh GameState and diffs every step."""
+    res = ReplayResult(session=session)
+    state = GameState()
+    playback = _Playback()
+    tools = _replay_tools(playback)
+    started = time.perf_counter()
+    with use_state(state):
+        for rec in turns:
+            res.turns += 1
+            # Staged and committed per turn, exactly as the live turn was
+            with transaction(TurnTransaction(state)):
+                for call in rec.tool_calls:
+                    res.tool_calls += 1
+                    got = await _replay_call(call, tools, playback)
+                    if got != call.result:
+                        res.mismatches.append(
+                            f"turn {rec.turn}: {call.name} returned {got!r}, "
+                            f"recorded {call.result!r}"
+                        )
+            if _scrub_tool_meta(rec.raw_output) != rec.output:
+                res.mismatches.append(f"turn {rec.turn}: scrubbed output differs")
+            if state_digest(state) != rec.state:
+                res.mismatches.append(f"turn {rec.turn}: state digest differs")
+    res.ms = (time.perf_counter() - started) * 1000
+    return res
+
+
+async def replay_records(records: Iterable[TurnRecord]) -> List[ReplayResult]:
+    sessions: Dict[str, List[TurnRecord]] = {}
+    for rec in records:
+        sessions.setdefault(rec.session, []).append(rec)
+    return [await replay_session(sid, turns) for sid, turns in sessions.items()]
+
+
+def replay_file(path: str) -> List[ReplayResult]:
+    return asyncio.run(replay_records(read_turns(path)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded sessions offline.")
+    parser.add_argument("paths", nargs="+", help="Recording files (.jsonl or .jsonl.gz)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results: List[ReplayResult] = []
+    for path in args.paths:
+        results.extend(replay_file(path))
+    elapsed = time.perf_counter() - started
+
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        print(f"[FAIL] {r.session}")
+        for m in r.mismatches:
+            print(f"    {m}")
+
+    turns = sum(r.turns for r in results)
+    calls = sum(r.tool_calls for r in results)
+    print(
+        f"{len(results)} sessions, {turns} turns, {calls} tool calls in {elapsed:.2f}s "
+        f"({turns / elapsed if elapsed else 0:.0f} turns/s); {len(failed)} failed"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
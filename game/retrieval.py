@@ -0,0 +1,342 @@
+"""
+Local retrieval over the game and research logs.
+
+The narrator only sees the newest log entries and a few summaries, so facts from
+long ago (a name, a place, a code) fall out of its context. `LogIndex` embeds
+every `GameLogEntry` and `ResearchLogEntry` as it is appended, using a hashing-trick
+TF-IDF vector (unigrams + bigrams hashed into RETRIEVAL_DIM buckets; no model, no
+external service), and each turn the top-k entries most similar to the player's
+message are recalled into the narrator prompt.
+
+Rows are stored sparse (CSR: indptr/indices/values in growable NumPy arrays) and
+all rows are scored against a batch of queries at once. IDF weights come from the
+live document frequencies, so old rows never need re-embedding.
+
+Indexing runs on a background worker after each turn (`schedule_indexing`) and the
+index is saved next to the save file (`index_path`); a turn only tops it up with
+whatever the worker has not reached yet. An index that no longer matches its logs
+(undo, rewind, a stale file) is truncated or rebuilt rather than trusted.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.compaction import raw_view_start
+from game.config import RETRIEVAL_DIM, RETRIEVAL_MAX_CHARS, RETRIEVAL_MIN_SCORE, RETRIEVAL_TOP_K
+from game.state import GameState
+
+GAME, RESEARCH = 0, 1
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its of on or "
+    "our she that the their them then there they this to was we were what when where "
+    "which who will with you your q".split()
+)
+
+# Single low-priority worker, like log compaction: indexing never runs inside a turn
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-indexer")
+
+
+def features(text: str, dim: int = RETRIEVAL_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed unigram + bigram buckets of `text` and their sublinear term frequencies."""
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not terms:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    # crc32, not hash(): buckets must be stable across processes for the saved index
+    buckets = np.fromiter((zlib.crc32(t.encode("utf-8")) % dim for t in terms), dtype=np.int32)
+    idx, counts = np.unique(buckets, return_counts=True)
+    return idx, (1.0 + np.log(counts)).astype(np.float32)
+
+
+def _grow(arr: np.ndarray, need: int) -> np.ndarray:
+    if need <= len(arr):
+        return arr
+    out = np.zeros(max(need, 2 * len(arr), 64), dtype=arr.dtype)
+    out[: len(arr)] = arr
+    return out
+
+
+def _crc(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _fingerprint(state: GameState, n_game: int, n_research: int) -> int:
+    """Checksum of the last indexed entry of each log: detects logs rewritten in place."""
+    last_game = state.game_log[n_game - 1].entry if n_game else ""
+    last_research = state.research_log[n_research - 1].entry if n_research else ""
+    return _crc(f"{n_game}\x00{last_game}\x00{n_research}\x00{last_research}")
+
+
+class LogIndex:
+    """Incremental hashing-trick TF-IDF index over one session's game and research logs."""
+
+    def __init__(self, dim: int = RETRIEVAL_DIM) -> None:
+        self.dim = dim
+        self.rows = 0
+        self.nnz = 0
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._values = np.zeros(0, dtype=np.float32)
+        self._source = np.zeros(0, dtype=np.int8)  # GAME or RESEARCH
+        self._pos = np.zeros(0, dtype=np.int32)  # index into that log
+        self._crc = np.zeros(0, dtype=np.uint32)  # checksum of the entry text
+        self._df = np.zeros(dim, dtype=np.int32)
+        # How far each log has been indexed, and the checksum at that point
+        self.indexed: Tuple[int, int] = (0, 0)
+        self._fingerprint = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # ---------- building ----------
+    def _add(self, source: int, pos: int, text: str) -> None:
+        idx, tf = features(text, self.dim)
+        if not len(idx):
+            return
+        end = self.nnz + len(idx)
+        self._indices = _grow(self._indices, end)
+        self._values = _grow(self._values, end)
+        self._indices[self.nnz : end] = idx
+        self._values[self.nnz : end] = tf
+        self._df[idx] += 1
+        self._indptr = _grow(self._indptr, self.rows + 2)
+        self._source = _grow(self._source, self.rows + 1)
+        self._pos = _grow(self._pos, self.rows + 1)
+        self._crc = _grow(self._crc, self.rows + 1)
+        self._indptr[self.rows + 1] = end
+        self._source[self.rows] = source
+        self._pos[self.rows] = pos
+        self._crc[self.rows] = _crc(text)
+        self.rows += 1
+        self.nnz = end
+
+    def _truncate(self, n_game: int, n_research: int) -> None:
+        """Drops rows for entries past the given log lengths (undo/rewind)."""
+        source, pos = self._source[: self.rows], self._pos[: self.rows]
+        keep = np.where(source == GAME, pos < n_game, pos < n_research)
+        lengths = np.diff(self._indptr[: self.rows + 1])
+        keep_nnz = np.repeat(keep, lengths)
+        self._indices = self._indices[: self.nnz][keep_nnz]
+        self._values = self._values[: self.nnz][keep_nnz]
+        self._indptr = np.concatenate(([0], np.cumsum(lengths[keep]))).astype(np.int64)
+        self._source = source[keep]
+        self._pos = pos[keep]
+        self._crc = self._crc[: self.rows][keep]
+        self.rows = int(keep.sum())
+        self.nnz = len(self._indices)
+        self._df = np.bincount(self._indices, minlength=self.dim).astype(np.int32)
+
+    def _repair(self, state: GameState) -> None:
+        """Keeps rows whose entry is unchanged; each log is re-indexed from its first change."""
+        source, pos, crc = self._source[: self.rows], self._pos[: self.rows], self._crc[: self.rows]
+        marks = list(self.indexed)
+        for src, log in ((GAME, state.game_log), (RESEARCH, state.research_log)):
+            marks[src] = min(marks[src], len(log))
+            # Rows of one log are in position order, so the first mismatch ends the prefix
+            for row in np.flatnonzero(source == src):
+                p = int(pos[row])
+                if p >= marks[src] or _crc(log[p].entry) != crc[row]:
+                    marks[src] = min(marks[src], p)
+                    break
+        self._truncate(marks[GAME], marks[RESEARCH])
+        self.indexed = (marks[GAME], marks[RESEARCH])
+
+    def verify(self, state: GameState) -> None:
+        """Checks every row against its entry (sync only checks the newest ones)."""
+        with self._lock:
+            self._repair(state)
+            self._fingerprint = _fingerprint(state, *self.indexed)
+
+    def sync(self, state: GameState) -> int:
+        """Indexes entries appended since the last sync; returns how many rows were added."""
+        with self._lock:
+            n_game, n_research = self.indexed
+            if (
+                len(state.game_log) < n_game
+                or len(state.research_log) < n_research
+                or _fingerprint(state, n_game, n_research) != self._fingerprint
+            ):
+                # The logs were rolled back or replaced (undo, rewind, a stale index file)
+                self._repair(state)
+                n_game, n_research = self.indexed
+            before = self.rows
+            game = state.game_log[n_game:]
+            research = state.research_log[n_research:]
+            for offset, entry in enumerate(game):
+                self._add(GAME, n_game + offset, entry.entry)
+            for offset, r_entry in enumerate(research):
+                self._add(RESEARCH, n_research + offset, r_entry.entry)
+            self.indexed = (n_game + len(game), n_research + len(research))
+            self._fingerprint = _fingerprint(state, *self.indexed)
+            return self.rows - before
+
+    # ---------- scoring ----------
+    def _idf(self) -> np.ndarray:
+        return (np.log((1.0 + self.rows) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+    def score(self, queries: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of every row to every query: shape (len(queries), rows)."""
+        with self._lock:
+            return self._score(queries)
+
+    def _score(self, queries: Sequence[str]) -> np.ndarray:
+        if not self.rows or not queries:
+            return np.zeros((len(queries), self.rows), dtype=np.float32)
+        idf = self._idf()
+        q = np.zeros((len(queries), self.dim), dtype=np.float32)
+        for i, text in enumerate(queries):
+            idx, tf = features(text, self.dim)
+            q[i, idx] = tf * idf[idx]
+        q_norm = np.linalg.norm(q, axis=1, keepdims=True)
+        q /= np.where(q_norm > 0, q_norm, 1.0)
+
+        indices = self._indices[: self.nnz]
+        weighted = self._values[: self.nnz] * idf[indices]
+        starts = self._indptr[: self.rows]
+        # Rows are never empty, so reduceat sums exactly each row's slice
+        row_norm = np.sqrt(np.add.reduceat(weighted * weighted, starts))
+        dots = np.add.reduceat(q[:, indices] * weighted, starts, axis=1)
+        return dots / row_norm
+
+    def search(
+        self,
+        query: str,
+        k: int = RETRIEVAL_TOP_K,
+        min_score: float = RETRIEVAL_MIN_SCORE,
+        game_before: Optional[int] = None,
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Best `k` (source, position, score) hits for `query`, best first. Game log
+        entries from `game_before` on are skipped (the narrator already sees them).
+        """
+        if k <= 0:
+            return []
+        with self._lock:
+            scores = self._score([query])[0]
+            source, pos = self._source[: self.rows], self._pos[: self.rows]
+            if game_before is not None:
+                scores = np.where((source == GAME) & (pos >= game_before), -1.0, scores)
+            hits = np.flatnonzero(scores >= min_score)
+            if len(hits) > k:
+                hits = hits[np.argpartition(scores[hits], -k)[-k:]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            return [(int(source[i]), int(pos[i]), float(scores[i])) for i in hits]
+
+    # ---------- persistence ----------
+    def save(self, path: str) -> None:
+        """Writes the index as .npz (atomically: a temp file, then a rename)."""
+        with self._lock:
+            arrays = {
+                "dim": np.array(self.dim),
+                "indexed": np.array(self.indexed + (self._fingerprint,), dtype=np.int64),
+                "indptr": self._indptr[: self.rows + 1],
+                "indices": self._indices[: self.nnz],
+                "values": self._values[: self.nnz],
+                "source": self._source[: self.rows],
+                "pos": self._pos[: self.rows],
+                "crc": self._crc[: self.rows],
+            }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LogIndex":
+        with np.load(path) as data:
+            index = cls(int(data["dim"]))
+            n_game, n_research, fingerprint = (int(v) for v in data["indexed"])
+            index._indptr = data["indptr"].astype(np.int64)
+            index._indices = data["indices"].astype(np.int32)
+            index._values = data["values"].astype(np.float32)
+            index._source = data["source"].astype(np.int8)
+            index._pos = data["pos"].astype(np.int32)
+            index._crc = data["crc"].astype(np.uint32)
+        index.rows = len(index._source)
+        index.nnz = len(index._indices)
+        index._df = np.bincount(index._indices, minlength=index.dim).astype(np.int32)
+        index.indexed = (n_game, n_research)
+        index._fingerprint = fingerprint
+        return index
+
+
+# ---------- sessions ----------
+
+
+def index_path(save_path: str) -> str:
+    """Where the index for a save file lives: right next to it."""
+    return f"{os.path.splitext(save_path)[0]}.index.npz"
+
+
+def load_index(path: Optional[str], state: GameState) -> LogIndex:
+    """The saved index at `path` brought up to date with `state`; a fresh one if unusable."""
+    index = None
+    if path and os.path.exists(path):
+        try:
+            index = LogIndex.load(path)
+        except Exception as e:
+            print(f"[index warning] {e}")
+    if index is None or index.dim != RETRIEVAL_DIM:
+        index = LogIndex()
+    else:
+        # The file may have been written for an older version of this save
+        index.verify(state)
+    index.sync(state)
+    return index
+
+
+def schedule_indexing(index: LogIndex, state: GameState, path: Optional[str] = None) -> Future:
+    """Indexes new entries (and saves the index to `path`) on the background worker."""
+
+    def _job() -> int:
+        added = index.sync(state)
+        if path:
+            index.save(path)
+        return added
+
+    return _EXECUTOR.submit(_job)
+
+
+def flush_indexing() -> None:
+    """Waits for every indexing job queued so far (e.g. before a CLI exits)."""
+    _EXECUTOR.submit(lambda: None).result()
+
+
+def recall(
+    index: LogIndex,
+    state: GameState,
+    query: str,
+    k: int = RETRIEVAL_TOP_K,
+    log_upto: Optional[int] = None,
+) -> List[str]:
+    """
+    Up to `k` older log entries relevant to `query`, as prompt lines. Entries the
+    narrator already sees verbatim (the raw log tail, remembered turns) are skipped.
+    """
+    if k <= 0:
+        return []
+    index.sync(state)
+    lines = []
+    for source, pos, _ in index.search(query, k, game_before=raw_view_start(state, upto=log_upto)):
+        if source == GAME:
+            entry = state.game_log[pos]
+            label = entry.category
+        else:
+            entry = state.research_log[pos]
+            label = f"research/{entry.category}"
+        text = " ".join(entry.entry.split())
+        if len(text) > RETRIEVAL_MAX_CHARS:
+            text = text[: RETRIEVAL_MAX_CHARS - 1].rstrip() + "…"
+        lines.append(f"[{label}] {text}")
+    return lines
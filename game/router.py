@@ -1,18 +1,23 @@
 from __future__ import annotations
 
-from typing import Callable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from game.engine import Session
 
 # Public type for the narrator entrypoint
 RespondFn = Callable[[str], str]
 
 # Try to import the real narrator hook; record the import error if any
 try:
+    from game.engine import get_default_session
     from game.engine import respond_narrator as _respond_narrator
 
     respond_narrator: Optional[RespondFn] = _respond_narrator  # optional, see except path
     _IMPORT_ERR: Optional[Exception] = None
 except Exception as e:  # pragma: no cover - exercised only when engine is missing
     respond_narrator = None
+    get_default_session = None  # type: ignore[assignment]
     _IMPORT_ERR = e
 
 # Keep tip text aligned with the frontends
@@ -21,6 +26,8 @@ try:
 except Exception:
     TIP_TEXT = "“Look around”, “Inventory”, “Open the door”."
 
+COMMANDS_HELP = "Commands: /undo, /history, /rewind <turn>."
+
 
 class Router:
     def __init__(self) -> None:
@@ -31,10 +38,16 @@ class Router:
     def ready(self) -> bool:
         return self._ready
 
-    def handle(self, message: str, history: List[Tuple[str, str]]) -> str:
+    def handle(
+        self,
+        message: str,
+        history: List[Tuple[str, str]],
+        session: Optional["Session"] = None,
+    ) -> str:
         """
         Main entry used by the UI layer. History is provided for future use
         (e.g., you may inspect recent turns for system prompts or state).
+        `session` defaults to the process-wide default session.
         """
         if not self._ready or respond_narrator is None:
             # Log the actual import error to console for debugging
@@ -49,7 +62,37 @@ class Router:
         if not text:
             return f"Say something like: {TIP_TEXT}"
 
-        # If you add command handling later, do it here.
+        if text.startswith("/"):
+            return self._command(text, session or get_default_session())
+
+        if session is not None:
+            return session.respond(text)
 
         # `respond_narrator` is non-None in this branch (narrowed above)
         return respond_narrator(text)
+
+    def _command(self, text: str, session: "Session") -> str:
+        """Out-of-story commands; these never reach the narrator."""
+        name, _, arg = text[1:].strip().partition(" ")
+        name = name.lower()
+
+        if name == "undo":
+            point = session.undo()
+            if point is None:
+                return "Nothing to undo."
+            return f"Rewound to turn {point.turn}."
+
+        if name == "history":
+            lines = [f"{p.turn}: {p.label}" for p in session.timeline.points()]
+            return "Save points:\n" + "\n".join(lines)
+
+        if name == "rewind":
+            if not arg.strip().isdigit():
+                return "Usage: /rewind <turn>"
+            try:
+                point = session.rewind(int(arg))
+            except ValueError as e:
+                return f"Can't rewind: {e}"
+            return f"Back at turn {point.turn}; the turns after it are gone."
+
+        return f"Unknown command /{name}. {COMMANDS_HELP}"
@@ -0,0 +1,326 @@
+"""
+Per-browser sessions for the web frontends.
+
+A frontend keeps only an opaque key per browser tab (Gradio: `gr.State`) and asks
+the SessionManager for everything else: the Session behind the key, a bounded chat
+window plus a cursor for paging back through the session's canonical transcript
+(game.transcript), and the side panel. Sessions idle for SESSION_IDLE_TTL_S, or beyond
+SESSION_MAX_ACTIVE, are dropped from memory; with a store they pick back up from
+their last autosave.
+
+The side panel (inventory + newest log entries) is sent whole once, by `panel()`.
+After that each turn only sends `panel_diff()`: the items and log entries the turn
+added or removed, built from its ChangeSet, which the browser applies to what it
+already shows. Payload per turn stays constant however long the game runs. Changes
+that are not appends (/undo, /rewind) send a fresh bounded snapshot instead.
+
+`submit()` runs a turn on one shared background event loop instead of the caller's
+thread (Streamlit reruns stay responsive) and returns an InflightTurn; other
+tabs of the same player attach to it rather than starting a duplicate.
+
+With `remote` (e.g. ShardPool.handle) the turns run in another process: the
+manager then only keeps the chat window, replies arrive whole and the panel
+stays empty.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from game.config import (
+    CHAT_WINDOW_MESSAGES,
+    PANEL_LOG_ENTRIES,
+    SESSION_IDLE_TTL_S,
+    SESSION_MAX_ACTIVE,
+)
+from game.content import NARRATOR_INTRO
+from game.engine import Session
+from game.loops import LoopThread
+from game.router import Router
+from game.state import GameState
+from game.store import StateStore
+from game.transaction import ChangeSet
+from game.transcript import Transcript
+
+
+@dataclass
+class _Live:
+    session: Optional[Session]  # None when turns run remotely
+    last_used: float
+    # The session's canonical chat (its own one when turns run remotely)
+    transcript: Transcript
+    # Turns committed since the panel was last sent, or None when a snapshot is due
+    pending: Optional[List[ChangeSet]] = field(default_factory=list)
+    # One turn at a time per session, even with several tabs or double submits
+    turn_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class InflightTurn:
+    """A turn running in the background; any number of readers can follow it."""
+
+    def __init__(self, key: str, message: str) -> None:
+        self.key = key
+        self.message = message
+        self.text = ""  # raw reply so far
+        self.reply: Optional[str] = None  # the finished (scrubbed) reply
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.future: Optional[Future] = None
+        self._cond = threading.Condition()
+
+    def push(self, chunk: str) -> None:
+        with self._cond:
+            self.text += chunk
+            self._cond.notify_all()
+
+    def finish(self, reply: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.reply, self.error, self.done = reply, error, True
+            self._cond.notify_all()
+
+    def updates(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Text chunks as they arrive, starting from the beginning, so a tab that
+        attaches late first gets everything so far (fits st.write_stream). A
+        command's reply arrives whole at the end. Stops after `timeout` s of silence.
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                fresh = self._cond.wait_for(lambda: len(self.text) > sent or self.done, timeout)
+                chunk, done = self.text[sent:], self.done
+                sent = len(self.text)
+            if chunk:
+                yield chunk
+            if done and not sent and self.reply:
+                yield self.reply  # nothing was streamed (commands, remote turns)
+            if done or not fresh:
+                return
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.done, timeout):
+                raise TimeoutError(f"turn for {self.key!r} still running")
+        if self.error is not None:
+            raise self.error
+        return self.reply or ""
+
+
+# Background turns of every session in the process
+TURN_LOOP = LoopThread("turn-loop")
+
+
+class SessionManager:
+    """Sessions by browser key, created on first use and evicted when idle."""
+
+    def __init__(
+        self,
+        store: Optional[StateStore] = None,
+        router: Optional[Router] = None,
+        max_active: int = SESSION_MAX_ACTIVE,
+        idle_ttl_s: float = SESSION_IDLE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+        remote: Optional[Callable[[str, str], str]] = None,
+    ) -> None:
+        self.store = store
+        self.router = router or Router()
+        self.remote = remote
+        self.max_active = max_active
+        self.idle_ttl_s = idle_ttl_s
+        self._clock = clock
+        self._live: "OrderedDict[str, _Live]" = OrderedDict()
+        self._inflight: Dict[str, InflightTurn] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    @staticmethod
+    def new_key() -> str:
+        return secrets.token_urlsafe(16)
+
+    def _open(self, key: str) -> _Live:
+        session: Optional[Session] = None
+        if self.remote is None and self.store is not None:
+            state = self.store.load(key) if self.store.exists(key) else GameState()
+            session = Session(state, session_id=key, store=self.store)
+            session.recover_turns()
+        elif self.remote is None:
+            session = Session(session_id=key, autosave=False)
+        transcript = session.transcript if session is not None else Transcript()
+        if not len(transcript):
+            transcript.add("assistant", NARRATOR_INTRO)
+        live = _Live(session=session, last_used=self._clock(), transcript=transcript)
+
+        def _on_turn(changes: ChangeSet) -> None:
+            if live.pending is not None:
+                live.pending.append(changes)
+
+        if session is not None:
+            session.add_listener(_on_turn)
+        return live
+
+    def _get(self, key: str) -> _Live:
+        with self._lock:
+            now = self._clock()
+            live = self._live.get(key)
+            if live is None:
+                live = self._live[key] = self._open(key)
+            live.last_used = now
+            self._live.move_to_end(key)
+            self._evict(now)
+            return live
+
+    def _evict(self, now: float) -> None:
+        """Drops idle sessions, then the least recently used beyond max_active."""
+        for key in list(self._live):
+            live = self._live[key]
+            over = len(self._live) > self.max_active
+            idle = now - live.last_used > self.idle_ttl_s
+            if not (over or idle):
+                break  # ordered by last use: everything after is newer
+            if not live.turn_lock.locked():
+                del self._live[key]
+                self._inflight.pop(key, None)
+
+    def session(self, key: str) -> Optional[Session]:
+        return self._get(key).session
+
+    # ---------- turns ----------
+    def stream(self, key: str, message: str) -> Iterator[str]:
+        """
+        Runs one turn for `key`, yielding the reply so far. Story turns stream as
+        the narrator writes; commands (/undo, ...) yield their answer once.
+        """
+        live = self._get(key)
+        text = (message or "").strip()
+        with live.turn_lock:
+            if self._is_story(live, text):
+                # The session adds story turns to its transcript itself
+                yield from live.session.stream(text)  # type: ignore[union-attr]
+            else:
+                yield self._reply_now(key, live, text)
+
+    def _is_story(self, live: _Live, text: str) -> bool:
+        return (
+            live.session is not None
+            and bool(text)
+            and not text.startswith("/")
+            and (self.router.ready)
+        )
+
+    def _reply_now(self, key: str, live: _Live, text: str) -> str:
+        """Commands, remote turns and fallbacks: one synchronous reply, added to the transcript."""
+        if live.session is None:
+            reply = self.remote(key, text) if self.remote else ""
+        else:
+            reply = self.router.handle(text, [], live.session)
+            if text.startswith("/"):
+                live.pending = None  # the state moved in ways a diff can't express
+        live.transcript.add("user", text)
+        live.transcript.add("assistant", reply)
+        return reply
+
+    # ---------- background turns ----------
+    def submit(self, key: str, message: str) -> "InflightTurn":
+        """
+        Starts a turn on the shared background loop and returns at once. While it
+        runs, every caller for `key` (another tab, a rerun) gets the same turn back
+        instead of starting a second one; check `turn.message` to tell.
+        """
+        with self._lock:
+            turn = self._inflight.get(key)
+            if turn is not None and not turn.done:
+                return turn
+            turn = self._inflight[key] = InflightTurn(key, (message or "").strip())
+        turn.future = TURN_LOOP.submit(self._play(turn))
+        return turn
+
+    def inflight(self, key: str) -> Optional["InflightTurn"]:
+        """The turn running for `key`, if any."""
+        turn = self._inflight.get(key)
+        return turn if turn is not None and not turn.done else None
+
+    async def _play(self, turn: "InflightTurn") -> None:
+        live = self._get(turn.key)
+        await asyncio.to_thread(live.turn_lock.acquire)
+        try:
+            if self._is_story(live, turn.message):
+                reply = await live.session.respond_async(  # type: ignore[union-attr]
+                    turn.message, on_delta=turn.push
+                )
+            else:
+                reply = await asyncio.to_thread(self._reply_now, turn.key, live, turn.message)
+        except BaseException as e:
+            turn.finish(error=e)
+            raise
+        finally:
+            live.turn_lock.release()
+        turn.finish(reply=reply)
+
+    # ---------- chat window ----------
+    def window(
+        self, key: str, limit: int = CHAT_WINDOW_MESSAGES
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """The newest `limit` messages and the cursor to page back from (None: nothing older)."""
+        return self._get(key).transcript.window(limit)
+
+    def older(
+        self, key: str, cursor: str, limit: int = CHAT_WINDOW_MESSAGES
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """The page before `cursor`; raises game.transcript.CursorError for a bad cursor."""
+        return self._get(key).transcript.page(cursor, limit)
+
+    def messages(self, key: str) -> List[Dict[str, str]]:
+        """The bounded chat window for `key`, oldest first."""
+        return self.window(key)[0]
+
+    def clear_chat(self, key: str) -> None:
+        """Clears the chat (the game goes on); outstanding cursors are invalidated."""
+        transcript = self._get(key).transcript
+        transcript.clear()
+        transcript.add("assistant", NARRATOR_INTRO)
+
+    # ---------- side panel ----------
+    def panel(self, key: str) -> Dict[str, Any]:
+        """A full (bounded) snapshot of the side panel; later turns send panel_diff."""
+        live = self._get(key)
+        live.pending = []
+        state = live.session.state if live.session is not None else GameState()
+        return {
+            "reset": True,
+            "items": [item.name for item in state.items],
+            "log": [vars(e) for e in state.game_log[-PANEL_LOG_ENTRIES:]],
+        }
+
+    def panel_diff(self, key: str) -> Dict[str, Any]:
+        """What changed in the panel since it was last sent (a snapshot if a diff can't say)."""
+        live = self._get(key)
+        if live.pending is None:
+            return self.panel(key)
+        added: List[str] = []
+        removed: List[str] = []
+        log: List[Dict[str, Any]] = []
+        for changes in live.pending:
+            for name in changes.items_removed:
+                # Added and removed again since the last send: the browser never saw it
+                if name in added:
+                    added.remove(name)
+                else:
+                    removed.append(name)
+            added.extend(item.name for item in changes.items_added)
+            log.extend(vars(e) for e in changes.game_log)
+        live.pending = []
+        return {
+            "reset": False,
+            "items_added": added,
+            "items_removed": removed,
+            "log": log[-PANEL_LOG_ENTRIES:],
+        }
@@ -0,0 +1,306 @@
+"""
+Sharded deployment: sessions spread over K worker processes.
+
+The front process owns no game state. Each session ID is mapped to a worker by
+consistent hashing (so it always lands on the same worker), and that worker owns
+the session's GameState and agents. Front and workers talk over multiprocessing
+pipes. Prompt assembly, scrubbing and save serialization then run on K GILs.
+
+    pool = ShardPool(4).start()
+    reply = pool.handle(session_id, "Look around")
+    pool.restart(2)   # drains shard 2's in-flight turns, then swaps the process
+    pool.close()
+
+Workers autosave through a StateStore (THRILLER_STORE), so a restarted worker
+picks its sessions back up from disk. The same goes for sessions a worker drops
+from memory: idle ones and, past max_active, the least recently used.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import itertools
+import multiprocessing as mp
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from multiprocessing.connection import Connection
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from game.config import (
+    SESSION_IDLE_TTL_S,
+    SESSION_MAX_ACTIVE,
+    SHARD_START_METHOD,
+    SHARD_WORKER_THREADS,
+)
+
+# ---------- consistent hashing ----------
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes; adding a node moves ~1/K of the keys."""
+
+    def __init__(self, nodes: List[int], vnodes: int = 64) -> None:
+        points = sorted((_hash(f"{node}#{v}"), node) for node in nodes for v in range(vnodes))
+        self._keys = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def node_for(self, key: str) -> int:
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+# ---------- worker process ----------
+
+
+def _worker_main(
+    conn: Connection,
+    store_url: Optional[str],
+    threads: int,
+    max_active: int = SESSION_MAX_ACTIVE,
+    idle_ttl_s: float = SESSION_IDLE_TTL_S,
+) -> None:
+    """Serves turns for the sessions hashed to this worker until told to stop."""
+    from game.engine import Session
+    from game.router import Router
+    from game.store import open_store
+
+    store = open_store(store_url)
+    router = Router()
+    # sid -> (session, last used), least recently used first
+    sessions: "OrderedDict[str, Tuple[Session, float]]" = OrderedDict()
+    # Per-session FIFO of (req_id, text); a session is drained by at most one thread
+    queues: Dict[str, Deque[Tuple[int, str]]] = {}
+    registry_lock = threading.Lock()
+    send_lock = threading.Lock()
+
+    def evict(now: float) -> None:
+        """Drops idle sessions, then the least recently used beyond max_active (as
+        SessionManager does); they autosaved, so a later turn reloads them."""
+        for sid in list(sessions):
+            over = len(sessions) > max_active
+            idle = now - sessions[sid][1] > idle_ttl_s
+            if not (over or idle):
+                break  # ordered by last use: everything after is newer
+            if sid not in queues:  # never one with a turn queued or running
+                del sessions[sid]
+
+    def session_for(sid: str) -> Session:
+        with registry_lock:
+            entry = sessions.get(sid)
+        if entry is None:
+            # Only this session's drain thread gets here for `sid`: loading can run unlocked
+            state = store.load(sid) if store.exists(sid) else None
+            session = Session(state, session_id=sid, store=store)
+            session.recover_turns()
+        else:
+            session = entry[0]
+        with registry_lock:
+            now = time.monotonic()
+            sessions[sid] = (session, now)
+            sessions.move_to_end(sid)
+            evict(now)
+        return session
+
+    def drain(sid: str) -> None:
+        while True:
+            with registry_lock:
+                if not queues[sid]:
+                    del queues[sid]
+                    return
+                req_id, text = queues[sid].popleft()
+            try:
+                out: Tuple[Any, ...] = (req_id, True, router.handle(text, [], session_for(sid)))
+            except Exception as e:
+                out = (req_id, False, repr(e))
+            with send_lock:
+                conn.send(out)
+
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="shard-turn")
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg[0] == "stop":
+            break
+        _, req_id, sid, text = msg
+        with registry_lock:
+            idle = sid not in queues
+            queues.setdefault(sid, deque()).append((req_id, text))
+        if idle:  # turns of one session run in order, one at a time
+            pool.submit(drain, sid)
+
+    # Graceful drain: finish in-flight turns (they autosave) before exiting
+    pool.shutdown(wait=True)
+    store.close()
+    with send_lock:
+        try:
+            conn.send(("stopped",))
+        except (BrokenPipeError, OSError):
+            pass
+    conn.close()
+
+
+# ---------- front process ----------
+
+
+class _Shard:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.proc: Optional[Any] = None
+        self.conn: Optional[Connection] = None
+        self.reader: Optional[threading.Thread] = None
+        self.pending: Dict[int, Future] = {}
+        self.lock = threading.Lock()
+        # Cleared while the shard drains/restarts; submits wait on it (sticky routing)
+        self.accepting = threading.Event()
+
+
+class ShardPool:
+    """Routes session turns to K worker processes by consistent hashing."""
+
+    def __init__(
+        self,
+        workers: int,
+        store_url: Optional[str] = None,
+        threads_per_worker: int = SHARD_WORKER_THREADS,
+        mp_context: Optional[Any] = None,
+        vnodes: int = 64,
+        max_active: int = SESSION_MAX_ACTIVE,
+        idle_ttl_s: float = SESSION_IDLE_TTL_S,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("ShardPool needs at least one worker")
+        self.store_url = store_url
+        self.threads_per_worker = threads_per_worker
+        self.max_active = max_active
+        self.idle_ttl_s = idle_ttl_s
+        # Explicit, not the platform default: fork from a threaded server is unsafe
+        self._ctx = mp_context or mp.get_context(SHARD_START_METHOD)
+        self._ring = HashRing(list(range(workers)), vnodes=vnodes)
+        self._shards = [_Shard(i) for i in range(workers)]
+        self._ids = itertools.count(1)
+
+    # ---------- lifecycle ----------
+    def start(self) -> "ShardPool":
+        for shard in self._shards:
+            self._spawn(shard)
+        return self
+
+    def _spawn(self, shard: _Shard) -> None:
+        front, back = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                back,
+                self.store_url,
+                self.threads_per_worker,
+                self.max_active,
+                self.idle_ttl_s,
+            ),
+            name=f"thriller-shard-{shard.index}",
+            daemon=True,
+        )
+        proc.start()
+        back.close()
+        shard.proc, shard.conn = proc, front
+        shard.reader = threading.Thread(target=self._read_replies, args=(shard, front), daemon=True)
+        shard.reader.start()
+        shard.accepting.set()
+
+    def _read_replies(self, shard: _Shard, conn: Connection) -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg[0] == "stopped":
+                break
+            req_id, ok, payload = msg
+            with shard.lock:
+                fut = shard.pending.pop(req_id, None)
+            if fut is None:
+                continue
+            if ok:
+                fut.set_result(payload)
+            else:
+                fut.set_exception(RuntimeError(payload))
+
+        # Whatever is still pending will never be answered by this process
+        with shard.lock:
+            orphans, shard.pending = list(shard.pending.values()), {}
+        for fut in orphans:
+            fut.set_exception(RuntimeError(f"Shard {shard.index} worker exited"))
+
+    def _drain(self, shard: _Shard, timeout: Optional[float]) -> None:
+        with shard.lock:
+            shard.accepting.clear()
+            inflight = list(shard.pending.values())
+        wait(inflight, timeout=timeout)
+        if shard.conn is not None:
+            try:
+                shard.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        if shard.proc is not None:
+            shard.proc.join(timeout)
+            if shard.proc.is_alive():
+                shard.proc.terminate()
+                shard.proc.join()
+        if shard.reader is not None:
+            shard.reader.join(timeout)
+        if shard.conn is not None:
+            shard.conn.close()
+
+    def restart(self, index: int, timeout: Optional[float] = 30.0) -> None:
+        """Drains one shard (new turns wait, in-flight turns finish) and respawns it."""
+        shard = self._shards[index]
+        self._drain(shard, timeout)
+        self._spawn(shard)
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        for shard in self._shards:
+            self._drain(shard, timeout)
+
+    def __enter__(self) -> "ShardPool":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---------- routing ----------
+    def shard_for(self, session_id: str) -> int:
+        return self._ring.node_for(session_id)
+
+    def submit(self, session_id: str, message: str) -> Future:
+        shard = self._shards[self.shard_for(session_id)]
+        while True:
+            shard.accepting.wait()
+            with shard.lock:
+                if not shard.accepting.is_set():
+                    continue
+                if shard.proc is not None and not shard.proc.is_alive():
+                    # Crashed worker: replace it before routing more turns to it
+                    shard.accepting.clear()
+                    respawn = True
+                else:
+                    respawn = False
+                    req_id = next(self._ids)
+                    fut: Future = Future()
+                    shard.pending[req_id] = fut
+                    assert shard.conn is not None
+                    shard.conn.send(("turn", req_id, session_id, message))
+                    return fut
+            if respawn:
+                self._drain(shard, timeout=1.0)
+                self._spawn(shard)
+
+    def handle(self, session_id: str, message: str, timeout: Optional[float] = None) -> str:
+        return self.submit(session_id, message).result(timeout)
@@ -0,0 +1,213 @@
+"""
+Headless batch simulation: many automated playthroughs, concurrently.
+
+    python -m game.simulate --sessions 50 --turns 20 --concurrency 8 --out runs/sim.jsonl
+
+Each session gets its own isolated GameState (engine.Session); sessions run as
+asyncio tasks behind a semaphore. Every turn is streamed to JSONL as it finishes,
+and the run ends with throughput and latency percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+from agents import Agent, Runner
+
+from game.config import EXAMPLE_COMMANDS, MODEL
+from game.content import NARRATOR_INTRO
+from game.engine import Session
+from game.metrics import percentile
+from game.retrieval import flush_indexing
+from game.state import GameState
+from game.store import JsonStateStore, StateStore
+from game.tiering import tier_report
+
+# ---------- player policies ----------
+
+
+class ScriptedPolicy:
+    """Picks actions from a fixed list; seeded per session so runs are reproducible."""
+
+    def __init__(self, commands: Sequence[str] = EXAMPLE_COMMANDS, seed: int = 0) -> None:
+        if not commands:
+            raise ValueError("ScriptedPolicy needs at least one command")
+        self.commands = list(commands)
+        self.seed = seed
+        self._rngs: Dict[str, random.Random] = {}
+
+    async def next_action(self, session_id: str, turn: int, last_reply: str) -> str:
+        rng = self._rngs.setdefault(session_id, random.Random(f"{self.seed}:{session_id}"))
+        return rng.choice(self.commands)
+
+
+class AgentPolicy:
+    """Lets a model play the player: it reads the last narration and answers with one action."""
+
+    INSTRUCTIONS = (
+        "You are playing a text thriller as the player character. Read the narrator's "
+        "latest message and reply with ONE short action in the first person imperative "
+        "(e.g. 'Check the window'). No narration, no quotes."
+    )
+
+    def __init__(self, model: str = MODEL) -> None:
+        self.agent = Agent(
+            name="Player Agent", instructions=self.INSTRUCTIONS, model=model, tools=[]
+        )
+
+    async def next_action(self, session_id: str, turn: int, last_reply: str) -> str:
+        result = await Runner.run(self.agent, last_reply or NARRATOR_INTRO)
+        text = str(getattr(result, "final_output", result)).strip()
+        return (text.splitlines() or ["Look around"])[0][:200]
+
+
+# ---------- results ----------
+
+
+@dataclass
+class TurnResult:
+    session: str
+    turn: int
+    action: str
+    reply: str
+    latency_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class SimulationReport:
+    sessions: int
+    turns: int
+    errors: int
+    wall_s: float
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+    states: Dict[str, GameState] = field(default_factory=dict, repr=False)
+
+    @property
+    def turns_per_s(self) -> float:
+        return self.turns / self.wall_s if self.wall_s else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        lat = sorted(self.latencies_ms)
+        return {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "errors": self.errors,
+            "wall_s": round(self.wall_s, 3),
+            "turns_per_s": round(self.turns_per_s, 2),
+            "latency_ms_mean": round(sum(lat) / len(lat), 2) if lat else 0.0,
+            "latency_ms_p50": round(percentile(lat, 50), 2),
+            "latency_ms_p90": round(percentile(lat, 90), 2),
+            "latency_ms_p99": round(percentile(lat, 99), 2),
+            "latency_ms_max": round(lat[-1], 2) if lat else 0.0,
+        }
+
+
+# ---------- runner ----------
+
+
+async def run_simulation(
+    sessions: int,
+    turns: int,
+    policy: Any,
+    concurrency: int = 8,
+    out: Optional[IO[str]] = None,
+    store: Optional[StateStore] = None,
+    prefix: str = "sim",
+) -> SimulationReport:
+    """Plays `sessions` x `turns`, at most `concurrency` sessions at a time."""
+    gate = asyncio.Semaphore(max(concurrency, 1))
+    report = SimulationReport(sessions=sessions, turns=0, errors=0, wall_s=0.0)
+
+    def emit(res: TurnResult) -> None:
+        report.turns += 1
+        report.latencies_ms.append(res.latency_ms)
+        if res.error:
+            report.errors += 1
+        if out is not None:
+            out.write(json.dumps(asdict(res), ensure_ascii=False) + "\n")
+            out.flush()
+
+    async def play(n: int) -> None:
+        sid = f"{prefix}-{n:05d}"
+        async with gate:
+            session = Session(session_id=sid, store=store, autosave=store is not None)
+            reply = NARRATOR_INTRO
+            for turn in range(1, turns + 1):
+                action = await policy.next_action(sid, turn, reply)
+                started = time.perf_counter()
+                error = None
+                try:
+                    reply = await session.respond_async(action)
+                except Exception as e:  # keep the batch going; the error is in the JSONL
+                    reply, error = "", repr(e)
+                emit(
+                    TurnResult(
+                        session=sid,
+                        turn=turn,
+                        action=action,
+                        reply=reply,
+                        latency_ms=(time.perf_counter() - started) * 1000,
+                        error=error,
+                    )
+                )
+            report.states[sid] = session.state
+
+    started = time.perf_counter()
+    await asyncio.gather(*(play(n) for n in range(sessions)))
+    report.wall_s = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run many automated playthroughs.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--policy", choices=["scripted", "agent"], default="scripted")
+    parser.add_argument("--script", help="File with one player command per line (scripted)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=MODEL, help="Model for the agent policy")
+    parser.add_argument("--out", help="Stream per-turn results to this JSONL file")
+    parser.add_argument("--save-dir", help="Save every session as JSON under this directory")
+    args = parser.parse_args(argv)
+
+    if args.policy == "agent":
+        policy: Any = AgentPolicy(model=args.model)
+    elif args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            policy = ScriptedPolicy([ln.strip() for ln in f if ln.strip()], seed=args.seed)
+    else:
+        policy = ScriptedPolicy(seed=args.seed)
+
+    store = JsonStateStore(args.save_dir) if args.save_dir else None
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        report = asyncio.run(
+            run_simulation(
+                args.sessions,
+                args.turns,
+                policy,
+                concurrency=args.concurrency,
+                out=out,
+                store=store,
+            )
+        )
+    finally:
+        if out is not None:
+            out.close()
+        flush_indexing()  # log indexes are saved next to the sessions in the background
+
+    print(json.dumps({**report.summary(), "tiers": tier_report()}, indent=2))
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,39 @@
 """
 Structured game state and helpers, now with persistence utilities.
+
+save_many / load_many / iter_sessions handle a whole directory of sessions at
+once (server restart, backup) with parallel I/O.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Literal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from game.config import BULK_DECODE_PROCESS_BYTES, BULK_IO_THREADS, BULK_PROGRESS_FILE
+from game.migrations import SAVE_VERSION, migrate_dict, pack_entry, unpack_entry
 
-GameLogCategory = Literal["event", "discovery", "decision", "question", "item", "ambient"]
+GameLogCategory = Literal[
+    "event", "discovery", "decision", "question", "item", "ambient", "summary"
+]
 ResearchCategory = Literal["info", "symbol", "historical", "technical", "psychological", "warning"]
 
 
@@ -34,36 +57,108 @@ class InventoryItem:
     description: str = ""
 
 
+class Inventory(List[InventoryItem]):
+    """
+    Inventory list that caches an immutable tuple of its items. Save points share
+    that tuple until the next mutation, so snapshotting the inventory is O(1).
+    """
+
+    _frozen: Optional[Tuple[InventoryItem, ...]] = None
+
+    def frozen(self) -> Tuple[InventoryItem, ...]:
+        if self._frozen is None:
+            self._frozen = tuple(self)
+        return self._frozen
+
+
+def _invalidating(name: str) -> Callable[..., Any]:
+    base = getattr(list, name)
+
+    def method(self: Inventory, *args: Any, **kwargs: Any) -> Any:
+        self._frozen = None
+        return base(self, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(Inventory, _name, _invalidating(_name))
+
+
 @dataclass
 class GameState:
     game_log: List[GameLogEntry] = field(default_factory=list)
     research_log: List[ResearchLogEntry] = field(default_factory=list)
-    items: List[InventoryItem] = field(default_factory=list)
+    items: List[InventoryItem] = field(default_factory=Inventory)
+    # Compacted view of game_log[:compacted_upto] (see game.compaction)
+    log_summaries: List[GameLogEntry] = field(default_factory=list)
+    compacted_upto: int = 0
 
     # ---------- conversion ----------
     def to_dict(self) -> Dict[str, Any]:
+        blobs: Dict[str, str] = {}
+        research_log = [pack_entry(asdict(e), blobs) for e in self.research_log]
         return {
+            "version": SAVE_VERSION,
+            # Ahead of the logs, so streaming readers have them before any ref
+            "blobs": [{"id": ref, "text": text} for ref, text in blobs.items()],
             "game_log": [asdict(e) for e in self.game_log],
-            "research_log": [asdict(e) for e in self.research_log],
+            "research_log": research_log,
             "items": [asdict(i) for i in self.items],
+            "log_summaries": [asdict(e) for e in self.log_summaries],
+            "compacted_upto": self.compacted_upto,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        """Builds a state from a save dict, upgrading older versions (game.migrations)."""
+        data = migrate_dict(data)
         state = cls()
         for e in data.get("game_log", []):
             state.game_log.append(GameLogEntry(**e))
+        blobs = {b["id"]: b["text"] for b in data.get("blobs", [])}
         for e in data.get("research_log", []):
-            state.research_log.append(ResearchLogEntry(**e))
+            state.research_log.append(ResearchLogEntry(**unpack_entry(e, blobs)))
         for i in data.get("items", []):
             state.items.append(InventoryItem(**i))
+        for e in data.get("log_summaries", []):
+            state.log_summaries.append(GameLogEntry(**e))
+        state.compacted_upto = min(int(data.get("compacted_upto", 0)), len(state.game_log))
         return state
 
+    def replace_with(self, other: "GameState") -> None:
+        """Takes over another state's contents in place; references to self stay valid."""
+        self.game_log[:] = other.game_log
+        self.research_log[:] = other.research_log
+        self.items[:] = other.items
+        self.log_summaries[:] = other.log_summaries
+        self.compacted_upto = other.compacted_upto
+
     # ---------- file I/O ----------
-    def save_json(self, path: str) -> None:
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def save_json(self, path: str, text: Optional[str] = None) -> None:
+        """Writes the save (`text`, if already rendered by to_json) to `path`."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One write of the finished text: quicker than json.dump's many small ones
+        text = self.to_json() if text is None else text
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            f.write(text)
 
     def save(self, path: str | None = None) -> str:
         """Convenience wrapper that picks up the env var at save time."""
@@ -81,6 +176,26 @@ class GameState:
 # ---------- default global state ----------
 default_state = GameState()
 
+# State bound to the current task/thread; tools fall back to default_state
+_ACTIVE_STATE: ContextVar[Optional[GameState]] = ContextVar("active_state", default=None)
+
+
+def active_state() -> GameState:
+    """Returns the state tools should mutate: the one bound by use_state(), else default_state."""
+    state = _ACTIVE_STATE.get()
+    return default_state if state is None else state
+
+
+@contextmanager
+def use_state(state: GameState) -> Iterator[GameState]:
+    """Binds `state` for tool calls made in this context (asyncio tasks inherit it)."""
+    token = _ACTIVE_STATE.set(state)
+    try:
+        yield state
+    finally:
+        _ACTIVE_STATE.reset(token)
+
+
 # ---------- persistence helpers ----------
 DEFAULT_SAVE_PATH = os.getenv("THRILLER_SAVE_PATH", "assets/sample_runs/session_latest.json")
 
@@ -97,10 +212,172 @@ def save_state(path: str | None = None) -> None:
 
 
 def load_state(path: str | None = None) -> None:
-    """Loads game state from disk into default_state. Respects THRILLER_SAVE_PATH when None."""
-    global default_state
+    """
+    Loads game state from disk into default_state. Respects THRILLER_SAVE_PATH when None.
+    Loads in place, so tools and sessions holding default_state see the loaded game.
+    """
     resolved = _get_save_path(path)
     if os.path.exists(resolved):
-        default_state = GameState.load_json(resolved)
+        default_state.replace_with(GameState.load_json(resolved))
     else:
         raise FileNotFoundError(f"No saved game found at {resolved}")
+
+
+# ---------- many sessions at once (restart, backup) ----------
+
+# Called as progress(finished, total) as each session is loaded or saved
+Progress = Callable[[int, int], None]
+
+
+@dataclass
+class BulkReport:
+    done: int = 0
+    skipped: int = 0  # already saved by an earlier, interrupted run
+    failed: Dict[str, str] = field(default_factory=dict)  # session id -> error
+    seconds: float = 0.0
+
+
+def iter_sessions(directory: str, suffix: str = ".json") -> Iterator[Tuple[str, str]]:
+    """(session_id, path) for every save in `directory`, by id, without opening any."""
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(suffix) and e.is_file()]
+    except FileNotFoundError:
+        return
+    for entry in sorted(entries, key=lambda e: e.name):
+        yield entry.name[: -len(suffix)], entry.path
+
+
+# Sessions per pool task: one hand-off per batch instead of per file keeps the
+# caller from contending with the workers for the GIL on every completion
+_BATCH = 64
+
+# (session_id, state or None, error) per session of a batch
+_Outcome = Tuple[str, Optional[GameState], str]
+
+
+def _batches(items: List[Any], workers: int) -> List[List[Any]]:
+    size = min(max(len(items) // (max(workers, 1) * 4), 1), _BATCH)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _load_batch(batch: List[Tuple[str, str]]) -> List[_Outcome]:
+    outcomes: List[_Outcome] = []
+    for sid, path in batch:
+        try:
+            outcomes.append((sid, GameState.load_json(path), ""))
+        except Exception as e:
+            outcomes.append((sid, None, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _save_batch(batch: List[Tuple[str, GameState, str]]) -> List[Tuple[str, str, str]]:
+    """(session, digest of what was written, error) per session."""
+    outcomes: List[Tuple[str, str, str]] = []
+    for sid, state, path in batch:
+        try:
+            text = state.to_json()
+            state.save_json(path, text)
+            outcomes.append((sid, _digest(text), ""))
+        except Exception as e:
+            outcomes.append((sid, "", f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def load_many(
+    directory: str,
+    ids: Optional[Iterable[str]] = None,
+    threads: int = BULK_IO_THREADS,
+    processes: Optional[int] = None,
+    process_bytes: int = BULK_DECODE_PROCESS_BYTES,
+    progress: Optional[Progress] = None,
+) -> Tuple[Dict[str, GameState], BulkReport]:
+    """
+    Loads every save in `directory` (or just `ids`). Files are read and decoded on
+    `threads` threads; files of `process_bytes` or more are decoded on a pool of
+    `processes` instead, where json parsing is not serialized by the GIL. A bad file
+    is reported in `report.failed` and the rest still load; pass those ids to retry.
+    """
+    started = time.perf_counter()
+    wanted = None if ids is None else set(ids)
+    paths = [(sid, p) for sid, p in iter_sessions(directory) if wanted is None or sid in wanted]
+    report = BulkReport()
+    for sid in (wanted or set()) - {sid for sid, _ in paths}:
+        report.failed[sid] = "FileNotFoundError: no save"
+    large = [(sid, p) for sid, p in paths if os.path.getsize(p) >= process_bytes]
+    small = [(sid, p) for sid, p in paths if os.path.getsize(p) < process_bytes]
+    states: Dict[str, GameState] = {}
+    with ThreadPoolExecutor(threads) as io_pool, ExitStack() as stack:
+        futures = {io_pool.submit(_load_batch, b): len(b) for b in _batches(small, threads)}
+        if large:
+            procs = stack.enter_context(ProcessPoolExecutor(processes))
+            workers = processes or os.cpu_count() or 1
+            futures.update({procs.submit(_load_batch, b): len(b) for b in _batches(large, workers)})
+        finished = 0
+        for future in as_completed(futures):
+            for sid, state, error in future.result():
+                if state is None:
+                    report.failed[sid] = error
+                else:
+                    states[sid] = state
+                    report.done += 1
+            finished += futures[future]
+            if progress is not None:
+                progress(finished, len(paths))
+    report.seconds = time.perf_counter() - started
+    return states, report
+
+
+def save_many(
+    states: Mapping[str, GameState],
+    directory: str,
+    threads: int = BULK_IO_THREADS,
+    progress: Optional[Progress] = None,
+    resume: bool = True,
+) -> BulkReport:
+    """
+    Saves each state to `<directory>/<session_id>.json` on `threads` threads.
+    Finished sessions are appended to a progress file in `directory` as they land,
+    so a run that is interrupted (crash, deploy) can be repeated: it skips what it
+    already wrote and rewrites the rest, including any file the interruption left
+    half-written; sessions that changed since are saved again. The progress file
+    is removed once every session has been saved.
+    """
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    journal = os.path.join(directory, BULK_PROGRESS_FILE)
+    saved: Dict[str, str] = {}
+    if resume and os.path.exists(journal):
+        with open(journal, "r", encoding="utf-8") as f:
+            saved = dict(line.rstrip("\n").split("\t", 1) for line in f if "\t" in line)
+    report = BulkReport()
+    todo = []
+    for sid, state in states.items():
+        # Only sessions in the progress file are rendered twice (to compare)
+        if sid in saved and saved[sid] == _digest(state.to_json()):
+            report.skipped += 1
+        else:
+            todo.append((sid, state, os.path.join(directory, f"{sid}.json")))
+    with ThreadPoolExecutor(threads) as pool, open(journal, "a", encoding="utf-8") as log:
+        futures = {pool.submit(_save_batch, b): len(b) for b in _batches(todo, threads)}
+        finished = 0
+        for future in as_completed(futures):
+            lines = []
+            for sid, digest, error in future.result():
+                if error:
+                    report.failed[sid] = error
+                else:
+                    lines.append(f"{sid}\t{digest}\n")
+                    report.done += 1
+            log.write("".join(lines))
+            log.flush()
+            finished += futures[future]
+            if progress is not None:
+                progress(finished, len(todo))
+    if not report.failed:
+        os.remove(journal)
+    report.seconds = time.perf_counter() - started
+    return report
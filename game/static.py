@@ -0,0 +1,76 @@
+"""
+Precomputed responses for the web frontends' static routes.
+
+The manifest, robots.txt, sitemap, stylesheet and title image are built once at
+startup (body bytes + a strong ETag) instead of on every request. Clients
+revalidate with If-None-Match and get a bodiless 304; Cache-Control says how long
+they may skip even that. Content-addressed URLs (`versioned_path`) change whenever
+the bytes do, so those are cached as immutable for a year.
+
+Framework-agnostic: `respond()` returns (status, body, headers) for the app to wrap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from game.config import STATIC_MAX_AGE_S
+
+# Short-lived: clients may reuse for a while, then revalidate (cheap 304)
+REVALIDATE = f"public, max-age={STATIC_MAX_AGE_S}, must-revalidate"
+# Content-addressed URLs never change meaning
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    body: bytes
+    media_type: str
+    cache_control: str = REVALIDATE
+    etag: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        digest = hashlib.sha256(self.body).hexdigest()[:20]
+        object.__setattr__(self, "etag", f'"{digest}"')
+
+    @classmethod
+    def text(cls, text: str, media_type: str, cache_control: str = REVALIDATE) -> "StaticAsset":
+        return cls(text.encode("utf-8"), media_type, cache_control)
+
+    @classmethod
+    def json(cls, data: Any, cache_control: str = REVALIDATE) -> "StaticAsset":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return cls.text(body, "application/json", cache_control)
+
+    @classmethod
+    def file(cls, path: str, cache_control: str = REVALIDATE) -> "StaticAsset":
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            return cls(f.read(), media_type, cache_control)
+
+    def versioned_path(self, path: str) -> str:
+        """`path` with the content hash before the extension: /a/b.png -> /a/b.<hash>.png."""
+        stem, ext = os.path.splitext(path)
+        return f"{stem}.{self.etag.strip(chr(34))[:12]}{ext}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": self.cache_control}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True when an If-None-Match header already names this version (weak tags too)."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def respond(self, if_none_match: Optional[str] = None) -> Tuple[int, bytes, Dict[str, str]]:
+        """(status, body, headers): 304 with no body when the client is current."""
+        if self.matches(if_none_match):
+            return 304, b"", self.headers
+        return 200, self.body, {**self.headers, "Content-Type": self.media_type}
@@ -0,0 +1,377 @@
+"""
+Multi-session persistence behind one StateStore interface.
+
+- JsonStateStore: one `<session_id>.json` file per session (GameState.save_json).
+- SqliteStateStore: a single SQLite database in WAL mode with indexed tables for
+  sessions, log entries, research entries and items, so questions like "who holds
+  item X" or "who played in the last hour" are one query instead of a file scan.
+
+    store = open_store("sqlite:///runs/sessions.db")   # or a directory for JSON
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from game.retrieval import index_path
+from game.state import GameLogEntry, GameState, InventoryItem, ResearchLogEntry
+from game.transaction import ChangeSet
+from game.wal import wal_path
+
+STORE_URL_ENV = "THRILLER_STORE"
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.@-]+$")
+
+
+def _check_id(session_id: str) -> str:
+    if not _SAFE_ID.match(session_id) or session_id.startswith("."):
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    return session_id
+
+
+class StateStore(ABC):
+    """Persistence for many sessions. `load` raises KeyError for unknown sessions."""
+
+    @abstractmethod
+    def save(self, session_id: str, state: GameState) -> None: ...
+
+    @abstractmethod
+    def load(self, session_id: str) -> GameState: ...
+
+    @abstractmethod
+    def exists(self, session_id: str) -> bool: ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None: ...
+
+    @abstractmethod
+    def list_sessions(self) -> List[str]: ...
+
+    @abstractmethod
+    def sessions_with_item(self, item_name: str) -> List[str]: ...
+
+    @abstractmethod
+    def active_since(self, ts: float) -> List[str]:
+        """Sessions saved at or after `ts` (epoch seconds), most recent first."""
+
+    def save_changes(self, session_id: str, state: GameState, changes: ChangeSet) -> None:
+        """Saves `state` after a turn that made `changes`; stores may write only those."""
+        self.save(session_id, state)
+
+    def close(self) -> None:
+        pass
+
+
+# ---------- JSON files (the original save format) ----------
+
+
+class JsonStateStore(StateStore):
+    """One JSON file per session under `root`. Queries have to open every file."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, session_id: str) -> str:
+        return os.path.join(self.root, f"{_check_id(session_id)}.json")
+
+    def save(self, session_id: str, state: GameState) -> None:
+        state.save_json(self.path_for(session_id))
+
+    def load(self, session_id: str) -> GameState:
+        path = self.path_for(session_id)
+        if not os.path.exists(path):
+            raise KeyError(session_id)
+        return GameState.load_json(path)
+
+    def exists(self, session_id: str) -> bool:
+        return os.path.exists(self.path_for(session_id))
+
+    def delete(self, session_id: str) -> None:
+        path = self.path_for(session_id)
+        # The session's log index (game.retrieval) and write-ahead log (game.wal)
+        # live next to its JSON
+        for name in (path, index_path(path), wal_path(path)):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def list_sessions(self) -> List[str]:
+        return sorted(n[: -len(".json")] for n in os.listdir(self.root) if n.endswith(".json"))
+
+    def sessions_with_item(self, item_name: str) -> List[str]:
+        return [
+            sid
+            for sid in self.list_sessions()
+            if any(i.name == item_name for i in self.load(sid).items)
+        ]
+
+    def active_since(self, ts: float) -> List[str]:
+        recent = []
+        for sid in self.list_sessions():
+            mtime = os.path.getmtime(self.path_for(sid))
+            if mtime >= ts:
+                recent.append((mtime, sid))
+        return [sid for _, sid in sorted(recent, reverse=True)]
+
+
+# ---------- SQLite ----------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    compacted_upto INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS game_log (
+    session_id TEXT NOT NULL, seq INTEGER NOT NULL,
+    category TEXT NOT NULL, entry TEXT NOT NULL, ts REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS research_log (
+    session_id TEXT NOT NULL, seq INTEGER NOT NULL,
+    category TEXT NOT NULL, entry TEXT NOT NULL, ts REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS log_summaries (
+    session_id TEXT NOT NULL, seq INTEGER NOT NULL,
+    category TEXT NOT NULL, entry TEXT NOT NULL, ts REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS items (
+    session_id TEXT NOT NULL, seq INTEGER NOT NULL,
+    name TEXT NOT NULL, description TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+CREATE INDEX IF NOT EXISTS idx_game_log_ts ON game_log (ts);
+CREATE INDEX IF NOT EXISTS idx_game_log_category ON game_log (category, session_id);
+CREATE INDEX IF NOT EXISTS idx_research_log_ts ON research_log (ts);
+CREATE INDEX IF NOT EXISTS idx_research_log_category ON research_log (category, session_id);
+CREATE INDEX IF NOT EXISTS idx_items_name ON items (name, session_id);
+"""
+
+# Log tables share one shape: (category, entry, ts) rows keyed by (session_id, seq)
+_LOG_TABLES = ("game_log", "research_log", "log_summaries")
+
+
+class SqliteStateStore(StateStore):
+    """
+    SQLite (WAL) store. Each thread reuses its own connection; every save is one
+    transaction that appends only the log rows added since the previous save.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    # ---------- writes ----------
+    def save(self, session_id: str, state: GameState) -> None:
+        _check_id(session_id)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (id, created_at, updated_at, compacted_upto)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET"
+                " updated_at = excluded.updated_at, compacted_upto = excluded.compacted_upto",
+                (session_id, now, now, state.compacted_upto),
+            )
+            self._sync_log(conn, "game_log", session_id, state.game_log)
+            self._sync_log(conn, "research_log", session_id, state.research_log)
+            self._sync_log(conn, "log_summaries", session_id, state.log_summaries)
+            conn.execute("DELETE FROM items WHERE session_id = ?", (session_id,))
+            conn.executemany(
+                "INSERT INTO items (session_id, seq, name, description) VALUES (?, ?, ?, ?)",
+                [(session_id, n, i.name, i.description) for n, i in enumerate(state.items)],
+            )
+
+    def save_changes(self, session_id: str, state: GameState, changes: ChangeSet) -> None:
+        """One transaction with just the turn's new rows (items only if they changed)."""
+        _check_id(session_id)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (id, created_at, updated_at, compacted_upto)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET"
+                " updated_at = excluded.updated_at, compacted_upto = excluded.compacted_upto",
+                (session_id, now, now, state.compacted_upto),
+            )
+            self._append_log(conn, "game_log", session_id, state.game_log, changes.game_log)
+            self._append_log(
+                conn, "research_log", session_id, state.research_log, changes.research_log
+            )
+            self._sync_log(conn, "log_summaries", session_id, state.log_summaries)
+            if changes.items_changed:
+                conn.execute("DELETE FROM items WHERE session_id = ?", (session_id,))
+                conn.executemany(
+                    "INSERT INTO items (session_id, seq, name, description) VALUES (?, ?, ?, ?)",
+                    [(session_id, n, i.name, i.description) for n, i in enumerate(state.items)],
+                )
+
+    @classmethod
+    def _append_log(
+        cls,
+        conn: sqlite3.Connection,
+        table: str,
+        session_id: str,
+        entries: Sequence[Any],
+        new: Sequence[Any],
+    ) -> None:
+        base = len(entries) - len(new)
+        (stored,) = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if stored != base:
+            # Earlier saves were skipped or the log was rewound: fall back to a full sync
+            cls._sync_log(conn, table, session_id, entries)
+            return
+        conn.executemany(
+            f"INSERT INTO {table} (session_id, seq, category, entry, ts) VALUES (?, ?, ?, ?, ?)",
+            [(session_id, seq, e.category, e.entry, e.ts) for seq, e in enumerate(new, base)],
+        )
+
+    @staticmethod
+    def _sync_log(
+        conn: sqlite3.Connection, table: str, session_id: str, entries: Sequence[Any]
+    ) -> None:
+        """Appends new rows; rewrites only if the stored log diverged (undo/load)."""
+        (stored,) = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        start = min(stored, len(entries))
+        if start:
+            last = conn.execute(
+                f"SELECT category, entry, ts FROM {table} WHERE session_id = ? AND seq = ?",
+                (session_id, start - 1),
+            ).fetchone()
+            e = entries[start - 1]
+            if last != (e.category, e.entry, e.ts):
+                start = 0
+        if start < stored:
+            conn.execute(
+                f"DELETE FROM {table} WHERE session_id = ? AND seq >= ?", (session_id, start)
+            )
+        conn.executemany(
+            f"INSERT INTO {table} (session_id, seq, category, entry, ts) VALUES (?, ?, ?, ?, ?)",
+            [
+                (session_id, seq, e.category, e.entry, e.ts)
+                for seq, e in enumerate(entries[start:], start)
+            ],
+        )
+
+    def delete(self, session_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            for table in _LOG_TABLES + ("items",):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    # ---------- reads ----------
+    def load(self, session_id: str) -> GameState:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT compacted_upto FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(session_id)
+        state = GameState()
+        state.game_log.extend(
+            GameLogEntry(*r) for r in self._log_rows(conn, "game_log", session_id)
+        )
+        state.research_log.extend(
+            ResearchLogEntry(*r) for r in self._log_rows(conn, "research_log", session_id)
+        )
+        state.log_summaries.extend(
+            GameLogEntry(*r) for r in self._log_rows(conn, "log_summaries", session_id)
+        )
+        state.items.extend(
+            InventoryItem(*r)
+            for r in conn.execute(
+                "SELECT name, description FROM items WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            )
+        )
+        state.compacted_upto = min(row[0], len(state.game_log))
+        return state
+
+    @staticmethod
+    def _log_rows(conn: sqlite3.Connection, table: str, session_id: str) -> Iterable[Tuple]:
+        return conn.execute(
+            f"SELECT category, entry, ts FROM {table} WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        )
+
+    def exists(self, session_id: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,))
+        return row.fetchone() is not None
+
+    def list_sessions(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT id FROM sessions ORDER BY id")]
+
+    def sessions_with_item(self, item_name: str) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT DISTINCT session_id FROM items WHERE name = ? ORDER BY session_id",
+            (item_name,),
+        )
+        return [r[0] for r in rows]
+
+    def active_since(self, ts: float) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT id FROM sessions WHERE updated_at >= ? ORDER BY updated_at DESC", (ts,)
+        )
+        return [r[0] for r in rows]
+
+    def sessions_with_log_category(self, category: str, since: float = 0.0) -> List[str]:
+        """Sessions with a game log entry of `category` logged at or after `since`."""
+        rows = self._conn().execute(
+            "SELECT DISTINCT session_id FROM game_log WHERE category = ? AND ts >= ?"
+            " ORDER BY session_id",
+            (category, since),
+        )
+        return [r[0] for r in rows]
+
+    def close(self) -> None:
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+
+def open_store(url: Optional[str] = None) -> StateStore:
+    """
+    "sqlite:///path/to.db" opens a SqliteStateStore; anything else is a directory
+    for JSON files. Defaults to THRILLER_STORE, then assets/sample_runs/sessions.
+    """
+    url = url or os.getenv(STORE_URL_ENV) or "assets/sample_runs/sessions"
+    if url.startswith("sqlite:///"):
+        return SqliteStateStore(url[len("sqlite:///") :])
+    return JsonStateStore(url)
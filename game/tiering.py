@@ -0,0 +1,149 @@
+"""
+Model tiering: pick a fast or a large model for each call.
+
+Every player message is classified into a turn type:
+- "command": routine beats ("Look around", "Inventory", "Wait"), short and cheap
+- "action": an ordinary move
+- "cutscene": a key plot moment (confrontations, escapes, revelations)
+
+Each agent has a tier policy (AGENT_TIERS): "auto" maps the turn type through
+TIER_BY_TURN (research maps short lookups to "fast"), while "fast" or "large" pins it.
+Calls report latency, tokens and cost per tier to METRICS; see tier_report().
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Literal, Mapping, Optional, Tuple, cast
+
+from game.config import AGENT_TIERS, MODEL_PRICES, MODEL_TIERS
+from game.metrics import METRICS
+
+Tier = Literal["fast", "large"]
+TurnType = Literal["command", "action", "cutscene", "lookup"]
+
+TIER_BY_TURN: Dict[str, Tier] = {
+    "command": "fast",
+    "lookup": "fast",
+    "action": "large",
+    "cutscene": "large",
+}
+
+_ROUTINE = re.compile(
+    r"^(?:look|inventory|check|examine|inspect|wait|listen|search|read|"
+    r"peek|sit|stand|walk|run|go|move|hide|rest|think)\b",
+    re.IGNORECASE,
+)
+# Whole words and their inflections only ("running water" is no chase; "run away" is)
+_PLOT = re.compile(
+    r"\b(?:confront|fight|attack|shoot|shot|stabb?|kill|betray|trust|negotiat|surrender|"
+    r"escap|flee|fled|reveal|truth|billionaire|police|fbi|kidnapp?|jump|steal|stole|"
+    r"run away)(?:s|e|es|ed|ing|ion|al)?\b",
+    re.IGNORECASE,
+)
+
+
+def turn_type(message: str) -> TurnType:
+    """Classifies a player message; slash commands never reach the models."""
+    text = " ".join(message.split())
+    words = len(text.split())
+    if _PLOT.search(text) or words > 20:
+        return "cutscene"
+    if _ROUTINE.match(text) and words <= 6:
+        return "command"
+    return "action"
+
+
+def lookup_type(query: str) -> TurnType:
+    """Research queries: a short single question is a lookup, anything bigger is action."""
+    text = " ".join(query.split())
+    if len(text.split()) <= 15 and text.count("?") <= 1:
+        return "lookup"
+    return "action"
+
+
+@dataclass(frozen=True)
+class Route:
+    agent: str
+    turn_type: TurnType
+    tier: Tier
+    model: str
+
+
+class ModelRouter:
+    """Chooses the model for each agent call from its tier policy and the message."""
+
+    def __init__(
+        self,
+        tiers: Mapping[str, str] = MODEL_TIERS,
+        agent_tiers: Mapping[str, str] = AGENT_TIERS,
+        by_turn: Mapping[str, Tier] = TIER_BY_TURN,
+    ) -> None:
+        self.tiers = dict(tiers)
+        self.agent_tiers = dict(agent_tiers)
+        self.by_turn = dict(by_turn)
+
+    def route(self, agent: str, message: str) -> Route:
+        kind = lookup_type(message) if agent == "research" else turn_type(message)
+        policy = self.agent_tiers.get(agent, "auto")
+        tier = self.by_turn.get(kind, "large") if policy == "auto" else cast(Tier, policy)
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown model tier {tier!r} for agent {agent!r}")
+        return Route(agent=agent, turn_type=kind, tier=tier, model=self.tiers[tier])
+
+
+MODEL_ROUTER = ModelRouter()
+
+
+def with_model(agent: Any, model: str) -> Any:
+    """`agent` itself if it already uses `model` (or has none), else a copy that does."""
+    if getattr(agent, "model", model) == model:
+        return agent
+    routed = copy.copy(agent)
+    routed.model = model
+    return routed
+
+
+# ---------- reporting ----------
+
+
+def call_cost(model: str, usage: Mapping[str, int]) -> Optional[float]:
+    """USD for one call from MODEL_PRICES; None for models without a price."""
+    prices: Optional[Tuple[float, float]] = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (
+        usage.get("input_tokens", 0) * prices[0] + usage.get("output_tokens", 0) * prices[1]
+    ) / 1_000_000
+
+
+def record_call(route: Route, ms: float, usage: Mapping[str, int]) -> None:
+    prefix = f"tier.{route.tier}"
+    METRICS.incr(f"{prefix}.calls")
+    METRICS.incr(f"{prefix}.{route.agent}.calls")
+    METRICS.observe(f"{prefix}.latency_ms", ms)
+    METRICS.incr(f"{prefix}.input_tokens", usage.get("input_tokens", 0))
+    METRICS.incr(f"{prefix}.output_tokens", usage.get("output_tokens", 0))
+    cost = call_cost(route.model, usage)
+    if cost is not None:
+        METRICS.incr(f"{prefix}.cost_usd", cost)
+
+
+def tier_report() -> Dict[str, Dict[str, Any]]:
+    """Calls, latency percentiles, tokens and cost so far, per tier."""
+    report = {}
+    for tier in MODEL_ROUTER.tiers:
+        prefix = f"tier.{tier}"
+        latency = METRICS.series(f"{prefix}.latency_ms")
+        report[tier] = {
+            "model": MODEL_ROUTER.tiers[tier],
+            "calls": METRICS.counter(f"{prefix}.calls"),
+            "latency_ms_p50": latency["p50"],
+            "latency_ms_p95": latency["p95"],
+            "input_tokens": METRICS.counter(f"{prefix}.input_tokens"),
+            "output_tokens": METRICS.counter(f"{prefix}.output_tokens"),
+            "cost_usd": round(METRICS.counter(f"{prefix}.cost_usd"), 6),
+        }
+    return report
@@ -2,27 +2,310 @@
 Function tools used by the agents.
 """
 
-from typing import TYPE_CHECKING, Awaitable, Callable, List, Literal, Optional, cast
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import functools
+import hashlib
+import inspect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 from agents import Runner, function_tool
 
-from game.state import GameLogEntry, InventoryItem, ResearchLogEntry, default_state
+from game.cache import Cache, cache_from_env
+from game.config import DEDUPE_WINDOW, TOOL_ARG_DEFAULT_MAX_CHARS, TOOL_ARG_MAX_CHARS
+from game.dedupe import ANSWER_MARK, answer, is_near_duplicate
+from game.loops import LoopThread
+from game.metrics import METRICS, record_usage, response_usage
+from game.state import (
+    GameLogEntry,
+    GameState,
+    InventoryItem,
+    ResearchLogEntry,
+    active_state,
+    use_state,
+)
+from game.tiering import MODEL_ROUTER, record_call, with_model
+from game.transaction import active_transaction
 
 if TYPE_CHECKING:
     from agents import Agent
 
+T = TypeVar("T")
+
+# ---------------------------
+# Tool call tracing
+# ---------------------------
+
+# Called as observer(name, kwargs, result, elapsed_seconds) after each tool call
+ToolObserver = Callable[[str, Dict[str, Any], str, float], None]
+
+# Raw tool coroutines by name; function_tool may wrap them in SDK objects
+TOOL_IMPLS: Dict[str, Callable[..., Awaitable[str]]] = {}
+
+_TOOL_OBSERVER: ContextVar[Optional[ToolObserver]] = ContextVar("tool_observer", default=None)
+
+
+@contextmanager
+def observe_tool_calls(observer: Optional[ToolObserver]) -> Iterator[None]:
+    """Reports every tool call made in this context (and tasks it spawns) to `observer`."""
+    token = _TOOL_OBSERVER.set(observer)
+    try:
+        yield
+    finally:
+        _TOOL_OBSERVER.reset(token)
+
+
+# ---------------------------
+# Tool argument validation
+# ---------------------------
+# Every tool's arguments are normalized before it runs: strings get their
+# whitespace collapsed and are capped at TOOL_ARG_MAX_CHARS, and Literal choices
+# (log categories) are coerced to a valid one. A required text argument that is
+# empty once normalized gets an error reply instead of a blank entry. The checks
+# are worked out from the signature once, when the tool is defined; a call only
+# runs the list.
+
+Normalizer = Callable[[Any], Any]
+
+_SPACES = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+def normalize_text(value: Any, max_chars: int) -> str:
+    """Trimmed, with runs of spaces collapsed and blank lines dropped; cut at a word if too long."""
+    text = value if isinstance(value, str) else str(value)
+    text = _BLANK_LINES.sub("\n", _SPACES.sub(" ", text)).strip()
+    if len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        text = text[: cut if cut > max_chars // 2 else max_chars - 1].rstrip() + "…"
+        METRICS.incr("tools.args_truncated")
+    return text
+
+
+def _text_normalizer(max_chars: int) -> Normalizer:
+    return lambda value: normalize_text(value, max_chars)
+
+
+def _choice_normalizer(choices: Tuple[str, ...], default: Any) -> Normalizer:
+    """Maps case/space/plural variants and unique prefixes to a choice; else `default`."""
+    lookup: Dict[str, str] = {}
+    for choice in choices:
+        lookup[choice] = choice
+        lookup[choice + "s"] = choice
+    for choice in choices:
+        for n in range(3, len(choice)):
+            prefix = choice[:n]
+            if prefix not in choices:
+                # Ambiguous prefixes map to nothing
+                lookup[prefix] = choice if lookup.get(prefix, choice) == choice else ""
+    fallback = default if default is not inspect.Parameter.empty else choices[0]
+
+    def coerce(value: Any) -> Any:
+        if value in choices:
+            return value
+        METRICS.incr("tools.category_coerced")
+        return lookup.get(str(value).strip().lower()) or fallback
+
+    return coerce
+
+
+def _compile_validator(
+    fn: Callable[..., Any],
+) -> Tuple[List[Tuple[int, str, Normalizer]], Dict[str, Normalizer], List[Tuple[int, str]]]:
+    """
+    (position, name, normalizer) per checked parameter, the same by name, and the
+    (position, name) of required text parameters.
+    """
+    hints = get_type_hints(fn)
+    checks: List[Tuple[int, str, Normalizer]] = []
+    required: List[Tuple[int, str]] = []
+    for pos, (name, param) in enumerate(inspect.signature(fn).parameters.items()):
+        hint = hints.get(name)
+        if hint is str:
+            cap = TOOL_ARG_MAX_CHARS.get(name, TOOL_ARG_DEFAULT_MAX_CHARS)
+            checks.append((pos, name, _text_normalizer(cap)))
+            if param.default is inspect.Parameter.empty:
+                required.append((pos, name))
+        elif get_origin(hint) is Literal:
+            checks.append((pos, name, _choice_normalizer(get_args(hint), param.default)))
+    return checks, {name: check for _, name, check in checks}, required
+
+
+def _empty_argument(
+    required: List[Tuple[int, str]], args: Sequence[Any], kwargs: Dict[str, Any]
+) -> Optional[str]:
+    """The first required text argument that is empty, if any."""
+    for pos, name in required:
+        value = args[pos] if pos < len(args) else kwargs.get(name)
+        if value == "":
+            return name
+    return None
+
+
+def _trace(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Normalizes a tool's arguments (see above) and reports its calls to the active observer."""
+    sig = inspect.signature(fn)
+    checks, by_name, required = _compile_validator(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        if args:
+            args = list(args)  # type: ignore[assignment]
+            for pos, _, check in checks:
+                if pos < len(args):
+                    args[pos] = check(args[pos])  # type: ignore[index]
+        for name in kwargs.keys() & by_name.keys():
+            kwargs[name] = by_name[name](kwargs[name])
+        empty = _empty_argument(required, args, kwargs)
+        if empty is not None:
+            METRICS.incr("tools.empty_args")
+            result = f"Nothing was saved: {empty} is empty."
+        else:
+            result = await fn(*args, **kwargs)
+        observer = _TOOL_OBSERVER.get()
+        if observer is not None:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            observer(fn.__name__, dict(bound.arguments), result, time.perf_counter() - started)
+        return result
+
+    return wrapper
+
+
+def _traced(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """_trace, and registers the tool in TOOL_IMPLS (module-level tools; factories don't)."""
+    wrapper = _trace(fn)
+    TOOL_IMPLS[fn.__name__] = wrapper
+    return wrapper
+
+
+# ---------------------------
+# State tools
+# ---------------------------
+# Inside a turn these stage their changes in the active TurnTransaction, which the
+# engine commits at turn end; otherwise they apply to the active state directly.
+
+
+def _log_game(entry: GameLogEntry) -> None:
+    txn = active_transaction()
+    if txn is not None:
+        txn.log_game(entry)
+    else:
+        active_state().game_log.append(entry)
+
+
+def _log_research(entry: ResearchLogEntry) -> None:
+    txn = active_transaction()
+    if txn is not None:
+        txn.log_research(entry)
+    else:
+        active_state().research_log.append(entry)
+
+
+def _repeats_recent(entry: Any, staged: List[Any], logged: List[Any], by_answer: bool) -> bool:
+    """
+    True when `entry` restates one of the last DEDUPE_WINDOW entries (staged this
+    turn or already logged) in its category, or in any category with `by_answer`
+    (research, compared by answer; see game.dedupe). Counted as dropped in the turn.
+    """
+    recent = staged[-DEDUPE_WINDOW:]
+    if len(recent) < DEDUPE_WINDOW:
+        recent = logged[len(recent) - DEDUPE_WINDOW :] + recent
+    if by_answer:
+        texts = [answer(e.entry) for e in recent]
+        text = answer(entry.entry)
+    else:
+        texts = [e.entry for e in recent if e.category == entry.category]
+        text = entry.entry
+    if not is_near_duplicate(text, texts):
+        return False
+    txn = active_transaction()
+    if txn is not None:
+        txn.dropped += 1
+    METRICS.incr("tools.duplicates_dropped")
+    return True
+
+
+def _log_game_once(entry: GameLogEntry) -> bool:
+    """Logs `entry` unless it repeats a recent game log entry; True if logged."""
+    txn = active_transaction()
+    staged = txn.game_log if txn is not None else []
+    if _repeats_recent(entry, staged, active_state().game_log, by_answer=False):
+        return False
+    _log_game(entry)
+    return True
+
+
+def _log_research_once(entry: ResearchLogEntry) -> bool:
+    """Logs `entry` unless a recent research entry has the same answer; True if logged."""
+    txn = active_transaction()
+    staged = txn.research_log if txn is not None else []
+    if _repeats_recent(entry, staged, active_state().research_log, by_answer=True):
+        return False
+    _log_research(entry)
+    return True
+
+
+def _inventory() -> List[InventoryItem]:
+    txn = active_transaction()
+    return txn.items if txn is not None else active_state().items
+
+
+def _add_item(item: InventoryItem) -> None:
+    txn = active_transaction()
+    if txn is not None:
+        txn.add_item(item)
+    else:
+        active_state().items.append(item)
+
+
+def _remove_item(item: InventoryItem) -> None:
+    txn = active_transaction()
+    if txn is not None:
+        txn.remove_item(item)
+    else:
+        active_state().items.remove(item)
+
 
 @function_tool
+@_traced
 async def update_game_log(
     new_entry: str,
     category: Literal["event", "discovery", "decision", "question", "item", "ambient"] = "event",
 ) -> str:
     """Saves a structured log entry to the game log with a category."""
-    default_state.game_log.append(GameLogEntry(category=category, entry=new_entry))
+    if not _log_game_once(GameLogEntry(category=category, entry=new_entry)):
+        return "The game log already has that entry."
     return f"Game log updated with a {category} entry."
 
 
 @function_tool
+@_traced
 async def update_research_log(
     new_entry: str,
     category: Literal[
@@ -30,59 +313,207 @@ async def update_research_log(
     ] = "info",
 ) -> str:
     """Saves a structured log entry to the research log with a category."""
-    default_state.research_log.append(ResearchLogEntry(category=category, entry=new_entry))
+    if not _log_research_once(ResearchLogEntry(category=category, entry=new_entry)):
+        return "The research log already has that entry."
     return f"Research log updated with a {category} entry."
 
 
 @function_tool
+@_traced
 async def add_player_item(item_name: str, description: str = "") -> str:
     """Adds a new item to the player's inventory. Prevents duplicates by name."""
-    if any(it.name == item_name for it in default_state.items):
+    items = _inventory()
+    if any(it.name == item_name for it in items):
         return f"{item_name} is already in your inventory."
-    default_state.items.append(InventoryItem(name=item_name, description=description))
+    _add_item(InventoryItem(name=item_name, description=description))
     return f"{item_name} added to your inventory."
 
 
 @function_tool
+@_traced
 async def remove_player_item(item_name: str) -> str:
     """Removes an item from the player's inventory by name."""
-    for it in list(default_state.items):
+    for it in list(_inventory()):
         if it.name == item_name:
-            default_state.items.remove(it)
+            _remove_item(it)
             return f"{item_name} removed from your inventory."
     return f"{item_name} not found in your inventory."
 
 
 # ---------------------------
-# Safe bridge tool injection
+# Single-flight research calls
 # ---------------------------
 
 
-def make_query_web_research_tool(web_agent: "Agent") -> Callable[[str], Awaitable[str]]:
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a research query."""
+    return " ".join(query.split()).casefold()
+
+
+def research_cache_key(query: str) -> str:
+    """Cache key for a research query (see normalize_query)."""
+    return "research:" + hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: "concurrent.futures.Future[Any]") -> None:
+        self.future = future
+        self.waiters = 0
+
+
+# Shared calls run here, independent of any caller's loop
+FLIGHT_LOOP = LoopThread("single-flight")
+
+
+class SingleFlight:
+    """
+    In-flight call registry: concurrent calls with the same key share one run.
+
+    The first caller starts the work on FLIGHT_LOOP, in an empty context (it sees
+    no caller's state or transaction); callers, from any thread or loop, await
+    the same result. A caller that is cancelled, or whose loop closes, only stops
+    waiting; the work is cancelled once every caller has gone.
+    Counters go to METRICS as `<name>.started`, `.coalesced` and `.cancelled`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        leader = False
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(FLIGHT_LOOP.submit(_awaited(factory), contextvars.Context()))
+                self._calls[key] = call
+                leader = True
+            call.waiters += 1
+        METRICS.incr(f"{self.name}.started" if leader else f"{self.name}.coalesced")
+        if leader:
+            # Outside the lock: a call that has already finished settles right here
+            call.future.add_done_callback(functools.partial(self._settle, key, call))
+
+        cancelled = False
+        try:
+            # shield: one waiter's cancellation must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(call.future))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = cancelled and call.waiters == 0 and not call.future.done()
+                if abandoned and self._calls.get(key) is call:
+                    del self._calls[key]
+            if abandoned:
+                METRICS.incr(f"{self.name}.cancelled")
+                call.future.cancel()
+
+    def _settle(self, key: str, call: _Call, future: "concurrent.futures.Future[Any]") -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+async def _awaited(factory: Callable[[], Awaitable[T]]) -> T:
+    return await factory()
+
+
+# Live research calls; sessions and players in this process share them
+RESEARCH_CALLS = SingleFlight("research")
+
+
+def make_query_web_research_tool(
+    web_agent: "Agent",
+    run: Optional[Callable[[Any, str], Awaitable[Any]]] = None,
+    cache: Optional[Cache] = None,
+    inflight: Optional[SingleFlight] = None,
+) -> Callable[[str], Awaitable[str]]:
     """
     Returns a function-tool that lets the Narrator query the Web Research Agent.
     Injects `web_agent` via closure to avoid importing from engine.py.
     """
+    tool = function_tool(make_research_bridge(web_agent, run=run, cache=cache, inflight=inflight))
+    # function_tool likely returns `Any`; tell mypy what we return:
+    return cast(Callable[[str], Awaitable[str]], tool)
+
 
-    @function_tool
+def make_research_bridge(
+    web_agent: "Agent",
+    run: Optional[Callable[[Any, str], Awaitable[Any]]] = None,
+    cache: Optional[Cache] = None,
+    inflight: Optional[SingleFlight] = None,
+) -> Callable[[str], Awaitable[str]]:
+    """
+    The research bridge as a plain coroutine function, for callers that invoke it
+    directly (make_query_web_research_tool wraps it for the narrator). It is not
+    registered in TOOL_IMPLS: each bridge belongs to whoever built it.
+    `run` defaults to Runner.run; replays inject recorded answers instead.
+    Concurrent identical queries share one call through `inflight` (RESEARCH_CALLS
+    for live runs). With a `cache` (THRILLER_CACHE for live runs), answers are
+    also shared across sessions and workers over time.
+    """
+    if run is None and cache is None:
+        cache = cache_from_env()
+    if inflight is None:
+        # Injected runners (replay, tests) must not coalesce with live calls
+        inflight = RESEARCH_CALLS if run is None else SingleFlight("research")
+    calls = inflight
+
+    async def call_model(
+        query: str, observer: Optional[ToolObserver]
+    ) -> Tuple[str, List[ResearchLogEntry]]:
+        route = MODEL_ROUTER.route("research", query)
+        agent = with_model(web_agent, route.model) if web_agent is not None else None
+        started = time.perf_counter()
+        # Shared by every caller: the research agent's own log writes are collected
+        # on a scratch state and copied into each caller's (see ask)
+        scratch = GameState()
+        with use_state(scratch), observe_tool_calls(observer):
+            resp = await (run or Runner.run)(agent, query)
+        usage = response_usage(resp)
+        record_usage("research", usage)
+        record_call(route, (time.perf_counter() - started) * 1000, usage)
+        return str(getattr(resp, "final_output", resp)), scratch.research_log
+
+    async def ask(query: str) -> str:
+        # The shared call runs in a context of its own; the research agent's nested
+        # tool calls are reported to the observer of the caller that started it
+        observer = _TOOL_OBSERVER.get()
+        text, notes = await calls.run(normalize_query(query), lambda: call_model(query, observer))
+        for note in notes:
+            _log_research_once(dataclasses.replace(note))
+        return text
+
+    @_trace
     async def query_web_research_agent(query: str) -> str:
         """
         Query the Web Research Agent for factual info.
         (For narrator use only; player should never see tool mechanics.)
         """
         try:
-            resp = await Runner.run(web_agent, query)
-            text = getattr(resp, "final_output", resp)
-            # Persist Q&A to the research log for replayability/audit
-            default_state.research_log.append(
-                ResearchLogEntry(category="info", entry=f"Q: {query}\nA: {text}")
+            if cache is not None:
+                text = await cache.aget_or_set(research_cache_key(query), lambda: ask(query))
+            else:
+                text = await ask(query)
+            # Persist Q&A to the research log for replayability/audit, unless a
+            # recent entry (an earlier caller, the research agent) has this answer
+            _log_research_once(
+                ResearchLogEntry(category="info", entry=f"Q: {query}{ANSWER_MARK}{text}")
             )
-            return str(text)
+            return text
         except Exception as e:
             return f"[web research error] {e}"
 
-    # function_tool likely returns `Any`; tell mypy what we return:
-    return cast(Callable[[str], Awaitable[str]], query_web_research_agent)
+    return query_web_research_agent
 
 
 def set_narrator_tools(state, web_agent: Optional[object] = None) -> List:
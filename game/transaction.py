@@ -0,0 +1,177 @@
+"""
+Per-turn transactions: tool calls stage mutations, the turn applies them at once.
+
+While a TurnTransaction is active (engine.run_turn opens one per turn), the state
+tools record what they would change instead of touching the GameState. At turn end
+`commit()` validates and dedupes the staged mutations, applies them in one step
+and returns a ChangeSet; if the turn fails, nothing was applied. Persistence,
+metrics and the UI consume that ChangeSet instead of re-scanning the state.
+
+Outside a transaction (scripts, replays, direct tool calls) tools apply at once.
+With a `journal` (game.wal) every staged mutation is also written ahead to disk.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from game.state import GameLogEntry, GameState, InventoryItem, ResearchLogEntry
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    """Everything one turn changed; logs are appended, items are added/removed by name."""
+
+    game_log: Tuple[GameLogEntry, ...] = ()
+    research_log: Tuple[ResearchLogEntry, ...] = ()
+    items_added: Tuple[InventoryItem, ...] = ()
+    items_removed: Tuple[str, ...] = ()
+    dropped: int = 0  # staged mutations rejected as empty or duplicate
+
+    @property
+    def empty(self) -> bool:
+        return not (self.game_log or self.research_log or self.items_added or self.items_removed)
+
+    @property
+    def items_changed(self) -> bool:
+        return bool(self.items_added or self.items_removed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "game_log": [vars(e) for e in self.game_log],
+            "research_log": [vars(e) for e in self.research_log],
+            "items_added": [vars(i) for i in self.items_added],
+            "items_removed": list(self.items_removed),
+            "dropped": self.dropped,
+        }
+
+
+@dataclass
+class TurnTransaction:
+    """Staged mutations for one turn against `state`."""
+
+    state: GameState
+    game_log: List[GameLogEntry] = field(default_factory=list)
+    research_log: List[ResearchLogEntry] = field(default_factory=list)
+    dropped: int = 0
+    changes: Optional[ChangeSet] = None
+    # Called as journal(kind, payload) for each staged mutation and the outcome
+    journal: Optional[Callable[[str, Any], None]] = None
+    # The inventory as the turn sees it; None until a tool touches items
+    _items: Optional[List[InventoryItem]] = None
+
+    # ---------- staging (called by tools) ----------
+    def log_game(self, entry: GameLogEntry) -> None:
+        self.game_log.append(entry)
+        self._note("game", entry)
+
+    def log_research(self, entry: ResearchLogEntry) -> None:
+        self.research_log.append(entry)
+        self._note("research", entry)
+
+    def add_item(self, item: InventoryItem) -> None:
+        self.items.append(item)
+        self._note("item_add", item)
+
+    def remove_item(self, item: InventoryItem) -> None:
+        self.items.remove(item)
+        self._note("item_remove", item.name)
+
+    def _note(self, kind: str, payload: Any) -> None:
+        if self.journal is not None:
+            self.journal(kind, payload)
+
+    @property
+    def items(self) -> List[InventoryItem]:
+        """Working copy of the inventory; tools check and edit this one."""
+        if self._items is None:
+            self._items = list(self.state.items)
+        return self._items
+
+    # ---------- commit / rollback ----------
+    def _dedupe(self, entries: List[Any]) -> List[Any]:
+        kept: List[Any] = []
+        seen = set()
+        for e in entries:
+            e.entry = e.entry.strip()
+            key = (e.category, e.entry)
+            if not e.entry or key in seen:
+                self.dropped += 1
+                continue
+            seen.add(key)
+            kept.append(e)
+        return kept
+
+    def commit(self) -> ChangeSet:
+        """Applies every staged mutation together; on error the state is left as it was."""
+        if self.changes is not None:
+            return self.changes
+        state = self.state
+        game_log = self._dedupe(self.game_log)
+        research_log = self._dedupe(self.research_log)
+
+        added: Tuple[InventoryItem, ...] = ()
+        removed: Tuple[str, ...] = ()
+        if self._items is not None:
+            before = {id(i) for i in state.items}
+            after = {id(i) for i in self._items}
+            added = tuple(i for i in self._items if id(i) not in before)
+            removed = tuple(i.name for i in state.items if id(i) not in after)
+
+        marks = (len(state.game_log), len(state.research_log))
+        old_items = list(state.items)
+        try:
+            state.game_log.extend(game_log)
+            state.research_log.extend(research_log)
+            if added or removed:
+                state.items[:] = self._items
+        except BaseException:
+            del state.game_log[marks[0] :]
+            del state.research_log[marks[1] :]
+            state.items[:] = old_items
+            raise
+
+        self.changes = ChangeSet(
+            game_log=tuple(game_log),
+            research_log=tuple(research_log),
+            items_added=added,
+            items_removed=removed,
+            dropped=self.dropped,
+        )
+        self._note("commit", None)
+        return self.changes
+
+    def rollback(self) -> None:
+        """Discards everything staged; the state was never touched."""
+        self.game_log.clear()
+        self.research_log.clear()
+        self._items = None
+        self.changes = ChangeSet()
+        self._note("abort", None)
+
+
+_ACTIVE_TXN: ContextVar[Optional[TurnTransaction]] = ContextVar("turn_transaction", default=None)
+
+
+def active_transaction() -> Optional[TurnTransaction]:
+    return _ACTIVE_TXN.get()
+
+
+@contextmanager
+def transaction(txn: TurnTransaction) -> Iterator[TurnTransaction]:
+    """
+    Stages tool mutations in `txn` for this context (and tasks it spawns).
+    Commits on normal exit, rolls back if the block raises.
+    """
+    token = _ACTIVE_TXN.set(txn)
+    try:
+        yield txn
+    except BaseException:
+        txn.rollback()
+        raise
+    finally:
+        _ACTIVE_TXN.reset(token)
+    txn.commit()
@@ -0,0 +1,106 @@
+"""
+Canonical chat history, kept server-side by the session.
+
+Clients never send history back. They hold a bounded window of recent messages
+and an opaque cursor; `page(cursor)` returns the messages just before it for
+scrolling back. Cursors are signed and bound to their transcript, so a client can
+neither forge one nor reuse one from another session. A bad cursor raises
+CursorError and the UI falls back to the newest window.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Per-process signing key: cursors are only meant to live as long as the page
+_CURSOR_KEY = secrets.token_bytes(16)
+
+
+class CursorError(ValueError):
+    """A cursor that is malformed, forged, or from another transcript."""
+
+
+@dataclass(frozen=True)
+class ChatMessage:
+    seq: int
+    role: str  # "user" or "assistant"
+    content: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+
+class Transcript:
+    """Append-only list of chat messages with windowed, cursor-based reads."""
+
+    def __init__(self) -> None:
+        self.id = secrets.token_hex(8)
+        self._messages: List[ChatMessage] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def add(self, role: str, content: str) -> ChatMessage:
+        with self._lock:
+            message = ChatMessage(len(self._messages), role, content)
+            self._messages.append(message)
+            return message
+
+    def truncate(self, length: int) -> None:
+        """Drops the messages after the first `length`; cursors handed out so far stop working."""
+        with self._lock:
+            if length < len(self._messages):
+                del self._messages[length:]
+                self.id = secrets.token_hex(8)
+
+    def clear(self) -> None:
+        """Starts over; cursors handed out so far stop working."""
+        with self._lock:
+            self._messages = []
+            self.id = secrets.token_hex(8)
+
+    # ---------- reading ----------
+    def window(self, limit: int) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """The newest `limit` messages, and the cursor for the page before them."""
+        with self._lock:
+            start = max(len(self._messages) - limit, 0)
+            return self._slice(start, len(self._messages))
+
+    def page(self, cursor: str, limit: int) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """Up to `limit` messages before `cursor`, and the cursor for the page before those."""
+        end = self._decode(cursor)
+        with self._lock:
+            end = min(end, len(self._messages))
+            return self._slice(max(end - limit, 0), end)
+
+    def _slice(self, start: int, end: int) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        messages = [m.to_dict() for m in self._messages[start:end]]
+        return messages, self._encode(start) if start > 0 else None
+
+    # ---------- cursors ----------
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(_CURSOR_KEY, payload, hashlib.sha256).digest()[:12]
+
+    def _encode(self, seq: int) -> str:
+        payload = f"{self.id}:{seq}".encode("ascii")
+        return base64.urlsafe_b64encode(payload + self._sign(payload)).decode("ascii")
+
+    def _decode(self, cursor: str) -> int:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        except (ValueError, UnicodeEncodeError) as e:
+            raise CursorError("malformed cursor") from e
+        payload, signature = raw[:-12], raw[-12:]
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise CursorError("invalid cursor")
+        owner, _, seq = payload.decode("ascii").partition(":")
+        if owner != self.id or not seq.isdigit():
+            raise CursorError("cursor belongs to another transcript")
+        return int(seq)
@@ -6,13 +6,17 @@ Centralizes:
 - Header HTML (title + version)
 - Description "card" HTML with shared tip
 - Footer HTML
+(the HTML helpers are pure, so each is rendered once per argument set and cached)
+- Live side panel (inventory + log) and the JS that applies its per-turn diffs
 - API key presence check
 - Gradio theme (lazy import to avoid hard dep in Streamlit-only environments)
 """
 
 from __future__ import annotations
 
+import datetime
 import os
+from functools import lru_cache
 
 import gradio as gr
 
@@ -23,6 +27,7 @@ TIP_TEXT = "“Look around”, “Inventory”, “Open the door”."
 # --- Shared HTML snippets -----------------------------------------------------
 
 
+@lru_cache(maxsize=None)
 def header_html(app_name: str, version: str) -> str:
     return f"""
     <div class="app-header">
@@ -32,6 +37,7 @@ def header_html(app_name: str, version: str) -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def card_html(desc: str, tip: str) -> str:
     return f"""
     <div class="card">
@@ -41,8 +47,55 @@ def card_html(desc: str, tip: str) -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def footer_html(app_name: str) -> str:
-    return f"<div class='footer'>© {__import__('datetime').datetime.now().year} — {app_name}</div>"
+    # The year is fixed at first render; a restart picks up a new one
+    return f"<div class='footer'>© {datetime.date.today().year} — {app_name}</div>"
+
+
+@lru_cache(maxsize=None)
+def panel_html() -> str:
+    """Empty side panel; panel_js() fills it from game.sessions panel snapshots/diffs."""
+    return """
+    <div id="side-panel" class="card side-panel">
+      <div class="panel-title">Inventory</div>
+      <ul class="panel-items"></ul>
+      <div class="panel-title">Recent events</div>
+      <ul class="panel-log"></ul>
+    </div>
+    """
+
+
+# Applies one SessionManager.panel()/panel_diff() payload to #side-panel in place.
+# Used as the `js` of a change listener, so nothing is re-rendered server-side.
+_PANEL_JS = """
+(delta) => {
+  const root = document.querySelector('#side-panel');
+  if (!root || !delta) return [];
+  const items = root.querySelector('.panel-items');
+  const log = root.querySelector('.panel-log');
+  const li = (text) => { const el = document.createElement('li'); el.textContent = text; return el; };
+  const entry = (e) => li(`[${e.category}] ${e.entry}`);
+  if (delta.reset) {
+    items.replaceChildren(...delta.items.map(li));
+    log.replaceChildren(...delta.log.map(entry));
+    return [];
+  }
+  for (const name of delta.items_removed) {
+    const hit = [...items.children].find((el) => el.textContent === name);
+    if (hit) hit.remove();
+  }
+  for (const name of delta.items_added) items.append(li(name));
+  for (const e of delta.log) log.append(entry(e));
+  while (log.children.length > MAX_LOG) log.firstElementChild.remove();
+  return [];
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def panel_js(max_log: int) -> str:
+    return _PANEL_JS.replace("MAX_LOG", str(int(max_log)))
 
 
 # --- CSS tokens ---------------------------------------------------------------
@@ -67,6 +120,12 @@ GRADIO_CSS = """
 
 .footer { color:#6b7280; font-size:.85rem; text-align:center; margin-top:14px; }
 
+/* Live side panel (inventory + recent log) */
+.side-panel { font-size:.9rem; }
+.side-panel .panel-title { font-weight:700; margin:.25rem 0; }
+.side-panel ul { margin:0 0 .75rem 1rem; padding:0; }
+.side-panel .panel-log li { color:#374151; }
+
 /* Chat bubbles – light mode defaults */
 .gradio-container .message.user,
 .gradio-container .message.user .markdown,
@@ -171,6 +230,10 @@ STREAMLIT_CSS = """
 """
 
 
+# Ready-made <style> block for Streamlit's per-rerun st.markdown
+STREAMLIT_STYLE = f"<style>{STREAMLIT_CSS}</style>"
+
+
 # --- Utilities ----------------------------------------------------------------
 
 
@@ -0,0 +1,125 @@
+"""
+Requests/sec on the web app's static routes.
+
+Hammers each path over keep-alive connections from a few threads, once fetching
+the full body and once revalidating with the ETag from the first response (what a
+returning browser does), and reports throughput and status codes:
+
+    python app_gradio.py &
+    python -m game.webbench --url http://127.0.0.1:7860 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/manifest.json", "/robots.txt", "/sitemap.xml", "/site/EternalHuntTitle.png"]
+
+
+@dataclass
+class RouteResult:
+    path: str
+    revalidate: bool
+    requests: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "path": self.path,
+            "mode": "revalidate" if self.revalidate else "full",
+            "requests": self.requests,
+            "rps": round(self.rps, 1),
+            "bytes_per_request": round(self.bytes / self.requests) if self.requests else 0,
+            "statuses": dict(self.statuses),
+        }
+
+
+def _connect(url: str) -> http.client.HTTPConnection:
+    parts = urlsplit(url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return cls(parts.hostname or "127.0.0.1", parts.port, timeout=10)
+
+
+def _etag(url: str, path: str) -> Optional[str]:
+    conn = _connect(url)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        return resp.getheader("ETag")
+    finally:
+        conn.close()
+
+
+def bench_route(
+    url: str, path: str, seconds: float = 2.0, concurrency: int = 4, revalidate: bool = False
+) -> RouteResult:
+    result = RouteResult(path, revalidate)
+    headers = {}
+    if revalidate:
+        tag = _etag(url, path)
+        if tag:
+            headers["If-None-Match"] = tag
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> None:
+        conn = _connect(url)
+        done, size, statuses = 0, 0, Counter()
+        try:
+            while time.perf_counter() < deadline:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                size += len(resp.read())
+                statuses[resp.status] += 1
+                done += 1
+        finally:
+            conn.close()
+        with lock:
+            result.requests += done
+            result.bytes += size
+            result.statuses.update(statuses)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the web app's static routes.")
+    parser.add_argument("--url", default="http://127.0.0.1:7860")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    results = [
+        bench_route(args.url, path, args.seconds, args.concurrency, revalidate).summary()
+        for path in args.paths
+        for revalidate in (False, True)
+    ]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
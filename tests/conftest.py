@@ -23,7 +23,7 @@ def fake_agents_module():
     """
     Provide a fake 'agents' module so game.* imports work in tests without the real dependency.
     - function_tool: identity decorator for async functions
-    - Agent: simple container
+    - Agent / ModelSettings: simple containers
     - Runner.run: returns a stub result object with a final_output attribute
     - WebSearchTool: placeholder
     """
@@ -35,12 +35,17 @@ def fake_agents_module():
         # Identity decorator: return original async function unchanged
         return fn
 
+    class ModelSettings:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
     class Agent:
-        def __init__(self, name, instructions, model, tools):
+        def __init__(self, name, instructions, model, tools, model_settings=None):
             self.name = name
             self.instructions = instructions
             self.model = model
             self.tools = tools
+            self.model_settings = model_settings
 
     class _Result:
         def __init__(self, final_output):
@@ -53,7 +58,10 @@ def fake_agents_module():
             Simulate a minimal agent step:
             - if a tool named 'update_game_log' exists, call it to record the turn
             - then return a simple final_output
+            `message` may also be a list of input items; the last one is the new message.
             """
+            if isinstance(message, list):
+                message = message[-1]["content"]
             tool_fn = None
             for t in getattr(agent, "tools", []):
                 name = getattr(t, "__name__", "")
@@ -77,6 +85,7 @@ def fake_agents_module():
 
     mod.function_tool = function_tool
     mod.Agent = Agent
+    mod.ModelSettings = ModelSettings
     mod.Runner = Runner
     mod.WebSearchTool = WebSearchTool
 
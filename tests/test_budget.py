@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from game.budget import TokenBudget, TurnBudgets, trim_to_sentence
+
+
+def test_budget_shrinks_over_slo_and_grows_back():
+    budget = TokenBudget(floor=100, cap=400, slo_ms=1000)
+    assert budget.max_tokens == 400
+
+    for _ in range(10):
+        budget.observe(3000, truncated=False)
+    assert budget.max_tokens == 100  # multiplicative decrease stops at the floor
+
+    # Fast again, but only truncated replies earn more room
+    for _ in range(10):
+        budget.observe(200, truncated=False)
+    assert budget.max_tokens == 100
+    budget.observe(200, truncated=True)
+    assert budget.max_tokens == 164
+
+
+def test_turn_budgets_are_per_type():
+    budgets = TurnBudgets(
+        bounds={"command": (50, 100), "cutscene": (200, 800)},
+        slo_ms={"command": 500, "cutscene": 5000},
+    )
+    budgets.observe("command", 2000, 100, truncated=True)
+    assert budgets.max_tokens("command") == 80
+    assert budgets.max_tokens("cutscene") == 800
+    assert "action" not in budgets
+    assert budgets.snapshot()["command"]["latency_ms"] == 2000
+
+
+@pytest.mark.parametrize(
+    "text, trimmed",
+    [
+        ("The door creaks. Someone is", "The door creaks."),
+        ('He whispers, "Run!" Then the lights', 'He whispers, "Run!"'),
+        ("Complete sentence.", "Complete sentence."),
+        ("no sentence end at all", "no sentence end at all"),
+    ],
+)
+def test_trim_to_sentence(text, trimmed):
+    assert trim_to_sentence(text) == trimmed
+
+
+def _result(text, output_tokens):
+    usage = SimpleNamespace(input_tokens=10, output_tokens=output_tokens)
+    return SimpleNamespace(final_output=text, raw_responses=[SimpleNamespace(usage=usage)])
+
+
+def test_truncated_reply_is_continued(fresh_thriller_modules, monkeypatch):
+    from agents import Runner
+
+    engine = importlib.import_module("game.engine")
+    budget = importlib.import_module("game.budget")
+    metrics = importlib.import_module("game.metrics").METRICS
+    calls = []
+
+    async def fake_run(agent, message):
+        calls.append((agent.model_settings.max_tokens, agent.tools, message))
+        if len(calls) == 1:
+            cap = agent.model_settings.max_tokens
+            return _result("A shadow crosses the hall. You hear a", cap)
+        return _result("click behind you. Then silence. The", 5)
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    reply = engine.Session(autosave=False).respond("Look around")
+
+    assert reply == "A shadow crosses the hall. You hear a click behind you. Then silence."
+    assert calls[1][1] == [] and budget.CONTINUE_PROMPT in calls[1][2]
+    assert metrics.counter("turn.command.truncated") == 1
+    assert metrics.series("turn.command.output_tokens")["total"] == calls[0][0] + 5
+    # Fast and truncated: the budget is already at its cap, so it stays there
+    assert budget.TURN_BUDGETS.max_tokens("command") == calls[0][0] == 400
+
+
+def test_untruncated_reply_is_untouched(fresh_thriller_modules, monkeypatch):
+    from agents import Runner
+
+    engine = importlib.import_module("game.engine")
+    metrics = importlib.import_module("game.metrics").METRICS
+
+    async def fake_run(agent, message):
+        return _result("You wait. Nothing happens", 12)
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    assert engine.Session(autosave=False).respond("Wait") == "You wait. Nothing happens"
+    assert metrics.series("turn.command.output_tokens")["count"] == 1
+    assert metrics.counter("turn.command.truncated") == 0
+
+
+def test_budget_sees_only_narrator_generation_time(fresh_thriller_modules, monkeypatch):
+    from agents import Runner
+
+    engine = importlib.import_module("game.engine")
+    budget = importlib.import_module("game.budget")
+    tools = importlib.import_module("game.tools")
+    observed = []
+    monkeypatch.setattr(budget.TURN_BUDGETS, "observe", lambda kind, ms, *rest: observed.append(ms))
+
+    async def slow_research(query: str) -> str:
+        await asyncio.sleep(0.3)
+        return "A shell company."
+
+    research = tools._trace(slow_research)
+
+    async def fake_run(agent, message):
+        if agent.tools:
+            await research("Who owns Orpheus Labs?")  # the narrator waits on research
+            return _result("The logo is Orpheus Labs. You hear a", agent.model_settings.max_tokens)
+        await asyncio.sleep(0.3)  # the continuation
+        return _result("click. Then silence.", 5)
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    started = time.perf_counter()
+    engine.Session(autosave=False).respond("Look around")
+
+    assert time.perf_counter() - started >= 0.6
+    assert len(observed) == 1 and observed[0] < 200
@@ -0,0 +1,208 @@
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+
+from game.cache import LocalRedisServer, LRUCache, RedisCache, SqliteCache, open_cache
+
+
+@pytest.fixture
+def redis_server():
+    with LocalRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        c = LRUCache(max_entries=3)
+    elif request.param == "sqlite":
+        c = SqliteCache(str(tmp_path / "cache.db"), max_entries=3)
+    else:
+        server = request.getfixturevalue("redis_server")
+        server._server.db.max_keys = 3
+        c = RedisCache(port=server.port, prefix="t")
+    yield c
+    c.close()
+
+
+def test_get_set_delete_and_size_bound(cache):
+    cache.set("a", {"answer": 1})
+    assert cache.get("a") == {"answer": 1}
+    assert "a" in cache and cache.get("missing") is None
+
+    for key in "bcd":
+        cache.set(key, key)
+    assert "a" not in cache  # evicted: bound is 3
+    assert [cache.get(k) for k in "bcd"] == ["b", "c", "d"]
+
+    cache.delete("b")
+    assert "b" not in cache
+    cache.clear()
+    assert "c" not in cache
+
+
+def test_ttl_expires_entries(cache):
+    cache.set("short", "x", ttl=0.05)
+    cache.set("long", "y", ttl=60)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("long") == "y"
+
+
+def test_concurrent_threads_fill_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_set("q", compute)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert cache.stats.fills == 1 and cache.stats.coalesced == 7
+
+
+def test_concurrent_tasks_fill_once(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_set("q", compute) for _ in range(8)))
+
+    assert asyncio.run(main()) == ["answer"] * 8
+    assert len(calls) == 1
+    assert asyncio.run(main()) == ["answer"] * 8  # now a plain hit
+    assert len(calls) == 1
+
+
+def test_failed_fill_is_not_cached(cache):
+    def boom():
+        raise RuntimeError("model down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("q", boom)
+    assert cache.get_or_set("q", lambda: "ok") == "ok"
+
+
+def test_fill_lock_is_shared_between_clients(redis_server):
+    # Two clients stand in for two worker processes sharing one server
+    first = RedisCache(port=redis_server.port)
+    second = RedisCache(port=redis_server.port)
+    assert first._acquire_fill("q")
+    assert not second._acquire_fill("q")
+
+    done = []
+    waiter = threading.Thread(
+        target=lambda: done.append(second.get_or_set("q", lambda: "recomputed"))
+    )
+    waiter.start()
+    time.sleep(0.1)
+    first.set("q", "from first")
+    first._release_fill("q")
+    waiter.join(5)
+
+    assert done == ["from first"]
+    assert second.stats.fills == 0
+
+
+def test_fill_lock_release_leaves_another_owners_lock(redis_server):
+    first = RedisCache(port=redis_server.port, lock_ttl=0.05)
+    second = RedisCache(port=redis_server.port)
+    assert first._acquire_fill("q")
+    time.sleep(0.1)  # first's lock expires mid-fill and second takes the key
+    assert second._acquire_fill("q")
+    first._release_fill("q")
+    assert not first._acquire_fill("q")
+
+
+def test_clear_scans_only_its_own_prefix(redis_server):
+    mine = RedisCache(port=redis_server.port, prefix="mine")
+    other = RedisCache(port=redis_server.port, prefix="other")
+    for i in range(30):
+        mine.set(f"k{i}", i)
+    other.set("k", "kept")
+    mine.clear()
+    assert all(mine.get(f"k{i}") is None for i in range(30))
+    assert other.get("k") == "kept"
+
+
+def test_cancelled_leader_hands_the_fill_to_a_waiter(cache):
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(5)
+        return "never"
+
+    async def quick():
+        return "filled"
+
+    async def main():
+        leader = asyncio.create_task(cache.aget_or_set("q", slow))
+        await asyncio.to_thread(started.wait, 5)
+        waiter = asyncio.create_task(cache.aget_or_set("q", quick))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(waiter, 5)
+
+    assert asyncio.run(main()) == "filled"
+
+
+def test_open_cache_urls(tmp_path, redis_server):
+    assert isinstance(open_cache(), LRUCache)
+    assert isinstance(open_cache(f"sqlite:///{tmp_path}/c.db"), SqliteCache)
+    remote = open_cache(redis_server.url + "/game")
+    assert isinstance(remote, RedisCache) and remote.prefix == "game"
+    assert remote.execute("PING") == "PONG"
+    with pytest.raises(ValueError):
+        open_cache("memcached://x")
+
+
+def test_research_answers_are_cached(fresh_thriller_modules):
+    tools = importlib.import_module("game.tools")
+    state_mod = importlib.import_module("game.state")
+    asked = []
+
+    class _Resp:
+        def __init__(self, text):
+            self.final_output = text
+
+    async def run(agent, query):
+        asked.append(query)
+        await asyncio.sleep(0.01)
+        return _Resp(f"answer to {query}")
+
+    tool = tools.make_query_web_research_tool(None, run=run, cache=LRUCache())
+    state = state_mod.GameState()
+
+    async def main():
+        with state_mod.use_state(state):
+            return await asyncio.gather(
+                tool("Who owns Helix Labs?"),
+                tool("who owns  helix labs?"),
+                tool("Who owns Helix Labs?"),
+            )
+
+    assert asyncio.run(main()) == ["answer to Who owns Helix Labs?"] * 3
+    assert asked == ["Who owns Helix Labs?"]
+    # The repeated answer is logged once
+    assert len(state.research_log) == 1
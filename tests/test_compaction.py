@@ -0,0 +1,74 @@
+from game.compaction import (
+    compact_log,
+    extractive_summary,
+    narrator_log_view,
+    schedule_compaction,
+)
+from game.state import GameLogEntry, GameState
+
+
+def _state_with(n: int) -> GameState:
+    st = GameState()
+    for i in range(n):
+        st.game_log.append(GameLogEntry(category="event", entry=f"Step {i}. Extra detail."))
+    return st
+
+
+def test_extractive_summary_prefers_important_entries():
+    entries = [
+        GameLogEntry(category="ambient", entry="Rain taps the window. It is cold."),
+        GameLogEntry(category="decision", entry="Player takes the fire escape."),
+        GameLogEntry(category="ambient", entry="Rain taps the window. Again."),
+    ]
+    text = extractive_summary(entries, max_chars=60)
+
+    assert "Player takes the fire escape." in text
+    # duplicate first sentences collapse into one
+    assert text.count("Rain taps the window.") <= 1
+    assert len(text) <= 60
+
+
+def test_compact_log_folds_old_entries_and_keeps_raw():
+    st = _state_with(30)
+    folded = compact_log(st, window=10, chunk=5)
+
+    assert folded == 20
+    assert st.compacted_upto == 20
+    assert len(st.log_summaries) == 4
+    assert all(s.category == "summary" for s in st.log_summaries)
+    # Raw entries are untouched and still persisted
+    assert len(st.game_log) == 30
+    assert len(st.to_dict()["game_log"]) == 30
+
+
+def test_narrator_view_is_bounded():
+    st = _state_with(500)
+    compact_log(st, window=10, chunk=5)
+    view = narrator_log_view(st, window=10, chunk=5, keep=3)
+
+    assert len(view) <= 3 + 15
+    assert view[-1].entry == "Step 499. Extra detail."
+
+    # Even with no compaction at all the tail is capped
+    lagging = _state_with(500)
+    assert len(narrator_log_view(lagging, window=10, chunk=5, keep=3)) == 15
+
+
+def test_schedule_compaction_runs_in_background():
+    st = _state_with(3)
+    assert schedule_compaction(st, window=10, chunk=5) is None
+
+    st = _state_with(40)
+    fut = schedule_compaction(st, window=10, chunk=5)
+    assert fut is not None
+    assert fut.result(timeout=5) == 30
+    assert st.compacted_upto == 30
+
+
+def test_summaries_roundtrip_through_save():
+    st = _state_with(30)
+    compact_log(st, window=10, chunk=5)
+    restored = GameState.from_dict(st.to_dict())
+
+    assert restored.compacted_upto == 20
+    assert [s.entry for s in restored.log_summaries] == [s.entry for s in st.log_summaries]
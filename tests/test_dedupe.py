@@ -0,0 +1,49 @@
+import asyncio
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def mods(fresh_thriller_modules):
+    _, _, state, tools, _ = fresh_thriller_modules
+    state.default_state.game_log.clear()
+    state.default_state.research_log.clear()
+    return importlib.import_module("game.dedupe"), state, tools
+
+
+def test_near_duplicates(mods):
+    dedupe, _, _ = mods
+    assert dedupe.similarity("Player hides", "The player is still hiding.") == 1.0
+    assert dedupe.similarity("Player hides", "Player hides behind the door") < 0.5
+    assert dedupe.is_near_duplicate("A door slams shut", ["Rain", "a DOOR slams shut!"])
+    assert not dedupe.is_near_duplicate("It is.", ["It was."])
+    assert dedupe.answer("Q: Who?\nA: Dr. Vance") == "Dr. Vance"
+
+
+def test_repeats_within_the_window_are_dropped(mods):
+    _, state, tools = mods
+
+    class Resp:
+        final_output = "Helix Labs is owned by the Orpheus Group since 2011."
+
+    async def run(agent, query):
+        # The research agent notes the answer before the bridge logs its Q/A
+        await tools.update_research_log(Resp.final_output, category="historical")
+        return Resp()
+
+    bridge = tools.make_query_web_research_tool(None, run=run)
+
+    async def play():
+        await tools.update_game_log("Player hides in the closet")
+        await tools.update_game_log("A floorboard creaks", category="ambient")
+        await tools.update_game_log("The player is still hiding in the closet.")
+        await bridge("Who owns Helix Labs?")
+        for n in range(8):
+            await tools.update_game_log(f"Footsteps, {n} of them")
+        await tools.update_game_log("Player hides in the closet")  # outside the window
+
+    asyncio.run(play())
+    game_log = [e.entry for e in state.default_state.game_log]
+    assert game_log.count("Player hides in the closet") == 2 and len(game_log) == 11
+    assert [e.category for e in state.default_state.research_log] == ["historical"]
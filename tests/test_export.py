@@ -0,0 +1,51 @@
+import csv
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture
+def export(fresh_thriller_modules):
+    return importlib.import_module("game.export")
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_export_streams_every_session_to_csv(export, tmp_path, monkeypatch):
+    state_mod = importlib.import_module("game.state")
+    runs, prod = tmp_path / "runs", tmp_path / "prod"
+    for n in range(3):
+        st = state_mod.GameState()
+        st.game_log.append(state_mod.GameLogEntry("event", f"Session {n}: glass, everywhere"))
+        st.game_log.append(state_mod.GameLogEntry("decision", "Run"))
+        st.items.append(state_mod.InventoryItem("keycard", 'Says "B2"'))
+        st.save_json(str(runs / f"s{n}.json"))
+    (prod / "eu").mkdir(parents=True)
+    old = {"research_log": [{"category": "symbol", "entry": "Λ-17"}], "items": [{"name": "map"}]}
+    (prod / "eu" / "old.json").write_text(json.dumps(old), encoding="utf-8")
+    (prod / "broken.json").write_text("[]", encoding="utf-8")
+    odd = {"version": 3, "blobs": [{"text": "no id"}]}  # valid JSON, malformed record
+    (prod / "odd.json").write_text(json.dumps(odd), encoding="utf-8")
+    monkeypatch.setattr(export, "_pyarrow", lambda: None)
+
+    report = export.export([str(runs), str(prod)], str(tmp_path / "out"), workers=2, chunk_rows=2)
+
+    assert report.format == "csv" and report.sessions == 4
+    assert report.rows == {"game_log": 6, "research_log": 1, "items": 4}
+    assert sorted(report.failed) == ["broken", "odd"]
+    game_log = _read(tmp_path / "out" / "game_log.csv")
+    assert {r["session"] for r in game_log} == {"s0", "s1", "s2"}
+    assert game_log[0]["entry"] == "Session 0: glass, everywhere" and game_log[1]["seq"] == "1"
+    research = _read(tmp_path / "out" / "research_log.csv")
+    assert research == [
+        {"session": "eu/old", "seq": "0", "category": "symbol", "entry": "Λ-17", "ts": "0.0"}
+    ]
+    items = _read(tmp_path / "out" / "items.csv")
+    assert {"session": "s1", "seq": "0", "name": "keycard", "description": 'Says "B2"'} in items
+
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        export.export([str(runs)], str(tmp_path / "pq"), fmt="parquet")
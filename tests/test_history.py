@@ -0,0 +1,122 @@
+import pytest
+
+from game.history import Timeline
+from game.state import GameLogEntry, GameState, InventoryItem
+
+
+def _play(state: GameState, timeline: Timeline, n: int, item: str = "") -> None:
+    state.game_log.append(GameLogEntry(category="event", entry=f"turn {n}"))
+    if item:
+        state.items.append(InventoryItem(name=item))
+    timeline.checkpoint(f"move {n}")
+
+
+def test_save_points_share_structure():
+    st = GameState()
+    st.items.append(InventoryItem(name="keycard"))
+    tl = Timeline(st)
+    _play(st, tl, 1)
+    _play(st, tl, 2)
+
+    first, second, third = tl.points()
+    # Unchanged inventory is shared, not copied, between save points
+    assert first.items is second.items is third.items
+    assert [p.game_log_len for p in tl.points()] == [0, 1, 2]
+
+
+def test_undo_and_rewind_restore_state():
+    st = GameState()
+    tl = Timeline(st)
+    _play(st, tl, 1, item="flashlight")
+    _play(st, tl, 2, item="crowbar")
+    _play(st, tl, 3)
+
+    assert tl.undo().turn == 2
+    assert [e.entry for e in st.game_log] == ["turn 1", "turn 2"]
+
+    assert tl.rewind(1).turn == 1
+    assert [i.name for i in st.items] == ["flashlight"]
+    assert [p.turn for p in tl.points()] == [0, 1]
+
+    assert tl.undo().turn == 0
+    assert tl.undo() is None
+    assert st.game_log == [] and list(st.items) == []
+
+    with pytest.raises(ValueError):
+        tl.rewind(7)
+
+
+def test_fork_leaves_original_untouched():
+    st = GameState()
+    tl = Timeline(st)
+    _play(st, tl, 1, item="flashlight")
+    _play(st, tl, 2, item="crowbar")
+
+    branch, branch_tl = tl.fork(1)
+    branch.game_log.append(GameLogEntry(category="event", entry="alt turn 2"))
+    branch_tl.checkpoint("alt")
+
+    assert [e.entry for e in st.game_log] == ["turn 1", "turn 2"]
+    assert [e.entry for e in branch.game_log] == ["turn 1", "alt turn 2"]
+    assert [i.name for i in branch.items] == ["flashlight"]
+    assert branch_tl.current.turn == 2
+
+
+def test_history_depth_is_bounded():
+    st = GameState()
+    tl = Timeline(st, depth=3)
+    for n in range(1, 10):
+        _play(st, tl, n)
+
+    assert [p.turn for p in tl.points()] == [7, 8, 9]
+    assert tl.undo().turn == 8
+    assert tl.undo().turn == 7
+    assert tl.undo() is None
+
+
+def test_router_undo_and_branch_commands(fresh_thriller_modules, save_path):
+    import importlib
+
+    _, _, state, _, engine = fresh_thriller_modules
+    router = importlib.import_module("game.router").Router()
+    session = engine.get_default_session()
+    state.default_state.game_log.clear()
+    session.timeline.reset()
+
+    router.handle("Look around", [])
+    router.handle("Open the door", [])
+    router.handle("Run outside", [])
+    assert len(state.default_state.game_log) == 3
+
+    assert router.handle("/undo", []) == "Rewound to turn 2."
+    assert len(state.default_state.game_log) == 2
+    assert "1: Look around" in router.handle("/history", [])
+
+    assert "turn 1" in router.handle("/rewind 1", [])
+    assert [e.entry for e in state.default_state.game_log] == ["Player action: Look around"]
+    assert router.handle("/rewind nope", []) == "Usage: /rewind <turn>"
+    assert router.handle("/rewind 9", []).startswith("Can't rewind")
+    assert router.handle("/branch 1", []).startswith("Unknown command")
+    # The chat shows only what is left of the game
+    chat = [m["content"] for m in session.transcript.window(10)[0]]
+    assert chat[-2:] == ["Look around", session.memory.window()[-1].assistant]
+    assert len(chat) == 2
+    assert router.handle("/dance", []).startswith("Unknown command")
+
+    # The rewind was autosaved
+    assert len(state.GameState.load_json(save_path).game_log) == 1
+
+
+def test_session_branch_is_isolated(fresh_thriller_modules):
+    _, _, _, _, engine = fresh_thriller_modules
+    session = engine.Session(session_id="qa", autosave=False)
+    session.respond("Look around")
+    session.respond("Check phone")
+
+    alt = session.branch(1)
+    alt.respond("Run outside")
+
+    assert alt.session_id == "qa@1"
+    assert [e.entry for e in session.state.game_log][-1] == "Player action: Check phone"
+    assert [e.entry for e in alt.state.game_log][-1] == "Player action: Run outside"
+    assert len(alt.state.game_log) == 2
@@ -0,0 +1,73 @@
+import pytest
+
+from game.logfile import LogFileReader, SessionArchive, archive_state, write_log_file
+from game.state import GameLogEntry, GameState, InventoryItem, ResearchLogEntry
+
+_CATS = ["event", "discovery", "decision", "ambient"]
+
+
+def _entries(n: int):
+    return [
+        GameLogEntry(category=_CATS[i % 4], entry=f"entry {i} ✓", ts=float(i)) for i in range(n)
+    ]
+
+
+def test_random_access(tmp_path):
+    path = str(tmp_path / "game_log.thlog")
+    assert write_log_file(path, _entries(1000)) == 1000
+
+    with LogFileReader(path) as log:
+        assert len(log) == 1000
+        assert log[0].entry == "entry 0 ✓"
+        assert log[-1].entry == "entry 999 ✓"
+        assert [e.ts for e in log[10:13]] == [10.0, 11.0, 12.0]
+        assert [e.ts for e in log[990::4]] == [990.0, 994.0, 998.0]
+        assert [e.entry for e in log.tail(2)] == ["entry 998 ✓", "entry 999 ✓"]
+        assert log.tail(0) == []
+        assert isinstance(log[5], GameLogEntry)
+        with pytest.raises(IndexError):
+            log[1000]
+
+
+def test_category_filters(tmp_path):
+    path = str(tmp_path / "game_log.thlog")
+    write_log_file(path, _entries(100))
+
+    with LogFileReader(path) as log:
+        assert log.count("decision") == 25
+        assert log.count("question") == 0
+        decisions = list(log.filter("decision"))
+        assert [e.ts for e in decisions[:3]] == [2.0, 6.0, 10.0]
+        assert all(e.category == "decision" for e in decisions)
+        assert list(log.filter("question")) == []
+
+
+def test_empty_and_invalid_files(tmp_path):
+    empty = str(tmp_path / "empty.thlog")
+    write_log_file(empty, [])
+    with LogFileReader(empty) as log:
+        assert len(log) == 0
+        assert log.tail(5) == []
+
+    bogus = tmp_path / "bogus.thlog"
+    bogus.write_bytes(b"{not a log}")
+    with pytest.raises(ValueError):
+        LogFileReader(str(bogus))
+
+
+def test_session_archive_roundtrip(tmp_path):
+    st = GameState()
+    st.game_log.extend(_entries(50))
+    st.research_log.append(ResearchLogEntry(category="symbol", entry="Λ-17"))
+    st.items.append(InventoryItem(name="keycard", description="blue"))
+    st.log_summaries.append(GameLogEntry(category="summary", entry="early moves"))
+    st.compacted_upto = 20
+
+    archive_state(st, str(tmp_path / "archive"))
+    with SessionArchive(str(tmp_path / "archive")) as arc:
+        assert len(arc.game_log) == 50
+        assert arc.research_log[0].entry == "Λ-17"
+        assert arc.items[0].name == "keycard"
+        restored = arc.to_state()
+
+    assert restored.to_dict() == st.to_dict()
@@ -0,0 +1,91 @@
+import importlib
+
+import pytest
+
+from game.memory import ConversationMemory, Exchange
+
+
+def _ex(turn, user="u" * 40, assistant="a" * 360, log_start=0):
+    return Exchange(turn=turn, user=user, assistant=assistant, log_start=log_start)
+
+
+def test_window_is_bounded_by_turns_and_tokens():
+    memory = ConversationMemory(max_turns=3, token_budget=250)
+    for turn in range(1, 6):
+        memory.add(_ex(turn, log_start=turn * 10))
+
+    assert len(memory) == 3
+    # Each exchange is ~100 tokens: only the newest two fit in 250
+    window = memory.window()
+    assert [ex.turn for ex in window] == [4, 5]
+    assert ConversationMemory.log_cutoff(window) == 40
+    assert ConversationMemory.as_items(window)[0] == {"role": "user", "content": "u" * 40}
+    assert ConversationMemory.log_cutoff([]) is None
+
+    memory.truncate(3)
+    assert [ex.turn for ex in memory.window()] == [3]
+    assert [ex.turn for ex in memory.copy(upto_turn=2).window()] == []
+
+
+@pytest.fixture
+def captured(fresh_thriller_modules, monkeypatch):
+    from agents import Runner
+
+    inputs, prompts = [], []
+    original = Runner.run
+
+    async def capture(agent, message):
+        inputs.append(message)
+        prompts.append(agent.instructions)
+        return await original(agent, message)
+
+    monkeypatch.setattr(Runner, "run", capture, raising=True)
+    return inputs, prompts
+
+
+def test_session_sends_recent_exchanges_as_items(captured):
+    inputs, prompts = captured
+    engine = importlib.import_module("game.engine")
+    session = engine.Session(autosave=False, memory=ConversationMemory(max_turns=2))
+
+    for action in ["Look around", "Check phone", "Open the door"]:
+        session.respond(action)
+
+    assert inputs[0] == "Look around"
+    assert [item["content"] for item in inputs[2]] == [
+        "Look around",
+        "[Narrator Agent] Look around",
+        "Check phone",
+        "[Narrator Agent] Check phone",
+        "Open the door",
+    ]
+    assert [item["role"] for item in inputs[2]] == ["user", "assistant"] * 2 + ["user"]
+    # Log entries of remembered turns are not repeated in the instructions
+    assert "Player action: Look around" not in prompts[1]
+    assert "Player action: Check phone" not in prompts[2]
+
+    session.respond("Run outside")
+    assert "Player action: Look around" in prompts[3]  # dropped out of memory, back in the log
+    assert "Player action: Check phone" not in prompts[3]
+
+
+def test_memory_follows_undo_and_branch(captured):
+    inputs, _ = captured
+    engine = importlib.import_module("game.engine")
+    session = engine.Session(autosave=False)
+
+    session.respond("Look around")
+    session.respond("Check phone")
+    branch = session.branch(1)
+    session.undo()
+    session.respond("Open the door")
+    branch.respond("Run outside")
+
+    assert [i["content"] for i in inputs[2] if i["role"] == "user"] == [
+        "Look around",
+        "Open the door",
+    ]
+    assert [i["content"] for i in inputs[3] if i["role"] == "user"] == [
+        "Look around",
+        "Run outside",
+    ]
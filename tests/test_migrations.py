@@ -0,0 +1,131 @@
+import importlib
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def mig(fresh_thriller_modules):
+    return importlib.import_module("game.migrations")
+
+
+V1_SAVE = {
+    "game_log": [
+        {"category": "event", "entry": "Door kicked open", "ts": 1700000000.5},
+        {"category": "decision", "entry": 'Run for the "exit", now'},
+    ],
+    "research_log": [{"category": "info", "entry": "Unknown symbol: Λ-17", "ts": 12}],
+    "items": [{"name": "keycard"}],
+    "log_summaries": [],
+    "compacted_upto": 1234567,
+}
+
+
+def _write(path, data, indent=2):
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding="utf-8")
+
+
+def test_old_saves_stream_through_migrations(mig, tmp_path, monkeypatch):
+    monkeypatch.setattr(mig, "_CHUNK", 7)  # values and numbers split across reads
+    path = tmp_path / "old.json"
+    _write(path, V1_SAVE)
+
+    result = mig.migrate_file(str(path))
+    assert (result.from_version, result.to_version, result.error) == (1, mig.SAVE_VERSION, "")
+    assert result.records == 5
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["version"] == mig.SAVE_VERSION and list(data)[0] == "version"
+    assert data["game_log"][1] == {
+        "ts": 0.0,
+        "category": "decision",
+        "entry": 'Run for the "exit", now',
+    }
+    assert data["items"] == [{"description": "", "name": "keycard"}]
+    assert data["compacted_upto"] == 1234567
+
+    state = importlib.import_module("game.state").GameState.load_json(str(path))
+    assert [i.name for i in state.items] == ["keycard"]
+    assert mig.migrate_file(str(path)).records == 0  # already current: left alone
+
+
+def test_from_dict_upgrades_and_refuses_newer_saves(mig, monkeypatch):
+    GameState = importlib.import_module("game.state").GameState
+    state = GameState.from_dict(V1_SAVE)
+    assert state.research_log[0].entry == "Unknown symbol: Λ-17"
+    assert state.to_dict()["version"] == mig.SAVE_VERSION
+
+    with pytest.raises(mig.SaveVersionError):
+        GameState.from_dict({"version": mig.SAVE_VERSION + 1})
+
+    # A later version renames a field; older saves run the whole chain lazily
+    seen = []
+
+    def v2_rename(records):
+        for section, value in records:
+            seen.append(section)
+            if section == "items":
+                value = {"name": value["name"], "description": value.pop("desc", "")}
+            yield section, value
+
+    current = mig.SAVE_VERSION
+    monkeypatch.setitem(mig.MIGRATIONS, current, v2_rename)
+    monkeypatch.setattr(mig, "SAVE_VERSION", current + 1)
+    stream = mig.upgrade(mig.dict_records({"items": [{"name": "x", "desc": "d"}]}), current)
+    assert seen == []  # nothing read until asked
+    assert list(stream) == [("items", {"name": "x", "description": "d"})]
+
+
+def test_migrate_dir_across_processes(mig, tmp_path):
+    for n in range(3):
+        _write(tmp_path / f"s{n}.json", V1_SAVE, indent=None)
+    (tmp_path / "broken.json").write_text('{"game_log": [{"category": ', encoding="utf-8")
+    _write(tmp_path / "odd.json", {"items": ["keycard"]})  # valid JSON, malformed record
+    current = tmp_path / "current.json"
+    _write(current, {"version": mig.SAVE_VERSION, "game_log": []})
+    mtime = os.path.getmtime(current)
+
+    results = {os.path.basename(r.path): r for r in mig.migrate_dir(str(tmp_path), workers=2)}
+
+    assert sorted(results) == [
+        "broken.json",
+        "current.json",
+        "odd.json",
+        "s0.json",
+        "s1.json",
+        "s2.json",
+    ]
+    assert all(results[f"s{n}.json"].to_version == mig.SAVE_VERSION for n in range(3))
+    assert results["broken.json"].error and not os.path.exists(tmp_path / "broken.json.migrating")
+    assert results["odd.json"].error.startswith("TypeError")
+    assert os.path.getmtime(current) == mtime
+    assert mig.main([str(tmp_path), "--workers", "1"]) == 1  # the broken save fails the run
+
+
+def test_long_answers_are_saved_once_as_blobs(mig, tmp_path):
+    state_mod = importlib.import_module("game.state")
+    answer = "Orpheus Labs ran trials on the island. " * 30
+    state = state_mod.GameState()
+    for query in ("Who ran the trials?", "What is on the island?"):
+        state.research_log.append(state_mod.ResearchLogEntry("info", f"Q: {query}\nA: {answer}"))
+    state.research_log.append(state_mod.ResearchLogEntry("info", "short note"))
+
+    data = state.to_dict()
+    assert list(data)[:2] == ["version", "blobs"] and len(data["blobs"]) == 1
+    ref = data["blobs"][0]["id"]
+    assert [e.get("ref") for e in data["research_log"]] == [ref, ref, None]
+    assert data["research_log"][0]["entry"] == "Q: Who ran the trials?\nA: "
+
+    path = tmp_path / "s.json"
+    state.save_json(str(path))
+    assert path.stat().st_size < len(answer) * 2
+    restored = state_mod.GameState.load_json(str(path))
+    assert restored.research_log == state.research_log
+
+    export = importlib.import_module("game.export")
+    _, rows, error = export.read_rows(("s", str(path)))
+    assert not error and rows["research_log"][1][3].endswith(answer)
+
+    with pytest.raises(ValueError):
+        state_mod.GameState.from_dict({**data, "blobs": []})
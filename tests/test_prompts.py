@@ -0,0 +1,74 @@
+import importlib
+import json
+from types import SimpleNamespace
+
+
+def test_narrator_prefix_is_byte_identical_across_turns(fresh_thriller_modules):
+    engine = importlib.import_module("game.engine")
+    narrator = importlib.import_module("game.agents.narrator")
+    state_mod = importlib.import_module("game.state")
+
+    session = engine.Session(autosave=False)
+    prompts = []
+    for action in ["Look around", "Open the door", "Run outside"]:
+        session.respond(action)
+        session.state.items.append(state_mod.InventoryItem(f"item for {action}"))
+        prompts.append(engine.make_narrator(session.state).instructions.encode("utf-8"))
+
+    prefix = narrator.NARRATOR_PREFIX.encode("utf-8")
+    other = engine.make_narrator(state_mod.GameState()).instructions.encode("utf-8")
+    for prompt in prompts + [other]:
+        assert prompt[: len(prefix)] == prefix
+    # Per-turn content only ever appears after the prefix
+    assert b"Open the door" in prompts[1][len(prefix) :]
+    assert b"Open the door" not in prefix and b"Inventory" not in prefix
+
+
+def test_research_prefix_is_static(fresh_thriller_modules):
+    web = importlib.import_module("game.agents.web_research")
+    state_mod = importlib.import_module("game.state")
+
+    state = state_mod.GameState()
+    before = web.make_web_research_agent(state).instructions
+    state.research_log.append(state_mod.ResearchLogEntry("info", "Q: x\nA: y"))
+    after = web.make_web_research_agent(state).instructions
+
+    assert before.startswith(web.WEB_RESEARCH_PREFIX)
+    assert after.startswith(web.WEB_RESEARCH_PREFIX)
+    assert before != after
+
+
+def test_cached_tokens_are_counted_and_recorded(fresh_thriller_modules, tmp_path, monkeypatch):
+    from agents import Runner
+
+    def response(input_tokens, cached, output):
+        usage = SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output,
+            input_tokens_details=SimpleNamespace(cached_tokens=cached),
+        )
+        return SimpleNamespace(usage=usage)
+
+    async def fake_run(agent, message):
+        return SimpleNamespace(
+            final_output="You wait.", raw_responses=[response(1200, 1024, 40), response(300, 0, 10)]
+        )
+
+    record_path = tmp_path / "rec.jsonl"
+    monkeypatch.setenv("THRILLER_RECORD_PATH", str(record_path))
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    engine = importlib.import_module("game.engine")
+    metrics = importlib.import_module("game.metrics").METRICS
+
+    engine.Session(autosave=False).respond("Wait")
+
+    assert metrics.counter("llm.narrator.cached_tokens") == 1024
+    assert metrics.counter("llm.narrator.input_tokens") == 1500
+    assert metrics.series("llm.narrator.cached_ratio")["mean"] == round(1024 / 1500, 3)
+    rec = json.loads(record_path.read_text(encoding="utf-8").splitlines()[0])
+    assert rec["usage"] == {
+        "requests": 2,
+        "input_tokens": 1500,
+        "cached_tokens": 1024,
+        "output_tokens": 50,
+    }
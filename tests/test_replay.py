@@ -0,0 +1,86 @@
+import importlib
+import json
+
+
+def test_recorder_captures_turns(fresh_thriller_modules, monkeypatch, tmp_path):
+    rec_path = tmp_path / "rec.jsonl"
+    monkeypatch.setenv("THRILLER_RECORD_PATH", str(rec_path))
+    _, _, state, _, engine = fresh_thriller_modules
+    state.default_state.game_log.clear()
+
+    engine.respond_narrator("Look around")
+    engine.respond_narrator("Run outside")
+
+    lines = [json.loads(line) for line in rec_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["turn"] for r in lines] == [1, 2]
+    first = lines[0]
+    assert first["input"] == "Look around"
+    assert "narrator" in first["prompt"]
+    assert first["tool_calls"][0]["name"] == "update_game_log"
+    assert first["tool_calls"][0]["args"]["new_entry"] == "Player action: Look around"
+    assert first["ms"] >= 0
+
+
+def test_replay_reproduces_recorded_session(fresh_thriller_modules, monkeypatch, tmp_path):
+    rec_path = tmp_path / "rec.jsonl.gz"
+    monkeypatch.setenv("THRILLER_RECORD_PATH", str(rec_path))
+    _, _, state, _, engine = fresh_thriller_modules
+    state.default_state.game_log.clear()
+
+    for msg in ("Look around", "Check phone", "Open the door"):
+        engine.respond_narrator(msg)
+
+    replay = importlib.import_module("game.replay")
+    results = replay.replay_file(str(rec_path))
+
+    assert len(results) == 1
+    assert results[0].ok, results[0].mismatches
+    assert results[0].turns == 3
+    assert results[0].tool_calls == 3
+    assert replay.main([str(rec_path)]) == 0
+
+
+def test_replay_flags_divergence_and_plays_back_research(fresh_thriller_modules, tmp_path):
+    recorder = importlib.import_module("game.recorder")
+    replay = importlib.import_module("game.replay")
+
+    call = recorder.ToolCallRecord(
+        name="query_web_research_agent",
+        args={"query": "Who owns Orpheus Labs?"},
+        result="A shell company.",
+        ms=1.0,
+    )
+    expected = recorder.state_digest(
+        importlib.import_module("game.state").GameState.from_dict(
+            {
+                "research_log": [
+                    {"category": "info", "entry": "Q: Who owns Orpheus Labs?\nA: A shell company."}
+                ]
+            }
+        )
+    )
+    good = recorder.TurnRecord(
+        session="s1",
+        turn=1,
+        input="search",
+        prompt="p",
+        raw_output="Tool Call: x\nThe answer waits.",
+        output="The answer waits.",
+        ms=1.0,
+        state=expected,
+        tool_calls=[call],
+    )
+    bad = recorder.TurnRecord(**{**good.__dict__, "session": "s2", "state": "deadbeef"})
+
+    path = tmp_path / "manual.jsonl"
+    rec = recorder.TurnRecorder(str(path))
+    rec.record(good)
+    rec.record(bad)
+
+    registered = dict(importlib.import_module("game.tools").TOOL_IMPLS)
+    results = {r.session: r for r in replay.replay_file(str(path))}
+    # The playback bridge is the replay's own; live tools are left as they were
+    assert importlib.import_module("game.tools").TOOL_IMPLS == registered
+    assert results["s1"].ok, results["s1"].mismatches
+    assert not results["s2"].ok
+    assert "state digest differs" in results["s2"].mismatches[0]
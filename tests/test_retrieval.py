@@ -0,0 +1,99 @@
+import importlib
+
+import numpy as np
+
+from game.retrieval import GAME, RESEARCH, LogIndex, features, load_index
+from game.state import GameLogEntry, GameState, ResearchLogEntry
+
+
+def _state(n=80):
+    state = GameState()
+    for i in range(n):
+        state.game_log.append(GameLogEntry("event", f"You keep moving through alley {i}."))
+    state.game_log[3].entry = "Agent Marlowe of the Halcyon Group slipped you a burner phone."
+    state.research_log.append(ResearchLogEntry("info", "Q: What is telomerase?\nA: An enzyme."))
+    return state
+
+
+def test_features_are_stable_hashes():
+    idx, tf = features("Marlowe met Marlowe at the docks", dim=1024)
+    again, _ = features("marlowe MET marlowe at the docks", dim=1024)
+
+    assert np.array_equal(idx, again)
+    assert idx.dtype == np.int32 and (idx < 1024).all()
+    assert tf.max() > 1.0  # "marlowe" counted twice
+    assert len(features("the and of", dim=1024)[0]) == 0
+
+
+def test_search_ranks_and_skips_visible_entries():
+    state = _state()
+    index = LogIndex()
+    assert index.sync(state) == 81
+
+    hits = index.search("Call Marlowe on the burner phone", k=3)
+    assert hits[0][:2] == (GAME, 3)
+    assert index.search("telomerase enzyme", k=1)[0][:2] == (RESEARCH, 0)
+    # Entries the narrator already sees are never recalled
+    assert index.search("Marlowe", k=3, game_before=2) == []
+
+    scores = index.score(["Marlowe phone", "telomerase"])
+    assert scores.shape == (2, len(index))
+    assert int(np.argmax(scores[0])) == 3
+
+
+def test_sync_is_incremental_and_repairs_rollbacks():
+    state = _state(10)
+    index = LogIndex()
+    index.sync(state)
+    state.game_log.append(GameLogEntry("decision", "You hide in the cathedral crypt."))
+    assert index.sync(state) == 1
+    assert index.sync(state) == 0
+
+    # Undo, then a different turn writes at the same position
+    del state.game_log[-1]
+    state.game_log.append(GameLogEntry("decision", "You board the night train."))
+    index.sync(state)
+    assert index.indexed == (11, 1)
+    assert index.search("cathedral crypt", k=1) == []
+    assert index.search("night train", k=1)[0][:2] == (GAME, 10)
+
+
+def test_index_round_trips_and_stale_files_are_repaired(tmp_path):
+    state = _state(20)
+    index = LogIndex()
+    index.sync(state)
+    path = str(tmp_path / "save.index.npz")
+    index.save(path)
+
+    loaded = load_index(path, state)
+    assert loaded.indexed == index.indexed
+    assert np.allclose(loaded.score(["Marlowe"]), index.score(["Marlowe"]))
+
+    # The save was rewritten behind the index's back
+    state.game_log[15].entry = "A courier named Vesna waits by the fountain."
+    repaired = load_index(path, state)
+    assert repaired.search("Vesna courier", k=1)[0][:2] == (GAME, 15)
+    assert len(repaired) == 21
+
+
+def test_session_recalls_old_entries_and_saves_index(fresh_thriller_modules, tmp_path, monkeypatch):
+    from agents import Runner
+
+    engine = importlib.import_module("game.engine")
+    retrieval = importlib.import_module("game.retrieval")
+    prompts = []
+    original = Runner.run
+
+    async def capture(agent, message):
+        prompts.append(agent.instructions)
+        return await original(agent, message)
+
+    monkeypatch.setattr(Runner, "run", capture, raising=True)
+    session = engine.Session(_state(), save_path=str(tmp_path / "game.json"))
+    session.respond("Call Marlowe")
+    retrieval.flush_indexing()
+
+    assert "Relevant earlier details" in prompts[0]
+    assert "Agent Marlowe of the Halcyon Group" in prompts[0]
+    saved = retrieval.LogIndex.load(str(tmp_path / "game.index.npz"))
+    assert saved.indexed == (len(session.state.game_log), 1)
@@ -0,0 +1,194 @@
+import asyncio
+import importlib
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def sessions(fresh_thriller_modules):
+    return importlib.import_module("game.sessions")
+
+
+def test_stream_yields_partial_replies(sessions, monkeypatch):
+    from agents import Runner
+
+    class _Streamed:
+        def __init__(self, agent, message):
+            self.agent, self.message = agent, message
+            self.final_output = ""
+            self.raw_responses = []
+
+        async def stream_events(self):
+            update_log = next(t for t in self.agent.tools if t.__name__ == "update_game_log")
+            await update_log("You slip out the back.", category="event")
+            yield SimpleNamespace(type="run_item_stream_event")
+            for word in ["You ", "slip ", "out."]:
+                data = SimpleNamespace(type="response.output_text.delta", delta=word)
+                yield SimpleNamespace(type="raw_response_event", data=data)
+                self.final_output += word
+
+    monkeypatch.setattr(Runner, "run_streamed", _Streamed, raising=False)
+    manager = sessions.SessionManager()
+
+    parts = list(manager.stream("tab", "Sneak out"))
+
+    assert parts == ["You ", "You slip ", "You slip out.", "You slip out."]
+    assert manager.messages("tab")[-2:] == [
+        {"role": "user", "content": "Sneak out"},
+        {"role": "assistant", "content": "You slip out."},
+    ]
+    assert manager.session("tab").state.game_log[-1].entry == "You slip out the back."
+
+
+def test_panel_sends_diffs_of_constant_size(sessions):
+    manager = sessions.SessionManager()
+    assert manager.panel("tab") == {"reset": True, "items": [], "log": []}
+
+    sizes = []
+    for turn in range(40):
+        list(manager.stream("tab", f"Search room {turn}"))
+        diff = manager.panel_diff("tab")
+        sizes.append(len(json.dumps(diff)))
+        assert not diff["reset"]
+        assert [e["entry"] for e in diff["log"]] == [f"Player action: Search room {turn}"]
+    assert max(sizes) - min(sizes) < 8  # digits of the turn number and timestamp only
+    assert len(manager.messages("tab")) == sessions.CHAT_WINDOW_MESSAGES
+
+    # /undo can't be expressed as a diff: the next payload is a bounded snapshot
+    list(manager.stream("tab", "/undo"))
+    snapshot = manager.panel_diff("tab")
+    assert snapshot["reset"] is True
+    assert len(snapshot["log"]) == sessions.PANEL_LOG_ENTRIES
+    assert snapshot["log"][-1]["entry"] == "Player action: Search room 38"
+
+
+def test_items_added_then_removed_cancel_out(sessions):
+    manager = sessions.SessionManager()
+    state_mod = importlib.import_module("game.state")
+    transaction = importlib.import_module("game.transaction")
+    manager.panel("tab")
+    session = manager.session("tab")
+
+    for listener in session._listeners:
+        listener(transaction.ChangeSet(items_added=(state_mod.InventoryItem("Key"),)))
+        listener(transaction.ChangeSet(items_removed=("Key", "Phone")))
+
+    diff = manager.panel_diff("tab")
+    assert diff["items_added"] == [] and diff["items_removed"] == ["Phone"]
+
+
+def test_idle_and_overflow_sessions_are_evicted(sessions, tmp_path):
+    store = importlib.import_module("game.store").JsonStateStore(str(tmp_path))
+    now = [0.0]
+    manager = sessions.SessionManager(
+        store=store, max_active=2, idle_ttl_s=60, clock=lambda: now[0]
+    )
+
+    list(manager.stream("a", "Look around"))
+    manager.session("b")
+    manager.session("c")
+    assert len(manager) == 2  # "a" was least recently used
+
+    now[0] = 120.0
+    again = manager.session("a")  # reloaded from its autosave; b and c went idle
+    assert len(manager) == 1
+    assert again.state.game_log[-1].entry == "Player action: Look around"
+
+
+def test_chat_window_pages_through_the_session_transcript(sessions):
+    manager = sessions.SessionManager()
+    for turn in range(30):
+        list(manager.stream("tab", f"Step {turn}"))
+    list(manager.stream("tab", "/history"))
+
+    window, cursor = manager.window("tab", limit=4)
+    assert window[-2]["content"] == "/history"
+    assert window[-1]["content"].startswith("Save points:")
+    older, _ = manager.older("tab", cursor, limit=2)
+    assert [m["content"] for m in older] == ["Step 28", "[Narrator Agent] Step 28"]
+    assert len(manager.session("tab").transcript) == 1 + 2 * 31
+
+    manager.clear_chat("tab")
+    with pytest.raises(importlib.import_module("game.transcript").CursorError):
+        manager.older("tab", cursor)
+    assert manager.window("tab") == (
+        [{"role": "assistant", "content": sessions.NARRATOR_INTRO}],
+        None,
+    )
+
+
+def test_tabs_attach_to_the_same_background_turn(sessions, monkeypatch):
+    from agents import Runner
+
+    release = threading.Event()
+    started = []
+
+    class _Slow:
+        def __init__(self, agent, message):
+            started.append(message)
+            self.final_output = ""
+            self.raw_responses = []
+
+        async def stream_events(self):
+            for word in ["The ", "lights ", "die."]:
+                if word == "die.":
+                    await asyncio.to_thread(release.wait, 5)
+                self.final_output += word
+                data = SimpleNamespace(type="response.output_text.delta", delta=word)
+                yield SimpleNamespace(type="raw_response_event", data=data)
+
+    monkeypatch.setattr(Runner, "run_streamed", _Slow, raising=False)
+    manager = sessions.SessionManager()
+
+    first = manager.submit("player", "Cut the power")
+    second = manager.submit("player", "Cut the power")  # another tab
+    assert second is first and manager.inflight("player") is first
+
+    reader = first.updates()
+    assert next(reader) in ("The ", "The lights ")
+    release.set()
+    late = "".join(first.updates())  # a tab attaching late still gets it all
+
+    assert first.result(timeout=5) == "The lights die."
+    assert late == "The lights die."
+    assert started == ["Cut the power"]
+    assert manager.inflight("player") is None
+    assert manager.messages("player")[-1]["content"] == "The lights die."
+
+    command = manager.submit("player", "/undo")
+    assert list(command.updates(timeout=5)) == ["Rewound to turn 0."]
+
+
+def test_a_slow_save_does_not_stall_other_players(sessions, monkeypatch):
+    from agents import Runner
+
+    engine = importlib.import_module("game.engine")
+    release = threading.Event()
+    real_save = engine.Session.save
+
+    class _Quick:
+        def __init__(self, agent, message):
+            self.final_output = f"You {message.lower()}."
+            self.raw_responses = []
+
+        async def stream_events(self):
+            data = SimpleNamespace(type="response.output_text.delta", delta=self.final_output)
+            yield SimpleNamespace(type="raw_response_event", data=data)
+
+    def save(self, changes=None):
+        if self.session_id == "slow":
+            release.wait(5)  # a stuck disk or store
+        real_save(self, changes)
+
+    monkeypatch.setattr(Runner, "run_streamed", _Quick, raising=False)
+    monkeypatch.setattr(engine.Session, "save", save)
+    manager = sessions.SessionManager()
+
+    slow = manager.submit("slow", "Wait")
+    fast = manager.submit("fast", "Run")
+    assert fast.result(timeout=2) == "You run."  # while the other save is blocked
+    release.set()
+    assert slow.result(timeout=5) == "You wait."
@@ -0,0 +1,104 @@
+import importlib
+import multiprocessing as mp
+import threading
+from collections import Counter
+
+import pytest
+
+from game.sharding import HashRing
+
+# Workers must inherit the test's fake `agents` module, which needs fork
+needs_fork = pytest.mark.skipif(
+    "fork" not in mp.get_all_start_methods(), reason="worker tests need the fork start method"
+)
+
+
+def test_hash_ring_is_stable_and_balanced():
+    ring = HashRing([0, 1, 2, 3])
+    keys = [f"session-{i}" for i in range(4000)]
+    owners = [ring.node_for(k) for k in keys]
+
+    assert owners == [HashRing([0, 1, 2, 3]).node_for(k) for k in keys]
+    counts = Counter(owners)
+    assert min(counts.values()) > 600  # roughly 1000 each
+
+    # Growing the ring only moves keys onto the new node
+    grown = HashRing([0, 1, 2, 3, 4])
+    moved = [k for k, o in zip(keys, owners) if grown.node_for(k) != o]
+    assert all(grown.node_for(k) == 4 for k in moved)
+    assert len(moved) < len(keys) / 3
+
+
+@pytest.fixture
+def pool(fresh_thriller_modules, tmp_path):
+    sharding = importlib.import_module("game.sharding")
+    p = sharding.ShardPool(
+        2, store_url=str(tmp_path / "sessions"), mp_context=mp.get_context("fork")
+    ).start()
+    yield p
+    p.close(timeout=10)
+
+
+@needs_fork
+def test_turns_are_routed_to_owning_worker(pool, tmp_path):
+    store = importlib.import_module("game.store").JsonStateStore(str(tmp_path / "sessions"))
+    sessions = [f"player{i}" for i in range(6)]
+
+    futures = [pool.submit(sid, f"Look around {n}") for n in range(3) for sid in sessions]
+    replies = [f.result(timeout=30) for f in futures]
+
+    assert all("Look around" in r for r in replies)
+    for sid in sessions:
+        log = store.load(sid).game_log
+        # Turns for one session ran in order on one worker
+        assert [e.entry for e in log] == [f"Player action: Look around {n}" for n in range(3)]
+
+    assert pool.handle("player0", "/undo", timeout=30) == "Rewound to turn 2."
+
+
+@needs_fork
+def test_restart_drains_and_resumes_sessions(pool, tmp_path):
+    store = importlib.import_module("game.store").JsonStateStore(str(tmp_path / "sessions"))
+    sid = "survivor"
+    pool.handle(sid, "Check phone", timeout=30)
+    inflight = pool.submit(sid, "Open the door")
+
+    pool.restart(pool.shard_for(sid), timeout=30)
+
+    assert "Open the door" in inflight.result(timeout=30)
+    pool.handle(sid, "Run outside", timeout=30)
+    assert [e.entry for e in store.load(sid).game_log] == [
+        "Player action: Check phone",
+        "Player action: Open the door",
+        "Player action: Run outside",
+    ]
+
+
+def test_worker_drops_least_recently_used_sessions(fresh_thriller_modules, tmp_path):
+    sharding = importlib.import_module("game.sharding")
+    store = importlib.import_module("game.store").JsonStateStore(str(tmp_path / "sessions"))
+    front, back = mp.Pipe()
+    worker = threading.Thread(
+        target=sharding._worker_main, args=(back, store.root, 1, 1), daemon=True
+    )
+    worker.start()
+
+    def turn(req_id, sid, text):
+        front.send(("turn", req_id, sid, text))
+        assert front.recv()[:2] == (req_id, True)
+
+    turn(1, "a", "Check phone")
+    turn(2, "b", "Look around")  # max_active=1: "a" leaves memory, saved
+    state_mod = importlib.import_module("game.state")
+    state = store.load("a")
+    state.game_log.append(state_mod.GameLogEntry(category="event", entry="Edited on disk"))
+    store.save("a", state)
+    turn(3, "a", "Open the door")  # so "a" is read back from the store
+
+    front.send(("stop",))
+    assert front.recv() == ("stopped",)
+    worker.join(5)
+    assert [e.entry for e in store.load("a").game_log][-2:] == [
+        "Edited on disk",
+        "Player action: Open the door",
+    ]
@@ -0,0 +1,88 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture
+def simulate(fresh_thriller_modules):
+    return importlib.import_module("game.simulate")
+
+
+def test_percentile():
+    from game.simulate import percentile
+
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_sessions_are_isolated_and_streamed(simulate, tmp_path):
+    out_path = tmp_path / "sim.jsonl"
+    policy = simulate.ScriptedPolicy(["Look around", "Run outside"], seed=1)
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        report = asyncio.run(simulate.run_simulation(4, 3, policy, concurrency=2, out=out))
+
+    lines = [json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 12
+    assert {r["session"] for r in lines} == {f"sim-{n:05d}" for n in range(4)}
+    assert report.turns == 12 and report.errors == 0
+    # Every session's tools wrote only to that session's state (a repeated action
+    # is logged once: the log tools drop repeats of recent entries)
+    for sid, state in report.states.items():
+        actions = list(dict.fromkeys(r["action"] for r in lines if r["session"] == sid))
+        assert [e.entry for e in state.game_log] == [f"Player action: {a}" for a in actions]
+
+    summary = report.summary()
+    assert summary["turns_per_s"] > 0
+    assert summary["latency_ms_p50"] <= summary["latency_ms_p99"] <= summary["latency_ms_max"]
+
+
+def test_concurrency_is_bounded(simulate, monkeypatch):
+    from agents import Runner
+
+    live = {"now": 0, "peak": 0}
+
+    class _Result:
+        final_output = "ok"
+
+    async def slow_run(agent, message):
+        live["now"] += 1
+        live["peak"] = max(live["peak"], live["now"])
+        await asyncio.sleep(0.01)
+        live["now"] -= 1
+        return _Result()
+
+    monkeypatch.setattr(Runner, "run", slow_run, raising=True)
+    report = asyncio.run(simulate.run_simulation(6, 2, simulate.ScriptedPolicy(), concurrency=3))
+
+    assert report.turns == 12
+    assert live["peak"] == 3
+
+
+def test_cli_writes_saves(simulate, tmp_path, capsys):
+    code = simulate.main(
+        [
+            "--sessions",
+            "2",
+            "--turns",
+            "2",
+            "--out",
+            str(tmp_path / "o.jsonl"),
+            "--save-dir",
+            str(tmp_path / "saves"),
+        ]
+    )
+
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["turns"] == 4
+    assert sorted(p.name for p in (tmp_path / "saves").iterdir()) == [
+        "sim-00000.index.npz",
+        "sim-00000.json",
+        "sim-00001.index.npz",
+        "sim-00001.json",
+    ]
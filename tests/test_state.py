@@ -279,3 +279,61 @@ def test_save_json_creates_nested_dirs(sample_game_state, tmp_path):
     # Quick load to confirm valid JSON
     loaded = GameState.load_json(str(nested))
     assert len(loaded.game_log) == 1
+
+
+def test_save_many_and_load_many(fresh_thriller_modules, tmp_path):
+    state_mod = fresh_thriller_modules[2]
+    states = {}
+    for n in range(40):
+        st = state_mod.GameState()
+        st.game_log.append(state_mod.GameLogEntry("event", f"Session {n} wakes up"))
+        states[f"p{n:02d}"] = st
+    seen = []
+
+    report = state_mod.save_many(
+        states, str(tmp_path), threads=4, progress=lambda *a: seen.append(a)
+    )
+    assert (report.done, report.skipped, report.failed) == (40, 0, {})
+    assert seen[-1] == (40, 40)
+    assert not (tmp_path / ".save_many.progress").exists()
+
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    loaded, report = state_mod.load_many(str(tmp_path), threads=4, processes=2, process_bytes=100)
+    assert report.done == 40 and list(report.failed) == ["broken"]
+    assert loaded["p07"].game_log[0].entry == "Session 7 wakes up"
+
+    only, report = state_mod.load_many(str(tmp_path), ids=["p01", "gone"])
+    assert list(only) == ["p01"] and "gone" in report.failed
+
+
+def test_interrupted_save_many_resumes(fresh_thriller_modules, tmp_path, monkeypatch):
+    state_mod = fresh_thriller_modules[2]
+    states = {f"p{n}": state_mod.GameState() for n in range(6)}
+    real_save = state_mod.GameState.save_json
+
+    def flaky(self, path, *args):
+        if path.endswith("p3.json"):
+            raise OSError("disk full")
+        real_save(self, path, *args)
+
+    monkeypatch.setattr(state_mod.GameState, "save_json", flaky)
+    report = state_mod.save_many(states, str(tmp_path), threads=2)
+    assert report.done == 5 and list(report.failed) == ["p3"]
+    assert (tmp_path / ".save_many.progress").exists()
+
+    monkeypatch.setattr(state_mod.GameState, "save_json", real_save)
+    states["p0"].game_log.append(state_mod.GameLogEntry("event", "changed since"))
+    states["p1"].items.append(state_mod.InventoryItem("phone"))
+    report = state_mod.save_many(states, str(tmp_path), threads=2)
+    assert report.done == 3  # p3, plus p0 and p1 which changed
+
+    states["p1"].items[0] = state_mod.InventoryItem("keycard")  # same lengths, new content
+    monkeypatch.setattr(state_mod.GameState, "save_json", flaky)
+    state_mod.save_many(states, str(tmp_path), threads=2)
+    monkeypatch.setattr(state_mod.GameState, "save_json", real_save)
+    states["p1"].items[0] = state_mod.InventoryItem("crowbar")
+    report = state_mod.save_many(states, str(tmp_path), threads=2)
+    assert (report.done, report.skipped) == (2, 4)
+    assert "crowbar" in (tmp_path / "p1.json").read_text(encoding="utf-8")
+    assert not (tmp_path / ".save_many.progress").exists()
+    assert [sid for sid, _ in state_mod.iter_sessions(str(tmp_path))] == list(states)
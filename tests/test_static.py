@@ -0,0 +1,72 @@
+import dataclasses
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from game.static import IMMUTABLE, REVALIDATE, StaticAsset
+from game.webbench import bench_route
+
+
+def test_etag_and_conditional_responses():
+    asset = StaticAsset.json({"name": "Eternal Hunt"})
+    status, body, headers = asset.respond()
+    assert status == 200 and body == b'{"name":"Eternal Hunt"}'
+    assert headers == {
+        "ETag": asset.etag,
+        "Cache-Control": REVALIDATE,
+        "Content-Type": "application/json",
+    }
+
+    assert asset.respond(asset.etag) == (304, b"", asset.headers)
+    assert asset.matches(f'"other", W/{asset.etag}')
+    assert asset.matches("*")
+    assert not asset.matches('"other"')
+    assert StaticAsset.json({"name": "Outlive"}).etag != asset.etag
+
+
+def test_versioned_paths_follow_content(tmp_path):
+    path = tmp_path / "title.png"
+    path.write_bytes(b"\x89PNG fake")
+    image = StaticAsset.file(str(path), IMMUTABLE)
+
+    assert image.media_type == "image/png"
+    assert image.versioned_path("/site/title.png") == f"/site/title.{image.etag[1:13]}.png"
+    plain = dataclasses.replace(image, cache_control=REVALIDATE)
+    assert plain.etag == image.etag and plain.headers["Cache-Control"] == REVALIDATE
+
+
+@pytest.fixture
+def server():
+    assets = {"/robots.txt": StaticAsset.text("User-agent: *\nAllow: /\n", "text/plain")}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, body, headers = assets[self.path].respond(self.headers.get("If-None-Match"))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_bench_counts_full_and_revalidated_requests(server):
+    full = bench_route(server, "/robots.txt", seconds=0.2, concurrency=2)
+    cached = bench_route(server, "/robots.txt", seconds=0.2, concurrency=2, revalidate=True)
+
+    assert full.requests > 0 and set(full.statuses) == {200}
+    assert cached.requests > 0 and set(cached.statuses) == {304}
+    assert full.summary()["bytes_per_request"] == len("User-agent: *\nAllow: /\n")
+    assert cached.summary()["bytes_per_request"] == 0
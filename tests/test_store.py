@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from game.history import Timeline
+from game.state import GameLogEntry, GameState, InventoryItem, ResearchLogEntry
+from game.store import JsonStateStore, SqliteStateStore, open_store
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "json":
+        st = JsonStateStore(str(tmp_path / "sessions"))
+    else:
+        st = SqliteStateStore(str(tmp_path / "sessions.db"))
+    yield st
+    st.close()
+
+
+def _state(*items: str) -> GameState:
+    st = GameState()
+    st.game_log.append(GameLogEntry(category="event", entry="Door kicked open"))
+    st.research_log.append(ResearchLogEntry(category="technical", entry="DNA match"))
+    for name in items:
+        st.items.append(InventoryItem(name=name, description=f"a {name}"))
+    return st
+
+
+def test_roundtrip(store):
+    original = _state("keycard")
+    store.save("alice", original)
+    loaded = store.load("alice")
+
+    assert loaded.to_dict() == original.to_dict()
+    assert loaded.game_log[0].entry == "Door kicked open"
+    assert loaded.research_log[0].category == "technical"
+    assert loaded.items[0].description == "a keycard"
+    assert store.exists("alice")
+
+    with pytest.raises(KeyError):
+        store.load("nobody")
+
+
+def test_incremental_saves_follow_undo(store):
+    st = _state()
+    tl = Timeline(st)
+    store.save("bob", st)
+    for n in range(3):
+        st.game_log.append(GameLogEntry(category="event", entry=f"move {n}"))
+        tl.checkpoint()
+        store.save("bob", st)
+
+    tl.undo()
+    tl.undo()
+    st.game_log.append(GameLogEntry(category="decision", entry="different move"))
+    store.save("bob", st)
+
+    assert [e.entry for e in store.load("bob").game_log] == [
+        "Door kicked open",
+        "move 0",
+        "different move",
+    ]
+
+
+def test_queries(store):
+    store.save("alice", _state("keycard"))
+    store.save("bob", _state("flashlight", "keycard"))
+    store.save("carol", _state("flashlight"))
+
+    assert store.list_sessions() == ["alice", "bob", "carol"]
+    assert store.sessions_with_item("keycard") == ["alice", "bob"]
+    assert set(store.active_since(time.time() - 60)) == {"alice", "bob", "carol"}
+    assert store.active_since(time.time() + 60) == []
+
+    store.delete("bob")
+    assert store.sessions_with_item("keycard") == ["alice"]
+    assert not store.exists("bob")
+
+
+def test_rejects_unsafe_session_ids(store):
+    with pytest.raises(ValueError):
+        store.save("../escape", GameState())
+
+
+def test_sqlite_threads_share_store(tmp_path):
+    store = SqliteStateStore(str(tmp_path / "db.sqlite"))
+
+    def worker(n: int) -> None:
+        for turn in range(5):
+            st = _state(f"item{n}")
+            st.game_log.append(GameLogEntry(category="event", entry=f"turn {turn}"))
+            store.save(f"s{n}", st)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(store.list_sessions()) == 8
+    assert len(store.load("s3").game_log) == 2
+    assert store.sessions_with_log_category("event") == sorted(f"s{n}" for n in range(8))
+    mode = store._conn().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    store.close()
+
+
+def test_open_store_picks_backend(tmp_path):
+    assert isinstance(open_store(f"sqlite:///{tmp_path}/x.db"), SqliteStateStore)
+    assert isinstance(open_store(str(tmp_path / "dir")), JsonStateStore)
+
+
+def test_session_autosaves_to_store(fresh_thriller_modules, tmp_path):
+    import importlib
+
+    engine = fresh_thriller_modules[4]
+    store_mod = importlib.import_module("game.store")
+    store = store_mod.SqliteStateStore(str(tmp_path / "s.db"))
+
+    session = engine.Session(session_id="p1", store=store)
+    session.respond("Look around")
+    branch = session.branch(0, session_id="p1-alt")
+    branch.respond("Run outside")
+
+    assert [e.entry for e in store.load("p1").game_log] == ["Player action: Look around"]
+    assert [e.entry for e in store.load("p1-alt").game_log] == ["Player action: Run outside"]
@@ -0,0 +1,99 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def tiering(fresh_thriller_modules):
+    return importlib.import_module("game.tiering")
+
+
+@pytest.mark.parametrize(
+    "message, kind",
+    [
+        ("Look around", "command"),
+        ("inventory", "command"),
+        ("Wait by the door", "command"),
+        ("Open the door", "action"),
+        ("Call my sister", "action"),
+        ("Run outside", "command"),
+        ("Look at the photo", "command"),
+        ("Fill a glass with running water", "action"),
+        ("Run away from the guards", "cutscene"),
+        ("The guard was stabbed", "cutscene"),
+        ("Escaping is the only way", "cutscene"),
+        ("Confront the agent in the hallway", "cutscene"),
+        ("I tell the man everything I know about " + "the lab " * 10, "cutscene"),
+    ],
+)
+def test_turn_types(tiering, message, kind):
+    assert tiering.turn_type(message) == kind
+
+
+def test_router_policies(tiering):
+    router = tiering.ModelRouter(
+        tiers={"fast": "small-m", "large": "big-m"},
+        agent_tiers={"narrator": "auto", "research": "large"},
+    )
+
+    assert router.route("narrator", "Look around").model == "small-m"
+    assert router.route("narrator", "Confront the agent").model == "big-m"
+    # Pinned agents ignore the classifier
+    assert router.route("research", "Who is he?").tier == "large"
+    assert tiering.ModelRouter(tiers={"fast": "a", "large": "b"}).route(
+        "research", "Where is Helix Labs headquartered?"
+    ) == tiering.Route("research", "lookup", "fast", "a")
+
+    with pytest.raises(ValueError):
+        tiering.ModelRouter(agent_tiers={"narrator": "huge"}).route("narrator", "Look")
+
+
+def test_session_builds_narrator_on_routed_tier(fresh_thriller_modules, monkeypatch):
+    from agents import Runner
+
+    config = importlib.import_module("game.config")
+    engine = importlib.import_module("game.engine")
+    tiering = importlib.import_module("game.tiering")
+    models = []
+
+    def usage(i, o):
+        return SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=i, output_tokens=o, input_tokens_details=None)
+        )
+
+    async def fake_run(agent, message):
+        models.append(agent.model)
+        return SimpleNamespace(final_output="ok", raw_responses=[usage(1_000_000, 0)])
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    session = engine.Session(autosave=False)
+    session.respond("Look around")
+    session.respond("Escape through the window")
+
+    assert models == [config.MODEL_TIERS["fast"], config.MODEL_TIERS["large"]]
+    report = tiering.tier_report()
+    assert report["fast"]["calls"] == 1 and report["large"]["calls"] == 1
+    assert report["fast"]["cost_usd"] == config.MODEL_PRICES["gpt-4o-mini"][0]
+    assert report["large"]["cost_usd"] == config.MODEL_PRICES["gpt-4"][0]
+
+
+def test_research_calls_use_a_routed_copy_of_the_agent(fresh_thriller_modules, monkeypatch):
+    from agents import Agent, Runner
+
+    tools = importlib.import_module("game.tools")
+    tiering = importlib.import_module("game.tiering")
+    web = Agent("Web Research Agent", "...", "gpt-4", [])
+    seen = []
+
+    async def fake_run(agent, query):
+        seen.append(agent)
+        return SimpleNamespace(final_output="answer")
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    asyncio.run(tools.make_query_web_research_tool(web)("Who founded Helix?"))
+
+    assert seen[0] is not web and seen[0].model == tiering.MODEL_ROUTER.tiers["fast"]
+    assert web.model == "gpt-4"
+    assert tiering.tier_report()["fast"]["calls"] == 1
@@ -141,3 +141,212 @@ async def test_query_web_research_bridge(clean_state, monkeypatch):
     log_entry = state.default_state.research_log[0]
     assert "Q: What are FOXP2 markers?" in log_entry.entry
     assert "A: Longevity markers confirmed" in log_entry.entry
+
+
+async def test_concurrent_duplicate_queries_share_one_call(clean_state, monkeypatch):
+    import asyncio
+    import importlib
+
+    from agents import Runner
+
+    state, tools = clean_state
+    metrics = importlib.import_module("game.metrics").METRICS
+    asked = []
+
+    class FakeResult:
+        def __init__(self, text):
+            self.final_output = text
+
+    async def fake_run(agent, query):
+        asked.append(query)
+        await asyncio.sleep(0.02)
+        return FakeResult(f"answer: {query}")
+
+    monkeypatch.setattr(Runner, "run", fake_run, raising=True)
+    bridge = tools.make_query_web_research_tool(object())
+
+    out = await asyncio.gather(
+        bridge("Who is Dr. Vance?"),
+        bridge("  who is dr.  vance? "),
+        bridge("Who is Dr. Vance?"),
+        bridge("Where is the lab?"),
+    )
+
+    assert asked == ["Who is Dr. Vance?", "Where is the lab?"]
+    assert out[:3] == ["answer: Who is Dr. Vance?"] * 3
+    assert metrics.counter("research.started") == 2
+    assert metrics.counter("research.coalesced") == 2
+    # A repeated answer is logged once
+    assert len(state.default_state.research_log) == 2
+    assert len(tools.RESEARCH_CALLS) == 0
+
+
+async def test_single_flight_cancels_only_when_all_waiters_leave(clean_state):
+    import asyncio
+    import threading
+
+    _, tools = clean_state
+    flight = tools.SingleFlight("test")
+    # The work runs on the flight loop's thread
+    started, finished = threading.Event(), []
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            finished.append("cancelled")
+            raise
+        finished.append("done")
+        return "result"
+
+    first = asyncio.create_task(flight.run("k", work))
+    second = asyncio.create_task(flight.run("k", work))
+    await asyncio.to_thread(started.wait, 5)
+    first.cancel()
+    assert await second == "result"
+    assert finished == ["done"]
+
+    finished.clear()
+    waiters = [asyncio.create_task(flight.run("k", work)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for w in waiters:
+        w.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0.01)
+    assert finished == ["cancelled"]
+    assert len(flight) == 0
+
+
+async def test_single_flight_across_threads(clean_state):
+    import asyncio
+    import threading
+    import time
+
+    _, tools = clean_state
+    flight = tools.SingleFlight("threads")
+    calls = []
+
+    async def work():
+        calls.append(threading.current_thread().name)
+        await asyncio.sleep(0.1)
+        return "shared"
+
+    def worker(out):
+        # Each Gradio worker thread runs its turn on its own event loop
+        out.append(asyncio.run(flight.run("k", work)))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+        time.sleep(0.005)
+    await asyncio.to_thread(lambda: [t.join() for t in threads])
+
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+
+
+async def test_tool_arguments_are_normalized(clean_state):
+    state, tools = clean_state
+
+    await tools.update_game_log("  Rain   hammers\tthe\n\n\n  skylight ", category="AMBIENT ")
+    await tools.update_game_log("Sirens in the distance", category="events")
+    await tools.update_game_log("A figure at the window", category="disc")
+    await tools.update_game_log("Something", category="nonsense")
+    await tools.add_player_item("keycard " * 20, description="x" * 1000)
+
+    log = state.default_state.game_log
+    assert [(e.category, e.entry) for e in log] == [
+        ("ambient", "Rain hammers the\nskylight"),
+        ("event", "Sirens in the distance"),
+        ("discovery", "A figure at the window"),
+        ("event", "Something"),  # the parameter's default
+    ]
+    item = state.default_state.items[0]
+    assert len(item.name) <= 48 and item.name.endswith("keycard…")
+    assert len(item.description) == 160
+
+
+async def test_empty_required_arguments_are_refused(clean_state):
+    state, tools = clean_state
+
+    assert "new_entry is empty" in await tools.update_game_log(" \n\t ")
+    assert "item_name is empty" in await tools.add_player_item(item_name="   ", description="x")
+    assert "updated" in await tools.update_game_log("Rain on the skylight")
+    assert "added" in await tools.add_player_item("keycard")  # description may be empty
+
+    assert [e.entry for e in state.default_state.game_log] == ["Rain on the skylight"]
+    assert [i.name for i in state.default_state.items] == ["keycard"]
+
+
+async def test_consecutive_near_duplicates_are_dropped(clean_state):
+    state, tools = clean_state
+
+    assert "updated" in await tools.update_game_log("The player hides.", category="event")
+    assert "already" in await tools.update_game_log("the player  hides", category="event")
+    assert "updated" in await tools.update_game_log("The player hides.", category="decision")
+    assert "updated" in await tools.update_research_log("Λ-17 is a lab code")
+    assert "already" in await tools.update_research_log("Λ-17: is a LAB code!")
+
+    assert [e.category for e in state.default_state.game_log] == ["event", "decision"]
+    assert len(state.default_state.research_log) == 1
+
+
+async def test_single_flight_outlives_the_leaders_loop(clean_state):
+    import asyncio
+    import threading
+
+    state_mod, tools = clean_state
+    flight = tools.SingleFlight("outlive")
+    release = threading.Event()
+
+    async def work():
+        await asyncio.to_thread(release.wait, 5)
+        return "shared"
+
+    async def leader():
+        # The leader's asyncio.run loop closes while the call is still running
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.run("k", work), 0.05)
+
+    follower = asyncio.create_task(flight.run("k", work))
+    await asyncio.to_thread(asyncio.run, leader())
+    release.set()
+    assert await asyncio.wait_for(follower, 5) == "shared"
+
+    async def instant():
+        return "now"
+
+    # Work that is over before its callback is registered settles without deadlock
+    for _ in range(50):
+        assert await asyncio.wait_for(flight.run("fast", instant), 5) == "now"
+    assert len(flight) == 0
+
+
+async def test_research_notes_land_in_every_callers_state(clean_state):
+    import asyncio
+
+    state_mod, tools = clean_state
+    seen = []
+
+    class Resp:
+        final_output = "The Orpheus Group has owned Helix Labs since 2011."
+
+    async def run(agent, query):
+        await asyncio.sleep(0.02)
+        await tools.update_research_log("Helix Labs: bought by Orpheus in 2011", "historical")
+        return Resp()
+
+    bridge = tools.make_query_web_research_tool(None, run=run)
+    states = [state_mod.GameState(), state_mod.GameState()]
+
+    async def ask(state):
+        with state_mod.use_state(state), tools.observe_tool_calls(lambda *a: seen.append(a[0])):
+            return await bridge("Who owns Helix Labs?")
+
+    await asyncio.gather(*(ask(s) for s in states))
+    for state in states:
+        assert [e.category for e in state.research_log] == ["historical", "info"]
+    assert state_mod.default_state.research_log == []
+    assert "update_research_log" in seen
@@ -0,0 +1,118 @@
+import asyncio
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def mods(fresh_thriller_modules):
+    return (
+        importlib.import_module("game.state"),
+        importlib.import_module("game.tools"),
+        importlib.import_module("game.transaction"),
+    )
+
+
+def test_tool_calls_are_staged_until_commit(mods):
+    state_mod, tools, txn_mod = mods
+    state = state_mod.GameState()
+    state.items.append(state_mod.InventoryItem("phone"))
+    txn = txn_mod.TurnTransaction(state)
+
+    async def turn():
+        with state_mod.use_state(state), txn_mod.transaction(txn):
+            await tools.update_game_log("Footsteps upstairs", category="ambient")
+            await tools.update_game_log("Footsteps upstairs ", category="ambient")
+            assert "is empty" in await tools.update_game_log("   ")  # refused, never staged
+            assert await tools.add_player_item("keycard") == "keycard added to your inventory."
+            assert "already" in await tools.add_player_item("keycard")
+            await tools.remove_player_item("phone")
+            await tools.add_player_item("lighter")
+            await tools.remove_player_item("lighter")
+            # Nothing has touched the state yet
+            assert state.game_log == [] and [i.name for i in state.items] == ["phone"]
+
+    asyncio.run(turn())
+    changes = txn.changes
+
+    assert [e.entry for e in state.game_log] == ["Footsteps upstairs"]
+    assert [i.name for i in state.items] == ["keycard"]
+    assert [e.entry for e in changes.game_log] == ["Footsteps upstairs"]
+    assert [i.name for i in changes.items_added] == ["keycard"]
+    assert changes.items_removed == ("phone",)
+    assert changes.dropped == 1
+    assert changes.to_dict()["items_removed"] == ["phone"]
+
+
+def test_failed_turn_rolls_back(mods):
+    state_mod, tools, txn_mod = mods
+    state = state_mod.GameState()
+    txn = txn_mod.TurnTransaction(state)
+
+    async def turn():
+        with state_mod.use_state(state), txn_mod.transaction(txn):
+            await tools.update_game_log("Door opens")
+            await tools.add_player_item("crowbar")
+            raise RuntimeError("model timed out")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(turn())
+
+    assert state.game_log == [] and list(state.items) == []
+    assert txn.changes.empty
+
+
+def test_tools_apply_directly_outside_a_turn(mods):
+    state_mod, tools, _ = mods
+    state = state_mod.GameState()
+    with state_mod.use_state(state):
+        asyncio.run(tools.add_player_item("map"))
+    assert [i.name for i in state.items] == ["map"]
+
+
+def test_session_emits_one_change_set_per_turn(fresh_thriller_modules, tmp_path):
+    engine = importlib.import_module("game.engine")
+    store_mod = importlib.import_module("game.store")
+    metrics = importlib.import_module("game.metrics").METRICS
+
+    store = store_mod.SqliteStateStore(str(tmp_path / "s.db"))
+    session = engine.Session(session_id="p1", store=store)
+    seen = []
+    session.add_listener(seen.append)
+
+    session.respond("Look around")
+    session.respond("Open the door")
+
+    assert [[e.entry for e in c.game_log] for c in seen] == [
+        ["Player action: Look around"],
+        ["Player action: Open the door"],
+    ]
+    assert session.last_changes is seen[-1]
+    assert metrics.counter("turn.commits") == 2
+    assert metrics.counter("turn.game_log_entries") == 2
+    assert store.load("p1").to_dict() == session.state.to_dict()
+
+    # After undo the store is behind the change-set base and falls back to a full sync
+    session.undo()
+    session.respond("Run outside")
+    assert [e.entry for e in store.load("p1").game_log] == [
+        "Player action: Look around",
+        "Player action: Run outside",
+    ]
+
+
+def test_failed_turn_leaves_session_state_untouched(fresh_thriller_modules, monkeypatch):
+    engine = importlib.import_module("game.engine")
+    tools = importlib.import_module("game.tools")
+    from agents import Runner
+
+    async def failing_run(agent, message):
+        await tools.update_game_log("half-applied")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(Runner, "run", failing_run, raising=True)
+    session = engine.Session(autosave=False)
+
+    with pytest.raises(RuntimeError):
+        session.respond("Look around")
+    assert session.state.game_log == []
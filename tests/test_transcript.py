@@ -0,0 +1,48 @@
+import pytest
+
+from game.payload import measure
+from game.transcript import CursorError, Transcript
+
+
+def test_window_and_cursor_pages_back_to_the_start():
+    transcript = Transcript()
+    for i in range(25):
+        transcript.add("user" if i % 2 else "assistant", f"m{i}")
+
+    window, cursor = transcript.window(10)
+    assert [m["content"] for m in window] == [f"m{i}" for i in range(15, 25)]
+
+    seen = [m["content"] for m in window]
+    while cursor is not None:
+        page, cursor = transcript.page(cursor, 10)
+        seen = [m["content"] for m in page] + seen
+    assert seen == [f"m{i}" for i in range(25)]
+    assert transcript.window(30)[1] is None
+
+
+def test_cursors_are_bound_to_their_transcript():
+    a, b = Transcript(), Transcript()
+    for t in (a, b):
+        for i in range(5):
+            t.add("user", str(i))
+    _, cursor = a.window(2)
+
+    with pytest.raises(CursorError):
+        b.page(cursor, 2)
+    with pytest.raises(CursorError):
+        a.page(cursor[:-4] + "AAAA", 2)
+    with pytest.raises(CursorError):
+        a.page("not a cursor!", 2)
+
+    a.clear()
+    with pytest.raises(CursorError):
+        a.page(cursor, 2)
+
+
+def test_windowed_payload_stays_flat_as_the_game_grows():
+    short, mid, long = measure(10), measure(100), measure(1000)
+
+    assert long["window_bytes"] - mid["window_bytes"] < 100
+    assert long["full_bytes"] > 9 * mid["full_bytes"]
+    assert long["window_gzip"] < long["window_bytes"] / 2
+    assert short["window_bytes"] < mid["window_bytes"]  # window not full yet at 10 turns
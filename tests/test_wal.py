@@ -0,0 +1,149 @@
+import asyncio
+import importlib
+import os
+
+import pytest
+
+
+@pytest.fixture
+def mods(fresh_thriller_modules):
+    return (
+        importlib.import_module("game.state"),
+        importlib.import_module("game.tools"),
+        importlib.import_module("game.transaction"),
+        importlib.import_module("game.wal"),
+    )
+
+
+def _turn(mods, state, wal, *entries, commit=True):
+    """Plays a turn's tool calls against `state` with a journal; no save follows."""
+    state_mod, tools, txn_mod, _ = mods
+    txn = txn_mod.TurnTransaction(state, journal=wal.journal(state))
+
+    async def run():
+        with state_mod.use_state(state):
+            token = txn_mod._ACTIVE_TXN.set(txn)
+            try:
+                for entry in entries:
+                    if entry.startswith("+"):
+                        await tools.add_player_item(entry[1:])
+                    elif entry.startswith("-"):
+                        await tools.remove_player_item(entry[1:])
+                    else:
+                        await tools.update_game_log(entry)
+            finally:
+                txn_mod._ACTIVE_TXN.reset(token)
+
+    asyncio.run(run())
+    if commit:
+        txn.commit()
+
+
+@pytest.mark.parametrize("sync", ["op", "turn", "group"])
+def test_committed_turns_are_replayed_and_incomplete_ones_discarded(mods, tmp_path, sync):
+    state_mod, _, _, wal_mod = mods
+    live = state_mod.GameState()
+    live.items.append(state_mod.InventoryItem("phone"))
+    saved = state_mod.GameState.from_dict(live.to_dict())  # last save before the crash
+
+    wal = wal_mod.WriteAheadLog(str(tmp_path / "game.wal"), sync=sync, group_commit_s=0.01)
+    _turn(mods, live, wal, "A door slams.", "+keycard", "-phone")
+    _turn(mods, live, wal, "Sirens.", commit=False)  # the process dies mid-turn
+    wal.close()
+
+    report = wal_mod.recover(wal.path, saved)
+    assert (report.replayed, report.discarded, report.torn) == (1, 1, False)
+    assert [e.entry for e in saved.game_log] == ["A door slams."]
+    assert [i.name for i in saved.items] == ["keycard"]
+
+    again = wal_mod.recover(wal.path, saved)  # saved, but the log was never cleared
+    assert (again.replayed, again.skipped) == (0, 1)
+
+    fresh = state_mod.GameState()
+    fresh.items.append(state_mod.InventoryItem("phone"))  # where the logged turns began
+    wal_mod.recover(wal.path, fresh, incomplete="replay")
+    assert [e.entry for e in fresh.game_log] == ["A door slams.", "Sirens."]
+
+
+def test_torn_tail_is_ignored(mods, tmp_path):
+    state_mod, _, _, wal_mod = mods
+    wal = wal_mod.WriteAheadLog(str(tmp_path / "game.wal"))
+    _turn(mods, state_mod.GameState(), wal, "Glass breaks.")
+    wal.close()
+    with open(wal.path, "ab") as f:
+        f.write(b'0badc0de {"t":"begin","turn":')
+
+    state = state_mod.GameState()
+    report = wal_mod.recover(wal.path, state)
+    assert report.torn and report.replayed == 1
+    assert [e.entry for e in state.game_log] == ["Glass breaks."]
+
+
+def test_autoload_recovers_a_turn_that_never_saved(fresh_thriller_modules, save_path, monkeypatch):
+    engine = importlib.import_module("game.engine")
+    wal_mod = importlib.import_module("game.wal")
+    session = engine.Session(save_path=save_path)
+
+    session.respond("Hide in the closet")
+    assert not os.path.exists(wal_mod.wal_path(save_path))  # saved, so the log is gone
+
+    def crash(path):
+        raise OSError("killed before the save landed")
+
+    monkeypatch.setattr(session.state, "save_json", crash)
+    session.respond("Hold your breath")
+    assert os.path.exists(wal_mod.wal_path(save_path))
+
+    assert engine.autoload_state(save_path)
+    entries = [e.entry for e in engine.default_state.game_log]
+    assert entries == ["Player action: Hide in the closet", "Player action: Hold your breath"]
+    assert not os.path.exists(wal_mod.wal_path(save_path))
+    with open(save_path, encoding="utf-8") as f:
+        assert "Hold your breath" in f.read()
+
+
+def test_a_log_that_outlives_a_restart_keeps_every_turn(mods, tmp_path):
+    state_mod, _, _, wal_mod = mods
+    path = str(tmp_path / "game.wal")
+    live = state_mod.GameState()
+    wal = wal_mod.WriteAheadLog(path)
+    _turn(mods, live, wal, "A door slams.")
+    _turn(mods, live, wal, "Sirens.")
+    wal.close()
+    with open(path, "ab") as f:
+        f.write(b'0badc0de {"t":"begin"')  # torn by the crash
+
+    # Restart: recovery replays both turns, but the save fails and the log stays
+    restarted = state_mod.GameState()
+    assert wal_mod.recover(path, restarted).replayed == 2
+    wal = wal_mod.WriteAheadLog(path)
+    _turn(mods, restarted, wal, "Glass breaks.")
+    wal.close()
+
+    fresh = state_mod.GameState()
+    report = wal_mod.recover(path, fresh)
+    assert (report.replayed, report.skipped, report.torn) == (3, 0, False)
+    assert [e.entry for e in fresh.game_log] == ["A door slams.", "Sirens.", "Glass breaks."]
+
+
+def test_a_saved_item_only_turn_is_not_replayed(mods, tmp_path):
+    state_mod, _, _, wal_mod = mods
+    live = state_mod.GameState()
+    live.game_log.append(state_mod.GameLogEntry("event", "A door slams."))
+    wal = wal_mod.WriteAheadLog(str(tmp_path / "game.wal"))
+    _turn(mods, live, wal, "+keycard", "+keycard copy")
+    _turn(mods, live, wal, "-keycard")
+    wal.close()
+
+    # Both turns were saved, but the crash came before the checkpoint
+    saved = state_mod.GameState.from_dict(live.to_dict())
+    report = wal_mod.recover(wal.path, saved)
+    assert (report.replayed, report.skipped) == (0, 2)
+    assert [i.name for i in saved.items] == ["keycard copy"]
+
+    # Saved after the first turn only: just the second is replayed
+    first = state_mod.GameState()
+    first.game_log.append(state_mod.GameLogEntry("event", "A door slams."))
+    first.items += [state_mod.InventoryItem("keycard"), state_mod.InventoryItem("keycard copy")]
+    assert wal_mod.recover(wal.path, first).replayed == 1
+    assert [i.name for i in first.items] == ["keycard copy"]